@@ -0,0 +1,156 @@
+import argparse
+import glob
+import os
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from game_settings import GRID_WIDTH, GRID_HEIGHT, GRID_SIZE
+from replay import load_replay
+
+MAPS = ("occupancy", "heads", "deaths", "traps", "collisions")
+EVENT_MAPS = {"death": "deaths", "trap": "traps", "collision": "collisions"}
+FOOD_TIME_BINS = np.arange(0.0, 20.5, 0.5)  # seconds, covers a default round
+BOARD_CELLS = GRID_WIDTH * GRID_HEIGHT
+
+
+class MatchAnalytics:
+    """Accumulates per-bot board heatmaps and time-to-food statistics over many replays
+
+    Cells are gathered as flat indices per replay and counted with one
+    np.bincount per map, instead of incrementing the arrays cell by cell.
+    """
+
+    def __init__(self):
+        self.maps: Dict[str, Dict[str, np.ndarray]] = {}
+        self.food_times: Dict[str, np.ndarray] = {}
+        self.rounds: Dict[str, int] = {}
+        self.matches = 0
+
+    def _bot(self, name: str) -> Dict[str, np.ndarray]:
+        if name not in self.maps:
+            self.maps[name] = {m: np.zeros(BOARD_CELLS, np.int64) for m in MAPS}
+            self.food_times[name] = np.zeros(len(FOOD_TIME_BINS) - 1, np.int64)
+            self.rounds[name] = 0
+        return self.maps[name]
+
+    def consume(self, replay: Dict) -> None:
+        """Add one recorded match"""
+        cells: Dict[str, Dict[str, List[int]]] = {}
+        food_times: Dict[str, List[float]] = {}
+        for name in replay["bots"]:
+            self._bot(name)
+            cells.setdefault(name, {m: [] for m in MAPS})
+            food_times.setdefault(name, [])
+
+        for rnd in replay["rounds"]:
+            last_food = [0.0, 0.0]
+            for side, name in enumerate(replay["bots"]):
+                self.rounds[name] += 1
+                occupancy = cells[name]["occupancy"]
+                heads = cells[name]["heads"]
+                for frame in rnd["frames"]:
+                    snake = frame["snakes"][side]
+                    if not snake["alive"]:
+                        continue
+                    occupancy.extend(y * GRID_WIDTH + x for x, y in snake["segments"]
+                                     if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT)
+                    if snake["segments"]:
+                        x, y = snake["segments"][0]
+                        if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT:
+                            heads.append(y * GRID_WIDTH + x)
+
+            for event in rnd["events"]:
+                name = replay["bots"][event["side"]]
+                x, y = event["cell"]
+                if event["type"] == "food":
+                    food_times[name].append(event["t"] - last_food[event["side"]])
+                    last_food[event["side"]] = event["t"]
+                elif 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT:
+                    cells[name][EVENT_MAPS[event["type"]]].append(y * GRID_WIDTH + x)
+
+        for name, by_map in cells.items():
+            for map_name, flat in by_map.items():
+                if flat:
+                    self.maps[name][map_name] += np.bincount(
+                        np.asarray(flat, np.int64), minlength=BOARD_CELLS)
+            if food_times[name]:
+                self.food_times[name] += np.histogram(food_times[name], FOOD_TIME_BINS)[0]
+        self.matches += 1
+
+    def consume_files(self, paths: Iterable[str]) -> None:
+        for path in paths:
+            self.consume(load_replay(path))
+
+    def heatmap(self, bot: str, map_name: str) -> np.ndarray:
+        """One accumulated map as a (GRID_HEIGHT, GRID_WIDTH) array"""
+        return self.maps[bot][map_name].reshape(GRID_HEIGHT, GRID_WIDTH)
+
+    def summary(self) -> Dict[str, Dict]:
+        result = {}
+        for name in self.maps:
+            hist = self.food_times[name]
+            centres = (FOOD_TIME_BINS[:-1] + FOOD_TIME_BINS[1:]) / 2
+            eaten = int(hist.sum())
+            occupancy = self.maps[name]["occupancy"]
+            result[name] = {
+                "rounds": self.rounds[name],
+                "apples": eaten,
+                "mean_time_to_food": float((hist * centres).sum() / eaten) if eaten else None,
+                "deaths": int(self.maps[name]["deaths"].sum()),
+                "traps": int(self.maps[name]["traps"].sum()),
+                "collisions": int(self.maps[name]["collisions"].sum()),
+                "coverage": float(np.count_nonzero(occupancy) / BOARD_CELLS),
+            }
+        return result
+
+    def save_npz(self, path: str) -> None:
+        """Export every map and histogram as compact arrays"""
+        arrays = {"food_time_bins": FOOD_TIME_BINS}
+        for name in self.maps:
+            for map_name in MAPS:
+                arrays[f"{name}/{map_name}"] = self.heatmap(name, map_name).astype(np.int32)
+            arrays[f"{name}/food_times"] = self.food_times[name]
+        np.savez_compressed(path, **arrays)
+
+    def render_images(self, out_dir: str) -> List[str]:
+        """Render each heatmap to a PNG on an offscreen surface"""
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import pygame
+
+        os.makedirs(out_dir, exist_ok=True)
+        written = []
+        for name in self.maps:
+            for map_name in MAPS:
+                rgb = heat_colors(self.heatmap(name, map_name))
+                surface = pygame.surfarray.make_surface(rgb.transpose(1, 0, 2))
+                surface = pygame.transform.scale(surface, (GRID_WIDTH * GRID_SIZE, GRID_HEIGHT * GRID_SIZE))
+                path = os.path.join(out_dir, f"{name}_{map_name}.png")
+                pygame.image.save(surface, path)
+                written.append(path)
+        return written
+
+
+def heat_colors(values: np.ndarray) -> np.ndarray:
+    """Map counts to a black-red-yellow-white ramp, (H, W, 3) uint8"""
+    peak = values.max()
+    v = values / peak if peak > 0 else np.zeros(values.shape)
+    ramp = np.stack([v * 3, v * 3 - 1, v * 3 - 2], axis=-1)
+    return (np.clip(ramp, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate heatmaps and behaviour statistics from replays")
+    parser.add_argument("replays", nargs="+", help="replay files or glob patterns (*.json.gz)")
+    parser.add_argument("--out", default="analytics_out")
+    args = parser.parse_args()
+
+    paths = [p for pattern in args.replays for p in sorted(glob.glob(pattern))]
+    analytics = MatchAnalytics()
+    analytics.consume_files(paths)
+
+    os.makedirs(args.out, exist_ok=True)
+    analytics.save_npz(os.path.join(args.out, "analytics.npz"))
+    analytics.render_images(args.out)
+    for name, stats in analytics.summary().items():
+        print(f"{name}: {stats}")
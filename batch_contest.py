@@ -0,0 +1,208 @@
+import argparse
+import multiprocessing
+import threading
+import time
+from typing import List, Dict, Optional
+
+from contest import Contest
+from layout_bank import LayoutBank
+from match_cache import MatchCache, fingerprint_file
+from results_store import ResultsStore
+from trace_buffer import DEFAULT_TRACE_DIR
+from work_queue import WorkQueue, default_worker_id
+
+BOT_FIELDS = ("path", "hash", "name", "authors", "filename")
+
+
+def plan(queue: WorkQueue, batch: str, seeds: int = 3, base_seed: int = 0,
+         layout_bank: Optional[str] = None, memory_cap: Optional[float] = None) -> int:
+    """Queue every round-robin pairing of the submissions once per seed"""
+    bots = Contest().discover_bots()
+    jobs = []
+    for i in range(len(bots)):
+        for j in range(i + 1, len(bots)):
+            for seed in range(base_seed, base_seed + seeds):
+                jobs.append({
+                    "bot1": {field: bots[i][field] for field in BOT_FIELDS},
+                    "bot2": {field: bots[j][field] for field in BOT_FIELDS},
+                    "seed": seed,
+                    "layout_bank": layout_bank,
+                    "memory_cap": memory_cap,
+                })
+    queue.add_jobs(batch, jobs)
+    print(f"Queued {len(jobs)} matches for {len(bots)} bots in batch '{batch}'")
+    return len(jobs)
+
+
+def _contest_bot(spec: Dict) -> Dict:
+    if fingerprint_file(spec["path"]) != spec["hash"]:
+        raise RuntimeError(f"{spec['filename']} changed since the batch was planned")
+    return dict(spec, **{"class": None, "wins": 0, "losses": 0, "points": 0, "remaining": None})
+
+
+def _heartbeat(path: str, lease_seconds: float, job_id: int, worker: str, interval: float,
+               done: threading.Event) -> None:
+    # SQLite connections stay on the thread that opened them
+    queue = WorkQueue(path, lease_seconds)
+    while not done.wait(interval):
+        if not queue.heartbeat(job_id, worker):
+            break
+    queue.close()
+
+
+def work(queue_path: str, batch: Optional[str] = None, worker: Optional[str] = None,
+         lease_seconds: float = 120.0, poll: float = 5.0, cache_path: Optional[str] = None,
+         trace_dir: Optional[str] = DEFAULT_TRACE_DIR, trace_rounds: bool = False) -> int:
+    """Claim and play jobs until the queue has nothing pending or leased; returns jobs completed"""
+    worker = worker or default_worker_id()
+    queue = WorkQueue(queue_path, lease_seconds)
+    cache = MatchCache(cache_path) if cache_path else None
+    contest = Contest(cache=cache, headless=True, trace_dir=trace_dir, trace_rounds=trace_rounds)
+    banks: Dict[str, LayoutBank] = {}
+    completed = 0
+
+    while True:
+        job = queue.claim(worker, batch)
+        if job is None:
+            counts = queue.counts(batch)
+            if counts["pending"] == 0 and counts["leased"] == 0:
+                break
+            # Others hold leases; wait in case one expires and comes back
+            time.sleep(poll)
+            continue
+
+        job_id, payload = job
+        done = threading.Event()
+        beat = threading.Thread(target=_heartbeat, daemon=True,
+                                args=(queue_path, lease_seconds, job_id, worker, lease_seconds / 3, done))
+        beat.start()
+        try:
+            bank_path = payload["layout_bank"]
+            if bank_path and bank_path not in banks:
+                banks[bank_path] = LayoutBank(bank_path)
+            contest.layout_bank = banks.get(bank_path) if bank_path else None
+            contest.seed = payload["seed"]
+            contest.memory_cap = payload.get("memory_cap")
+            result = contest.run_match(_contest_bot(payload["bot1"]), _contest_bot(payload["bot2"]))
+        except Exception as e:
+            done.set()
+            beat.join()
+            print(f"[{worker}] job {job_id} failed: {e}")
+            queue.fail(job_id, worker, f"{type(e).__name__}: {e}")
+            continue
+        done.set()
+        beat.join()
+        if queue.complete(job_id, worker, result):
+            completed += 1
+        else:
+            print(f"[{worker}] lease on job {job_id} was lost; result discarded")
+
+    queue.close()
+    if cache is not None:
+        cache.close()
+    print(f"[{worker}] finished after {completed} jobs")
+    return completed
+
+
+def _work_process(args) -> int:
+    queue_path, batch, index, lease_seconds, poll, cache_path, trace_dir, trace_rounds = args
+    return work(queue_path, batch, f"{default_worker_id()}/{index}", lease_seconds, poll, cache_path,
+                trace_dir, trace_rounds)
+
+
+def reduce(queue: WorkQueue, batch: str, out: str = "contest_results.csv",
+           store: Optional[ResultsStore] = None) -> List[Dict]:
+    """Fold every finished match of a batch into the contest leaderboard"""
+    counts = queue.counts(batch)
+    if counts["pending"] or counts["leased"]:
+        print(f"Warning: {counts['pending'] + counts['leased']} matches still unfinished")
+    for payload, error in queue.failures(batch):
+        print(f"Failed: {payload['bot1']['name']} vs {payload['bot2']['name']} "
+              f"(seed {payload['seed']}): {error}")
+
+    contest = Contest(store=store, headless=True)
+    contest.begin_contest("batch")
+    bots: Dict[str, Dict] = {}
+    for index, (payload, result) in enumerate(queue.results(batch)):
+        for spec in (payload["bot1"], payload["bot2"]):
+            bots.setdefault(spec["name"], dict(spec, wins=0, losses=0, points=0))
+        bot1, bot2 = bots[payload["bot1"]["name"]], bots[payload["bot2"]["name"]]
+        if result.get("forfeit"):
+            print(f"Forfeit (seed {payload['seed']}): {result['forfeit']}")
+        if result["winner"] == bot1["name"]:
+            bot1["wins"] += 1
+            bot1["points"] += 3
+            bot2["losses"] += 1
+        elif result["winner"] == bot2["name"]:
+            bot2["wins"] += 1
+            bot2["points"] += 3
+            bot1["losses"] += 1
+        else:
+            bot1["points"] += 1
+            bot2["points"] += 1
+        if store is not None:
+            store.add_match(f"{batch}:{index}", contest.contest_id, result)
+        contest.tournament_results.append(result)
+    if store is not None:
+        store.flush()
+
+    contest.bots = list(bots.values())
+    contest.update_leaderboard()
+    contest.print_leaderboard()
+    contest.save_results(out)
+    return contest.leaderboard
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Non-interactive contest runner over a shared work queue")
+    parser.add_argument("--queue", default="work_queue.db", help="SQLite queue file shared by all workers")
+    parser.add_argument("--batch", default="contest")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("plan", help="queue all matches of a round robin")
+    p.add_argument("--seeds", type=int, default=3, help="seeded matches per pairing")
+    p.add_argument("--base-seed", type=int, default=0)
+    p.add_argument("--layout-bank", default=None)
+    p.add_argument("--memory-cap", type=float, default=None,
+                   help="MiB a bot may hold; over it the bot forfeits")
+
+    p = sub.add_parser("work", help="claim and play queued matches headless")
+    p.add_argument("--processes", type=int, default=1)
+    p.add_argument("--worker", default=None, help="worker id (default host:pid)")
+    p.add_argument("--lease", type=float, default=120.0, help="seconds before an unrenewed job is requeued")
+    p.add_argument("--poll", type=float, default=5.0)
+    p.add_argument("--cache", default=None, help="optional match cache database")
+    p.add_argument("--trace-dir", default=DEFAULT_TRACE_DIR, help="where anomaly and crash traces are written")
+    p.add_argument("--trace-rounds", action="store_true", help="also dump every round's tick trace")
+
+    p = sub.add_parser("reduce", help="build the leaderboard from finished matches")
+    p.add_argument("--out", default="contest_results.csv")
+    p.add_argument("--store", default=None, help="also record matches in this results database")
+
+    sub.add_parser("status", help="show job counts")
+    args = parser.parse_args()
+
+    if args.command == "plan":
+        queue = WorkQueue(args.queue)
+        plan(queue, args.batch, args.seeds, args.base_seed, args.layout_bank, args.memory_cap)
+        queue.close()
+    elif args.command == "work":
+        if args.processes > 1:
+            jobs = [(args.queue, args.batch, i, args.lease, args.poll, args.cache, args.trace_dir, args.trace_rounds)
+                    for i in range(args.processes)]
+            with multiprocessing.Pool(args.processes) as pool:
+                print(f"Completed {sum(pool.map(_work_process, jobs))} jobs")
+        else:
+            work(args.queue, args.batch, args.worker, args.lease, args.poll, args.cache, args.trace_dir,
+                 args.trace_rounds)
+    elif args.command == "reduce":
+        queue = WorkQueue(args.queue)
+        store = ResultsStore(args.store) if args.store else None
+        reduce(queue, args.batch, args.out, store)
+        queue.close()
+        if store is not None:
+            store.close()
+    else:
+        queue = WorkQueue(args.queue)
+        print(queue.counts(args.batch))
+        queue.close()
@@ -1,5 +1,14 @@
-from typing import Tuple, Optional
-from game_settings import Snake, Food, Trap, Direction, get_distance, is_safe
+import copy
+import inspect
+import threading
+import time
+from dataclasses import dataclass
+from typing import Tuple, Optional, Dict, Iterator, Callable, List, Set
+from game_settings import (
+    GRID_WIDTH, GRID_HEIGHT, Snake, Food, Trap, Direction, MoveContext,
+    build_move_context, get_distance
+)
+from space_index import RegionIndex, blocked_cells
 import random
 
 class Bot:
@@ -10,53 +19,218 @@ class Bot:
                    snake: Snake,
                    food: Food,
                    traps: Trap,
-                   opponent: Optional[Snake] = None) -> Tuple[int, int]:
+                   opponent: Optional[Snake] = None,
+                   context: Optional[MoveContext] = None) -> Tuple[int, int]:
         raise NotImplementedError
 
+    def close(self) -> None:
+        """Release whatever the bot holds once its match is over"""
+        pass
+
+def close_bot(bot) -> None:
+    """Close a bot at the end of its match; submissions need not define close()"""
+    close = getattr(bot, "close", None)
+    if callable(close):
+        close()
+
+class SearchBudget:
+    """How long an anytime search may run: until a time.perf_counter() deadline,
+    or for a number of nodes, which plays out the same on any machine"""
+
+    def __init__(self, deadline: float = float('inf'), nodes: Optional[int] = None):
+        self.deadline = deadline
+        self.nodes = nodes
+        self.spent = 0
+
+    def spend(self) -> bool:
+        """Count one search node; true once the budget has run out"""
+        self.spent += 1
+        return self.expired()
+
+    def expired(self) -> bool:
+        if self.nodes is not None:
+            return self.spent > self.nodes
+        return time.perf_counter() > self.deadline
+
+class AnytimeBot(Bot):
+    """
+    Bot that refines its move until its SearchBudget runs out.
+
+    Implement think() either as a generator yielding improving moves, or by
+    calling offer(move) whenever a better move is found, and call
+    budget.spend() per unit of work. The engine keeps the latest move
+    produced within the budget.
+    With ponder_enabled, ponder() runs in a background thread on a copy of
+    the state after the bot's move until its next decision, and close()
+    ends that thread when the match is over.
+    """
+    default_budget = 0.005
+    ponder_enabled = False
+
+    def __init__(self, name: str = "AnytimeBot"):
+        super().__init__(name)
+        self._ponder_thread: Optional[threading.Thread] = None
+        self._ponder_lock = threading.Lock()
+        self._ponder_wake = threading.Event()
+        self._ponder_stop = threading.Event()
+        self._ponder_shutdown = threading.Event()
+        self._ponder_state = None
+
+    def think(self, snake, food, traps, opponent, context: MoveContext,
+              budget: SearchBudget, offer: Callable[[Tuple[int, int]], None]) -> Optional[Iterator[Tuple[int, int]]]:
+        raise NotImplementedError
+
+    def ponder(self, snake, food, traps, opponent) -> None:
+        """Background work for the next decision; return promptly once should_stop() is true"""
+        pass
+
+    def should_stop(self) -> bool:
+        return self._ponder_stop.is_set()
+
+    def decide_move(self, snake, food, traps, opponent=None, context=None):
+        context = context or build_move_context(snake, food, traps, opponent)
+        return decide_anytime(self, snake, food, traps, opponent, context,
+                              SearchBudget(time.perf_counter() + self.default_budget))
+
+    def start_pondering(self, snake, food, traps, opponent) -> None:
+        if not self.ponder_enabled or not snake.alive:
+            return
+        self._ponder_state = copy.deepcopy((snake, food, traps, opponent))
+        if self._ponder_thread is None:
+            self._ponder_thread = threading.Thread(target=self._ponder_loop, daemon=True)
+            self._ponder_thread.start()
+        self._ponder_stop.clear()
+        self._ponder_wake.set()
+
+    def stop_pondering(self) -> None:
+        if self._ponder_thread is None:
+            return
+        self._ponder_stop.set()
+        self._ponder_wake.clear()
+        # Blocks until a running ponder() has returned
+        with self._ponder_lock:
+            pass
+
+    def close(self) -> None:
+        """Stop pondering and join the ponder thread; pondering again starts a new one"""
+        thread = self._ponder_thread
+        if thread is None:
+            return
+        self._ponder_shutdown.set()
+        self._ponder_stop.set()
+        self._ponder_wake.set()
+        thread.join()
+        self._ponder_thread = None
+        self._ponder_state = None
+        self._ponder_shutdown.clear()
+        self._ponder_wake.clear()
+
+    def _ponder_loop(self) -> None:
+        while True:
+            self._ponder_wake.wait()
+            if self._ponder_shutdown.is_set():
+                return
+            with self._ponder_lock:
+                if self._ponder_stop.is_set():
+                    continue
+                self._ponder_wake.clear()
+                self.ponder(*self._ponder_state)
+
+def decide_anytime(bot: AnytimeBot, snake: Snake, food: Food, traps: Trap,
+                   opponent: Optional[Snake], context: MoveContext, budget: SearchBudget) -> Tuple[int, int]:
+    """Run an anytime bot's think() and keep the last move offered within the budget"""
+    best = [context.safe_moves[0] if context.safe_moves else snake.direction]
+
+    def offer(move: Tuple[int, int]) -> None:
+        if not budget.expired():
+            best[0] = move
+
+    moves = bot.think(snake, food, traps, opponent, context, budget, offer)
+    if moves is not None:
+        for move in moves:
+            if budget.expired():
+                break
+            best[0] = move
+    return best[0]
+
+_accepts_context: Dict[type, bool] = {}
+
+def accepts_context(bot: Bot) -> bool:
+    """Whether a bot's decide_move takes the engine's MoveContext (cached per class)"""
+    bot_type = type(bot)
+    if bot_type not in _accepts_context:
+        try:
+            params = inspect.signature(bot.decide_move).parameters.values()
+        except (TypeError, ValueError):
+            params = []
+        _accepts_context[bot_type] = any(
+            p.name == "context" or p.kind == inspect.Parameter.VAR_KEYWORD for p in params
+        )
+    return _accepts_context[bot_type]
+
+def call_decide_move(bot: Bot, snake: Snake, food: Food, traps: Trap,
+                     opponent: Optional[Snake], context: MoveContext,
+                     budget: Optional[SearchBudget] = None) -> Tuple[int, int]:
+    """Ask a bot for its move, handing over the context only if it understands it"""
+    if isinstance(bot, AnytimeBot):
+        bot.stop_pondering()
+        if budget is None:
+            budget = SearchBudget(time.perf_counter() + bot.default_budget)
+        return decide_anytime(bot, snake, food, traps, opponent, context, budget)
+    if accepts_context(bot):
+        return bot.decide_move(snake, food, traps, opponent, context=context)
+    return bot.decide_move(snake, food, traps, opponent)
+
 class RandomBot(Bot):
     def __init__(self):
         super().__init__("RandomBot")
 
-    def decide_move(self, snake, food, traps, opponent=None):
-        possible_moves = [Direction.RIGHT, Direction.LEFT, Direction.UP, Direction.DOWN]
-        possible_moves = [m for m in possible_moves if m != Direction.opposite(snake.direction)]
-        
-        safe_moves = []
-        for move in possible_moves:
-            new_head = [snake.get_head_position()[0] + move[0], snake.get_head_position()[1] + move[1]]
-            if is_safe(snake, new_head, opponent, traps):
-                safe_moves.append(move)
+    def decide_move(self, snake, food, traps, opponent=None, context=None):
+        context = context or build_move_context(snake, food, traps, opponent)
         
-        if safe_moves:
-            return random.choice(safe_moves)
+        if context.safe_moves:
+            return random.choice(context.safe_moves)
         
-        return random.choice(possible_moves) if possible_moves else snake.direction
+        return random.choice(context.legal_moves) if context.legal_moves else snake.direction
+
+@dataclass
+class GreedyParams:
+    food_weight: float = 1000.0
+    straight_bonus: float = 0.0  # preference for keeping the current heading
+
+@dataclass
+class StrategicParams:
+    base_score: float = 1000.0
+    food_weight: float = 500.0
+    danger_radius: int = 4
+    danger_penalty: float = 800.0
+    room_weight: float = 0.0  # penalty for moves into a region shorter than the snake; 0 skips the region index
 
 class GreedyBot(Bot):
-    def __init__(self):
-        super().__init__("GreedyBot")
+    def __init__(self, params: Optional[GreedyParams] = None, name: str = "GreedyBot"):
+        super().__init__(name)
+        self.params = params or GreedyParams()
 
-    def decide_move(self, snake, food, traps, opponent=None):
-        head_pos = snake.get_head_position()
+    def decide_move(self, snake, food, traps, opponent=None, context=None):
         current_dir = snake.direction
 
         if not food.positions:
             return current_dir
 
-        closest_food = min(food.positions, key=lambda pos: get_distance(head_pos, pos))
-        possible_moves = [Direction.RIGHT, Direction.LEFT, Direction.UP, Direction.DOWN]
-        possible_moves = [m for m in possible_moves if m != Direction.opposite(current_dir)]
+        context = context or build_move_context(snake, food, traps, opponent)
+        head_pos = context.head
+        closest_food = context.nearest_food
+        params = self.params
 
         best_move = current_dir
         best_score = -float('inf')
 
-        for move in possible_moves:
+        for move in context.safe_moves:
             new_head = [head_pos[0] + move[0], head_pos[1] + move[1]]
-            if not is_safe(snake, new_head, opponent, traps):
-                continue
-
             food_dist = get_distance(new_head, closest_food)
-            score = 1000 / (food_dist + 1)
+            score = params.food_weight / (food_dist + 1)
+            if move == current_dir:
+                score += params.straight_bonus
             
             if score > best_score:
                 best_score = score
@@ -65,37 +239,42 @@ class GreedyBot(Bot):
         return best_move if best_score > -float('inf') else current_dir
 
 class StrategicBot(Bot):
-    def __init__(self):
-        super().__init__("StrategicBot")
+    def __init__(self, params: Optional[StrategicParams] = None, name: str = "StrategicBot"):
+        super().__init__(name)
+        self.params = params or StrategicParams()
+        self.regions = RegionIndex() if self.params.room_weight else None
 
-    def decide_move(self, snake, food, traps, opponent=None):
-        head_pos = snake.get_head_position()
+    def decide_move(self, snake, food, traps, opponent=None, context=None):
+        context = context or build_move_context(snake, food, traps, opponent)
         current_dir = snake.direction
-        possible_moves = [Direction.RIGHT, Direction.LEFT, Direction.UP, Direction.DOWN]
-        possible_moves = [m for m in possible_moves if m != Direction.opposite(current_dir)]
+        params = self.params
+        if self.regions is not None:
+            self.regions.sync(blocked_cells((snake, opponent), traps))
 
         best_move = current_dir
         best_score = -float('inf')
 
-        for move in possible_moves:
-            new_head = [head_pos[0] + move[0], head_pos[1] + move[1]]
-            if not is_safe(snake, new_head, opponent, traps):
-                continue
-
+        for move in context.safe_moves:
             # Base score is high, gets penalized by risk
-            score = 1000.0
+            score = params.base_score
             
             # Food score
             if food.positions:
-                closest_food = min(food.positions, key=lambda pos: get_distance(new_head, pos))
-                food_dist = get_distance(new_head, closest_food)
-                score += 500 / (food_dist + 1)
+                food_dist = context.move_food_distance[move]
+                score += params.food_weight / (food_dist + 1)
             
             # Opponent danger score
             if opponent and opponent.alive:
-                dist_to_other = get_distance(new_head, opponent.get_head_position())
-                if dist_to_other < 4 and opponent.length >= snake.length:
-                    score -= 800 / (dist_to_other + 1) # High penalty for getting close to a larger/equal snake
+                dist_to_other = context.move_opponent_distance[move]
+                if dist_to_other < params.danger_radius and opponent.length >= snake.length:
+                    score -= params.danger_penalty / (dist_to_other + 1) # High penalty for getting close to a larger/equal snake
+
+            # Dead-end score: a pocket smaller than the body is a slow death
+            if self.regions is not None:
+                head = context.head
+                room = self.regions.room_after((head[0] + move[0], head[1] + move[1]))
+                if room < snake.length:
+                    score -= params.room_weight * (1 - room / snake.length)
 
             if score > best_score:
                 best_score = score
@@ -103,11 +282,94 @@ class StrategicBot(Bot):
 
         return best_move if best_score > -float('inf') else current_dir
 
+class LookaheadBot(AnytimeBot):
+    """Iterative-deepening search over its own moves, yielding the best move per depth"""
+    max_depth = 12
+    ponder_enabled = True
+
+    def __init__(self):
+        super().__init__("LookaheadBot")
+        # (depth, best first move) found while pondering, keyed by the position it was computed for
+        self._pondered: Dict[Tuple, Tuple[int, Tuple[int, int]]] = {}
+        self.ponder_hits = 0  # decisions that started from a pondered result
+
+    def think(self, snake, food, traps, opponent, context, budget, offer):
+        pondered = self._pondered.pop(self._position_key(snake), None)
+        self._pondered.clear()
+        start_depth = 1
+        # The opponent may have moved since, so a pondered move must still be safe
+        if pondered is not None and pondered[1] in context.safe_moves:
+            self.ponder_hits += 1
+            depth, move = pondered
+            yield move
+            start_depth = depth + 1
+        for _, move in self._search(snake, food, traps, opponent, budget, start_depth):
+            yield move
+
+    def ponder(self, snake, food, traps, opponent):
+        # The engine hands over the position right after our move, which is where we decide next
+        key = self._position_key(snake)
+        for depth, move in self._search(snake, food, traps, opponent, SearchBudget()):
+            self._pondered[key] = (depth, move)
+
+    @staticmethod
+    def _position_key(snake: Snake) -> Tuple:
+        return (tuple(snake.segments[0]), snake.direction, snake.length)
+
+    def _search(self, snake, food, traps, opponent, budget: SearchBudget,
+                start_depth: int = 1) -> Iterator[Tuple[int, Tuple[int, int]]]:
+        blocked: Set[Tuple[int, int]] = set(traps.positions)
+        if opponent is not None and opponent.alive:
+            blocked.update(map(tuple, opponent.segments))
+        foods = set(food.positions)
+        body = [tuple(seg) for seg in snake.segments]
+
+        for depth in range(start_depth, self.max_depth + 1):
+            best_score, best_move = -float('inf'), None
+            for move in Direction.ALL:
+                if move == Direction.opposite(snake.direction):
+                    continue
+                score = self._rollout(body, move, depth, blocked, foods, budget)
+                if score is None:
+                    return
+                if score > best_score:
+                    best_score, best_move = score, move
+            if best_move is not None:
+                yield depth, best_move
+
+    def _rollout(self, body: List[Tuple[int, int]], move: Tuple[int, int], depth: int,
+                 blocked: Set[Tuple[int, int]], foods: Set[Tuple[int, int]],
+                 budget: SearchBudget) -> Optional[float]:
+        """Best score reachable by starting with `move`, or None once the budget runs out"""
+        if budget.spend() or self.should_stop():
+            return None
+        head = (body[0][0] + move[0], body[0][1] + move[1])
+        if (not (0 <= head[0] < GRID_WIDTH and 0 <= head[1] < GRID_HEIGHT) or
+                head in blocked or head in body[:-1]):
+            return -1000.0 + (self.max_depth - depth)
+        ate = head in foods
+        new_body = [head] + (body if ate else body[:-1])
+        gain = 100.0 if ate else 0.0
+        if depth == 1:
+            if not foods:
+                return gain
+            return gain - min(get_distance(head, f) for f in foods) * 0.5
+        rest = foods - {head} if ate else foods
+        best = -float('inf')
+        for next_move in Direction.ALL:
+            if next_move == Direction.opposite(move):
+                continue
+            score = self._rollout(new_body, next_move, depth - 1, blocked, rest, budget)
+            if score is None:
+                return None
+            best = max(best, score)
+        return gain + best
+
 class CustomBot(Bot):
     def __init__(self):
         super().__init__("MyCustomBot")
     
-    def decide_move(self, snake, food, traps, opponent=None):
+    def decide_move(self, snake, food, traps, opponent=None, context=None):
         # Implement your custom logic here
         return Direction.RIGHT
 
@@ -0,0 +1,116 @@
+import gc
+import json
+import marshal
+import os
+import pickle
+import sys
+import types
+from typing import Dict, Optional
+
+from match_cache import fingerprint_file
+
+CACHE_TAG = sys.implementation.cache_tag  # bytecode is only valid for one interpreter version
+
+
+class BotLoader:
+    """Loads contest submissions from cached bytecode into private module namespaces
+
+    Everything is keyed by the file's content hash under `cache_dir`:
+    compiled code, the bot's display name, and the pickled result of an
+    optional module-level precompute() function. Modules are not left in
+    sys.modules, so dropping a bot with unload() lets its memory be freed.
+    """
+
+    def __init__(self, cache_dir: str = ".bot_cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.modules: Dict[str, types.ModuleType] = {}
+        self.compiled = 0
+        self.precomputed = 0
+
+    def _path(self, file_hash: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, f"{file_hash}{suffix}")
+
+    def _code(self, path: str, file_hash: str) -> types.CodeType:
+        code_path = self._path(file_hash, f".{CACHE_TAG}.code")
+        if os.path.exists(code_path):
+            with open(code_path, "rb") as file:
+                return marshal.load(file)
+        with open(path, "rb") as file:
+            code = compile(file.read(), path, "exec")
+        with open(code_path + ".tmp", "wb") as file:
+            marshal.dump(code, file)
+        os.replace(code_path + ".tmp", code_path)
+        self.compiled += 1
+        return code
+
+    def _precompute(self, module: types.ModuleType, file_hash: str) -> None:
+        """Attach the (cached) output of module.precompute() as module.PRECOMPUTED"""
+        precompute = getattr(module, "precompute", None)
+        if not callable(precompute):
+            return
+        data_path = self._path(file_hash, ".precomputed.pkl")
+        if os.path.exists(data_path):
+            with open(data_path, "rb") as file:
+                module.PRECOMPUTED = pickle.load(file)
+            return
+        module.PRECOMPUTED = precompute()
+        with open(data_path + ".tmp", "wb") as file:
+            pickle.dump(module.PRECOMPUTED, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(data_path + ".tmp", data_path)
+        self.precomputed += 1
+
+    def load_module(self, path: str, file_hash: Optional[str] = None) -> types.ModuleType:
+        file_hash = file_hash or fingerprint_file(path)
+        if file_hash in self.modules:
+            return self.modules[file_hash]
+
+        module_name = f"_contest_bot_{file_hash[:16]}"
+        module = types.ModuleType(module_name)
+        module.__file__ = path
+        # Registered only while loading, for code (and pickle) that looks its own module up
+        sys.modules[module_name] = module
+        try:
+            exec(self._code(path, file_hash), module.__dict__)
+            self._precompute(module, file_hash)
+        finally:
+            sys.modules.pop(module_name, None)
+        self.modules[file_hash] = module
+        return module
+
+    def load_class(self, path: str, file_hash: Optional[str] = None) -> type:
+        """The submission's UserBot class"""
+        module = self.load_module(path, file_hash)
+        if not hasattr(module, "UserBot"):
+            raise AttributeError(f"{os.path.basename(path)} defines no UserBot class")
+        return module.UserBot
+
+    def describe(self, path: str, default_name: str) -> Dict:
+        """Hash and display name of a submission, executing it only on a cache miss
+
+        Only a name the class defines is cached by content; identical files
+        without one are each named after their own file via default_name.
+        """
+        file_hash = fingerprint_file(path)
+        meta_path = self._path(file_hash, ".json")
+        meta = None
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as file:
+                meta = json.load(file)
+        # Entries written before "class_name" cached the filename fallback too
+        if meta is None or "class_name" not in meta:
+            bot_class = self.load_class(path, file_hash)
+            meta = {"class_name": getattr(bot_class, "name", None)}
+            with open(meta_path, "w", encoding="utf-8") as file:
+                json.dump(meta, file)
+        return {"hash": file_hash, "name": meta["class_name"] or default_name}
+
+    def unload(self, file_hash: str) -> None:
+        """Drop a loaded submission so its module and tables can be garbage collected"""
+        if self.modules.pop(file_hash, None) is not None:
+            gc.collect()
+
+    def unload_all(self) -> None:
+        if self.modules:
+            self.modules.clear()
+            gc.collect()
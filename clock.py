@@ -0,0 +1,73 @@
+import time
+from typing import Optional
+
+
+class TickClock:
+    """Simulated time as an exact integer tick count at a fixed rate
+
+    Every rule timer (moves, shields, collision windows, round length) reads
+    from here, so outcomes depend only on the number of ticks simulated and
+    never on frame rate, machine load or how many matches run in parallel.
+    """
+
+    def __init__(self, tick_rate: int = 60):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.ticks = 0
+
+    @property
+    def now(self) -> float:
+        return self.ticks / self.tick_rate
+
+    def advance(self, ticks: int = 1) -> None:
+        self.ticks += ticks
+
+    def to_ticks(self, seconds: float) -> int:
+        """Nearest whole number of ticks in a duration"""
+        return round(seconds * self.tick_rate)
+
+    def snap(self, seconds: float) -> float:
+        """Round a duration onto the tick grid so repeated dt steps cannot drift"""
+        return self.to_ticks(seconds) / self.tick_rate
+
+    def since(self, start: float) -> float:
+        """Seconds elapsed since an earlier `now`, exact to the tick"""
+        return self.snap(self.now - start)
+
+    def due_ticks(self, speed: Optional[float] = 1.0) -> int:
+        """Ticks to run for one rendered frame; a pure tick clock owes one per speed step"""
+        return int(speed or 1)
+
+    def resync(self) -> None:
+        pass
+
+
+class RealTimeClock(TickClock):
+    """Tick clock paced by the wall clock, for the GUI
+
+    Game time still advances in whole ticks; due_ticks() reports how many
+    ticks of real time (times the spectating speed) passed since the last
+    frame, so dropped frames are caught up instead of slowing the match.
+    """
+    max_lag = 0.1  # wall seconds caught up at most, e.g. after a pause or a stall
+
+    def __init__(self, tick_rate: int = 60):
+        super().__init__(tick_rate)
+        self._last_wall: Optional[float] = None
+        self._owed = 0.0
+
+    def resync(self) -> None:
+        """Forget wall time spent off the board (menus, pause, MAX speed)"""
+        self._last_wall = None
+        self._owed = 0.0
+
+    def due_ticks(self, speed: Optional[float] = 1.0) -> int:
+        wall = time.perf_counter()
+        if self._last_wall is None:
+            self._last_wall = wall - self.dt
+        elapsed = min(wall - self._last_wall, self.max_lag)
+        self._last_wall = wall
+        self._owed += elapsed * self.tick_rate * (speed or 1)
+        ticks = int(self._owed)
+        self._owed -= ticks
+        return ticks
@@ -1,17 +1,60 @@
 import os
-import importlib
-import sys
-from typing import List, Dict, Tuple
+import random
+import uuid
+from typing import List, Dict, Tuple, Optional
 import csv
 from datetime import datetime
-from tournament import Tournament
-from main import SnakeGame
+from results_store import ResultsStore
+from match_cache import MatchCache, config_fingerprint
+from bot import close_bot
+from bot_loader import BotLoader
+from layout_bank import LayoutBank
+from replay import MatchRecorder
+from trace_buffer import DEFAULT_TRACE_DIR
+from game_settings import GameConfig, SEEDED_DECISION_NODES
+from engine import MatchEngine
+from memory_guard import MemoryGuard, MemoryCapExceeded, MIB
 
 class Contest:
-    def __init__(self):
+    def __init__(self,
+                 store: Optional[ResultsStore] = None,
+                 cache: Optional[MatchCache] = None,
+                 seed: int = 0,
+                 layout_bank: Optional[LayoutBank] = None,
+                 record_dir: Optional[str] = None,
+                 loader: Optional[BotLoader] = None,
+                 headless: bool = False,
+                 memory_cap: Optional[float] = None,
+                 track_memory: bool = False,
+                 trace_dir: Optional[str] = DEFAULT_TRACE_DIR,
+                 trace_rounds: bool = False):
         self.bots: List[Dict] = [] 
         self.leaderboard: List[Dict] = []
         self.tournament_results = []
+        self.store = store
+        self.contest_id: Optional[int] = None
+        self.cache = cache
+        self.seed = seed
+        self.layout_bank = layout_bank
+        self.record_dir = record_dir
+        if record_dir is not None:
+            os.makedirs(record_dir, exist_ok=True)
+        self.matches_simulated = 0
+        self.loader = loader if loader is not None else BotLoader()
+        # Headless contests play on MatchEngine and never open a window
+        self.headless = headless
+        # Per-bot memory cap in MiB (a bot over it forfeits); tracking alone only reports
+        self.memory_cap = memory_cap
+        self.track_memory = track_memory
+        # Where anomaly and crash traces are dumped, for disputed results (None keeps them in memory);
+        # trace_rounds also dumps every round
+        self.trace_dir = trace_dir
+        self.trace_rounds = trace_rounds
+
+    def begin_contest(self, kind: str) -> None:
+        """Register the contest in the results store, if one is attached"""
+        if self.store is not None:
+            self.contest_id = self.store.begin_contest(kind)
 
     def discover_bots(self) -> List[Dict]:
         """Scan AI_Course_Contest folder for valid bot files"""
@@ -31,32 +74,28 @@ class Contest:
                 # Extract names from filename
                 parts = bot_file[:-3].split("_")  # Remove .py and split
                 name1, name2 = parts[0], parts[1]
+                path = f"AI_Course_Contest/{bot_file}"
                 
-                # Import the module
-                module_name = f"AI_Course_Contest.{bot_file[:-3]}"
-                spec = importlib.util.spec_from_file_location(module_name, f"AI_Course_Contest/{bot_file}")
-                module = importlib.util.module_from_spec(spec)
-                sys.modules[module_name] = module
-                spec.loader.exec_module(module)
-                
-                # Get the UserBot class
-                if hasattr(module, "UserBot"):
-                    bot_class = module.UserBot
-                    bot_name = getattr(bot_class, "name", f"{name1}_{name2}")
-                    
-                    bots.append({
-                        "class": bot_class,
-                        "name": bot_name,
-                        "filename": bot_file,
-                        "authors": f"{name1} & {name2}",
-                        "wins": 0,
-                        "losses": 0,
-                        "points": 0  
-                    })
+                # Hash and name come from the loader cache; the module itself loads when it plays
+                info = self.loader.describe(path, f"{name1}_{name2}")
+                bots.append({
+                    "class": None,
+                    "path": path,
+                    "name": info["name"],
+                    "filename": bot_file,
+                    "hash": info["hash"],
+                    "authors": f"{name1} & {name2}",
+                    "wins": 0,
+                    "losses": 0,
+                    "points": 0,
+                    "remaining": None
+                })
                     
             except Exception as e:
                 print(f"Error loading {bot_file}: {str(e)}")
                 continue
+        # Modules executed to read names on a cache miss are reloaded on demand
+        self.loader.unload_all()
 
         if not bots:
             raise Exception("No valid bots found in AI_Course_Contest folder")
@@ -64,30 +103,147 @@ class Contest:
         self.bots = bots
         return bots
 
+    def bot_class(self, bot: Dict) -> type:
+        """Load a bot's class the first time it is scheduled to play"""
+        if bot["class"] is None:
+            bot["class"] = self.loader.load_class(bot["path"], bot["hash"])
+        return bot["class"]
+
+    def release(self, bot: Dict) -> None:
+        """Count down a bot's scheduled matches and unload it after its last one"""
+        if bot.get("remaining") is None:
+            return
+        bot["remaining"] -= 1
+        if bot["remaining"] <= 0 and bot.get("path"):
+            bot["class"] = None
+            self.loader.unload(bot["hash"])
+
+    def release_all(self) -> None:
+        for bot in self.bots:
+            if bot.get("path"):
+                bot["class"] = None
+        self.loader.unload_all()
+
+    def match_config(self) -> GameConfig:
+        # Matches are seeded and cached by their bots, so anytime search is budgeted in nodes
+        return GameConfig(max_rounds=3, round_time=20, decision_nodes=SEEDED_DECISION_NODES)
+
+    def cache_key(self, bot1: Dict, bot2: Dict, config: GameConfig) -> str:
+        config_hash = config_fingerprint(config)
+        if self.layout_bank is not None:
+            config_hash += f"+{self.layout_bank.fingerprint}"
+        if self.memory_cap:
+            config_hash += f"+mem{self.memory_cap}"
+        return MatchCache.make_key(bot1["hash"], bot2["hash"], config_hash, self.seed)
+
     def run_match(self, bot1: Dict, bot2: Dict) -> Dict:
         """Run a match between two bots and return results"""
         
         print(f"\n=== MATCH: {bot1['name']} vs {bot2['name']} ===")
         
-        game = SnakeGame()
-        game.bot1 = bot1["class"]()
-        game.bot2 = bot2["class"]()
-        game.config.max_rounds = 3
-        game.config.round_time = 20
-        game.tournament = Tournament(game.config)
-        
-        # Run the game
-        game.run()  
-        
-        # Get results
-        result = {
-            "bot1": bot1["name"],
-            "bot2": bot2["name"],
-            "bot1_score": game.tournament.total_snake1_apples,
-            "bot2_score": game.tournament.total_snake2_apples,
-            "winner": game.final_winner,
-            "rounds_played": len(game.tournament.results)
-        }
+        match_key = uuid.uuid4().hex
+        config = self.match_config()
+        cache_key = self.cache_key(bot1, bot2, config) if self.cache is not None else None
+        cached = self.cache.get(cache_key) if cache_key is not None else None
+
+        if cached is not None:
+            print("(cached result, bots unchanged)")
+            winner = {"bot1": bot1["name"], "bot2": bot2["name"]}.get(cached["winner_side"])
+            result = {
+                "bot1": bot1["name"],
+                "bot2": bot2["name"],
+                "bot1_score": cached["bot1_score"],
+                "bot2_score": cached["bot2_score"],
+                "winner": winner,
+                "rounds_played": cached["rounds_played"],
+                "forfeit": cached.get("forfeit"),
+                "traces": []
+            }
+        else:
+            random.seed(self.seed)
+            if self.headless:
+                game = MatchEngine()
+            else:
+                from main import SnakeGame
+                game = SnakeGame()
+            guard = MemoryGuard(self.memory_cap) if self.memory_cap or self.track_memory else None
+            game.memory_guard = guard
+            forfeited = False
+            if guard is None:
+                game.bot1 = self.bot_class(bot1)()
+                game.bot2 = self.bot_class(bot2)()
+            else:
+                guard.start()
+                try:
+                    # Memory kept by a constructor counts towards the cap, not towards growth
+                    game.bot1 = guard.construct(bot1["name"], self.bot_class(bot1))
+                    game.bot2 = guard.construct(bot2["name"], self.bot_class(bot2))
+                except MemoryCapExceeded as e:
+                    game.final_winner = bot2["name"] if e.bot_name == bot1["name"] else bot1["name"]
+                    game.forfeit_reason = str(e)
+                    forfeited = True
+            # Snakes are named after their bots, so use contest names to attribute wins
+            game.bot1.name = bot1["name"]
+            game.bot2.name = bot2["name"]
+            game.config = config
+            game.layout_bank = self.layout_bank
+            if self.record_dir is not None:
+                game.recorder = MatchRecorder()
+            game.tracer.out_dir = self.trace_dir
+            game.tracer.dump_rounds = self.trace_rounds
+            game.results_store = self.store
+            game.contest_id = self.contest_id
+            game.match_key = match_key
+            if forfeited:
+                pass  # a bot went over the cap while being constructed
+            elif self.headless:
+                game.play_headless()
+            else:
+                # Play rounds back to back; speed keys still allow fast-forward viewing
+                game.auto_advance = True
+                game.start_new_tournament()
+                
+                # Run the game
+                game.run()  
+            if game.forfeit_reason:
+                print(f"Forfeit: {game.forfeit_reason}")
+            close_bot(game.bot1)
+            close_bot(game.bot2)
+            if guard is not None:
+                guard.stop()
+            self.matches_simulated += 1
+            if game.recorder is not None:
+                game.recorder.save(os.path.join(self.record_dir, f"{match_key}.json.gz"))
+            
+            # Get results
+            result = {
+                "bot1": bot1["name"],
+                "bot2": bot2["name"],
+                "bot1_score": game.tournament.total_snake1_apples,
+                "bot2_score": game.tournament.total_snake2_apples,
+                "winner": game.final_winner,
+                "rounds_played": game.tournament.rounds_played,
+                "forfeit": game.forfeit_reason,
+                "traces": list(game.tracer.dumped)
+            }
+            if guard is not None:
+                result["bot1_memory"] = guard.report(bot1["name"])
+                result["bot2_memory"] = guard.report(bot2["name"])
+                for bot in (bot1, bot2):
+                    usage = guard.report(bot["name"])
+                    print(f"Memory {bot['name']}: peak {usage['peak'] / MIB:.1f} MiB, "
+                          f"growth {usage['growth'] / MIB:+.1f} MiB over {usage['calls']} moves")
+
+            if cache_key is not None:
+                # Store the winner by side so renamed bots still map correctly
+                winner_side = {bot1["name"]: "bot1", bot2["name"]: "bot2"}.get(result["winner"])
+                self.cache.put(cache_key, {
+                    "bot1_score": result["bot1_score"],
+                    "bot2_score": result["bot2_score"],
+                    "winner_side": winner_side,
+                    "rounds_played": result["rounds_played"],
+                    "forfeit": result["forfeit"]
+                })
         
         # Update bot stats
         if result["winner"] == bot1["name"]:
@@ -102,15 +258,22 @@ class Contest:
             bot1["points"] += 1
             bot2["points"] += 1
             
+        if self.store is not None:
+            self.store.add_match(match_key, self.contest_id, result)
         self.tournament_results.append(result)
+        self.release(bot1)
+        self.release(bot2)
         return result
 
     def round_robin_tournament(self):
         """Run a round-robin tournament where each bot plays every other bot"""
         self.discover_bots()
+        self.begin_contest("round_robin")
         num_bots = len(self.bots)
         
         print(f"\nStarting Round Robin Tournament with {num_bots} bots")
+        for bot in self.bots:
+            bot["remaining"] = num_bots - 1
         
         for i in range(num_bots):
             for j in range(i+1, num_bots):
@@ -122,6 +285,7 @@ class Contest:
     def knockout_tournament(self):
         """Run a knockout tournament with losers bracket"""
         self.discover_bots()
+        self.begin_contest("knockout")
         bots = self.bots.copy()
         num_bots = len(bots)
         
@@ -180,11 +344,21 @@ class Contest:
             # Winners of losers bracket join main winners
             winners.extend(advancing_losers)
         
+        self.release_all()
         self.update_leaderboard()
         self.save_results()
 
     def update_leaderboard(self):
         """Update the leaderboard based on current results"""
+        if self.store is not None and self.contest_id is not None:
+            standings = {row["name"]: row for row in self.store.leaderboard(self.contest_id)}
+            for bot in self.bots:
+                row = standings.get(bot["name"])
+                if row is not None:
+                    bot["wins"] = row["wins"]
+                    bot["losses"] = row["losses"]
+                    bot["points"] = row["points"]
+
         self.leaderboard = sorted(
             self.bots,
             key=lambda x: (-x["points"], -x["wins"], x["losses"])
@@ -235,7 +409,7 @@ class Contest:
                   f"{bot['wins']:<5} {bot['losses']:<7} {bot['points']:<7}")
 
 if __name__ == "__main__":
-    contest = Contest()
+    contest = Contest(ResultsStore("contest_results.db"), MatchCache("match_cache.db"))
     
     print("Select tournament type:")
     print("1. Round Robin (each bot plays every other bot)")
@@ -251,4 +425,8 @@ if __name__ == "__main__":
         print("Invalid choice, defaulting to Round Robin")
         contest.round_robin_tournament()
     
-    contest.print_leaderboard()
\ No newline at end of file
+    contest.print_leaderboard()
+    print(f"Matches simulated: {contest.matches_simulated} "
+          f"(cache hits: {contest.cache.hits})")
+    contest.store.close()
+    contest.cache.close()
\ No newline at end of file
@@ -0,0 +1,425 @@
+import random
+import time
+from typing import Optional, TYPE_CHECKING
+from game_settings import (
+    GameState, GameConfig, Snake, Food, Trap,
+    generate_spawn_positions, build_move_context, GREEN, YELLOW
+)
+from clock import TickClock
+from bot import GreedyBot, StrategicBot, AnytimeBot, SearchBudget, call_decide_move
+from tournament import Tournament
+from results_store import ResultsStore
+from profiler import Profiler, NULL_SPAN
+from replay import MatchRecorder
+from memory_guard import MemoryGuard, MemoryCapExceeded
+from trace_buffer import TraceBuffer, HEAD_TO_HEAD, SNAKE1_HITS_BODY, SNAKE2_HITS_BODY, SCORES_ZEROED, FORFEIT
+
+if TYPE_CHECKING:
+    from layout_bank import LayoutBank  # numpy, only needed when a bank is attached
+
+FPS = 60  # simulation ticks per second of game time
+
+class MatchEngine:
+    """Rules, collisions and tournament flow of a match; imports no pygame"""
+    def __init__(self, profiler: Optional[Profiler] = None, headless: bool = True,
+                 clock: Optional[TickClock] = None):
+        # Headless engines skip the end-of-tournament printout and CSV export
+        self.headless = headless
+        
+        # Disabled profiler by default: spans are shared no-ops
+        self.profiler = profiler if profiler is not None else Profiler()
+        
+        self.config = GameConfig()
+        self.game_state = GameState.START
+        self.round_winner: Optional[str] = None
+        self.final_winner: Optional[str] = None
+        
+        # Game time advances one clock tick per update, decoupled from rendering
+        self.sim_clock = clock if clock is not None else TickClock(FPS)
+        self.round_start_time = 0.0
+        
+        # Optional bank of precomputed fair layouts; None generates one per round
+        self.layout_bank: Optional["LayoutBank"] = None
+        self.layout_index: Optional[int] = None
+        
+        # Optional replay recorder fed after every update
+        self.recorder: Optional[MatchRecorder] = None
+        
+        # Always-on ring of compact per-tick records, dumped on anomalies and crashes
+        self.tracer: Optional[TraceBuffer] = TraceBuffer()
+        self.contact_flags = 0
+        
+        # Optional per-bot memory accounting; a bot over its cap forfeits the match
+        self.memory_guard: Optional[MemoryGuard] = None
+        self.forfeit_reason: Optional[str] = None
+        
+        # Optional persistent results store, set by Contest
+        self.results_store: Optional[ResultsStore] = None
+        self.contest_id: Optional[int] = None
+        self.match_key: Optional[str] = None
+        
+        # Initialize tournament tracking; ColumnarTournament keeps aggregates only, for mass evaluation
+        self.tournament_class: type = Tournament
+        self.tournament = self.new_tournament()
+        
+        self.snake1: Optional[Snake] = None
+        self.snake2: Optional[Snake] = None
+        self.food: Optional[Food] = None
+        self.traps: Optional[Trap] = None
+    
+        self.bot1 = StrategicBot()
+        self.bot2 = GreedyBot()
+        
+        self.VALID_DIRECTIONS = {(0, 1), (0, -1), (1, 0), (-1, 0)}
+        self.reset_round()
+        
+    def new_tournament(self) -> Tournament:
+        return self.tournament_class(self.config, self.results_store, self.contest_id, self.match_key)
+
+    def start_new_tournament(self) -> None:
+        self.tournament = self.new_tournament()
+        self.forfeit_reason = None
+        self.game_state = GameState.PLAYING
+        self.reset_round()
+
+    def start_next_round(self) -> None:
+        self.game_state = GameState.PLAYING
+        self.reset_round(swap_positions=True)
+    
+    def reset_round(self, swap_positions: bool = False) -> None:
+        traps = None
+        if self.layout_bank is not None:
+            self.layout_index = random.randrange(len(self.layout_bank))
+            spawn1, spawn2, layout, traps = self.layout_bank.layout(self.layout_index)
+        else:
+            spawn1, spawn2, layout = generate_spawn_positions()
+        
+        if swap_positions:
+            spawn1, spawn2 = spawn2, spawn1
+        
+        self.snake1 = Snake(GREEN, (0, 200, 0), *spawn1, self.bot1.name)
+        self.snake2 = Snake(YELLOW, (200, 200, 0), *spawn2, self.bot2.name)
+        
+        # Add these two lines to fix the names
+        self.tournament.snake1_name = self.snake1.agent_id
+        self.tournament.snake2_name = self.snake2.agent_id
+        
+        self.food = Food(0)
+        self.food.positions = layout.copy()
+        
+        self.traps = Trap(self.config.trap_count)
+        if traps is not None:
+            self.traps.positions = traps
+        else:
+            all_segments = self.snake1.segments + self.snake2.segments
+            self.traps.spawn_multiple(self.config.trap_count, all_segments, self.food.positions)
+        
+        self.round_start_time = self.game_time
+        self.snake_contact = False  # unresolved contact is rechecked every tick
+        if self.tracer is not None:
+            self.tracer.start_round()
+        if self.recorder is not None:
+            self.recorder.start_round(self)
+    
+    def self_collision_pending(self) -> bool:
+        """Whether a snake sits in its self-collision grace window, which expires on its own"""
+        return any(snake.alive and getattr(snake, 'is_colliding_with_self', False)
+                   for snake in (self.snake1, self.snake2))
+
+    def check_self_collisions(self):
+        current_time = self.game_time
+        
+        for snake in [self.snake1, self.snake2]:
+            if not snake.alive:
+                continue
+                
+            head = snake.get_head_position()
+            body = snake.get_body_positions()
+            
+            # Check if head hit body
+            if any(tuple(head) == tuple(segment) for segment in body):
+                if not hasattr(snake, 'self_collision_start_time'):
+                    snake.self_collision_start_time = current_time
+                    snake.self_collision_delay = 3.0  # 3 second delay
+                    snake.is_colliding_with_self = True
+                    
+                # Check if delay has passed
+                if self.sim_clock.since(snake.self_collision_start_time) >= snake.self_collision_delay:
+                    snake.alive = False
+                    snake.score = 0
+                    snake.death_time = current_time
+            else:
+                # Only try to delete if attributes exist
+                if hasattr(snake, 'is_colliding_with_self'):
+                    delattr(snake, 'is_colliding_with_self')
+                if hasattr(snake, 'self_collision_start_time'):
+                    delattr(snake, 'self_collision_start_time')
+
+    def handle_snake_on_snake_collision(self) -> bool:
+        """Resolve head/body contact between the snakes; True while they touch"""
+        self.contact_flags = 0
+        if not self.snake1.alive or not self.snake2.alive: return False
+        if self.snake1.shield_timer > 0 or self.snake2.shield_timer > 0: return False
+
+        head1 = self.snake1.get_head_position()
+        head2 = self.snake2.get_head_position()
+        
+        body1_set = set(tuple(seg) for seg in self.snake1.get_body_positions())
+        body2_set = set(tuple(seg) for seg in self.snake2.get_body_positions())
+
+        # Check collision types
+        head_to_head = tuple(head1) == tuple(head2)
+        s1_hits_s2_body = tuple(head1) in body2_set
+        s2_hits_s1_body = tuple(head2) in body1_set
+
+        current_time = self.game_time
+    
+        # Apply penalties based on collision type
+        if head_to_head or s1_hits_s2_body or s2_hits_s1_body:
+            self.contact_flags = ((head_to_head and HEAD_TO_HEAD) | (s1_hits_s2_body and SNAKE1_HITS_BODY) |
+                                  (s2_hits_s1_body and SNAKE2_HITS_BODY))
+            if self.sim_clock.since(self.snake1.last_collision_time) < 1.0:
+                self.snake1.consecutive_collisions += 1
+            if self.sim_clock.since(self.snake2.last_collision_time) < 1.0:
+                self.snake2.consecutive_collisions += 1
+                
+            self.snake1.last_collision_time = current_time
+            self.snake2.last_collision_time = current_time
+            # Check for 3 consecutive collisions
+            if (self.snake1.consecutive_collisions >= 3 or 
+                self.snake2.consecutive_collisions >= 3):
+                self.snake1.score = 0
+                self.snake2.score = 0
+                self.contact_flags |= SCORES_ZEROED
+                return True
+            
+            len1, len2 = self.snake1.length, self.snake2.length
+            penalty = self.config.collision_segment_penalty
+
+            if len1 < len2:
+                self.apply_collision_penalty(self.snake1, penalty)
+            elif len2 < len1:
+                self.apply_collision_penalty(self.snake2, penalty)
+            else:
+                self.apply_collision_penalty(self.snake1, penalty//2)
+                self.apply_collision_penalty(self.snake2, penalty//2)
+            return True
+        return False
+              
+    def apply_collision_penalty(self, snake: Snake, penalty: int):
+        """Helper method to apply collision penalties"""
+        for _ in range(penalty):
+            if len(snake.segments) > 0:
+                if snake.grow > 0:
+                    snake.grow -= 1
+                else:
+                    snake.segments.pop()
+                snake.length -= 1
+        snake.shield_timer = self.config.shield_duration
+        snake.score = max(0, snake.score - penalty)  # Deduct score
+        snake.collisions += 1
+                
+    def check_food_and_trap_collisions(self) -> None:
+        for snake in [self.snake1, self.snake2]:
+            if not snake.alive: continue
+            if self.food.check_collision(snake.get_head_position()):
+                snake.grow += self.config.growth_per_food
+                snake.score += 1
+            self.traps.check_collision(snake)
+
+    def start_new_game(self) -> None:
+        self.game_state = GameState.PLAYING
+        self.reset_round()
+    
+    def update(self) -> None:
+        try:
+            self.advance_tick()
+        except Exception:
+            # Whatever led up to the crash is still in the ring
+            if self.tracer is not None:
+                self.tracer.dump(self, "crash")
+            raise
+
+    def advance_tick(self) -> None:
+        if self.game_state != GameState.PLAYING: return
+        self.sim_clock.advance()
+
+        profiler = self.profiler
+        # Between moves the board is frozen: bots would repeat their last answer and
+        # collisions cannot change, so that work runs only on ticks where a snake
+        # moves, a shield runs out, or a contact/self-collision is still unresolved
+        moved = shield_ended = False
+        for snake, bot, opponent in [(self.snake1, self.bot1, self.snake2), (self.snake2, self.bot2, self.snake1)]:
+            if snake.alive:
+                moving = snake.will_move(self.sim_clock)
+                shielded = snake.shield_timer > 0
+                if moving:
+                    # Built after the previous snake moved, so each bot sees the current board
+                    with profiler.span("build_move_context"):
+                        context = build_move_context(snake, self.food, self.traps, opponent)
+                    # The span name is only formatted when someone is profiling
+                    with profiler.span(f"decide:{bot.name}") if profiler.enabled else NULL_SPAN:
+                        budget = self.search_budget() if isinstance(bot, AnytimeBot) else None
+                        if self.memory_guard is None:
+                            move = call_decide_move(bot, snake, self.food, self.traps, opponent, context, budget)
+                        else:
+                            try:
+                                move = self.memory_guard.call(bot.name, call_decide_move, bot, snake, self.food,
+                                                              self.traps, opponent, context, budget)
+                            except MemoryCapExceeded as e:
+                                self.forfeit(snake, str(e))
+                                return
+                    if move in self.VALID_DIRECTIONS:
+                        snake.change_direction(move)
+                with profiler.span("Snake.update"):
+                    snake.update(self.sim_clock)
+                moved = moved or moving
+                shield_ended = shield_ended or (shielded and snake.shield_timer <= 0)
+                # Headless ticks run back to back, leaving a ponder thread no time before the next decision
+                if moving and isinstance(bot, AnytimeBot) and not self.headless and self.config.decision_nodes is None:
+                    bot.start_pondering(snake, self.food, self.traps, opponent)
+        
+        checked_self = moved or self.self_collision_pending()
+        if checked_self:
+            with profiler.span("check_self_collisions"):
+                self.check_self_collisions()
+        if moved:
+            with profiler.span("check_food_and_trap_collisions"):
+                self.check_food_and_trap_collisions()
+        checked_contact = moved or shield_ended or self.snake_contact
+        if checked_contact:
+            with profiler.span("handle_snake_on_snake_collision"):
+                self.snake_contact = self.handle_snake_on_snake_collision()
+
+        for snake in [self.snake1, self.snake2]:
+            if snake.alive and snake.length < 1:
+                snake.alive = False
+                snake.death_time = self.game_time
+
+        if self.tracer is not None and (checked_self or checked_contact):
+            self.tracer.record(self, self.contact_flags if checked_contact else 0)
+        if self.recorder is not None:
+            self.recorder.capture(self)
+
+        if self.check_round_end():
+            self.handle_round_end()
+            
+    def forfeit(self, snake: Snake, reason: str) -> None:
+        """End the whole match at once, with `snake`'s bot losing"""
+        snake.alive = False
+        snake.death_time = self.game_time
+        winner = self.snake2 if snake is self.snake1 else self.snake1
+        self.final_winner = winner.agent_id
+        self.forfeit_reason = reason
+        self.game_state = GameState.GAME_OVER
+        self.stop_pondering()
+        if self.tracer is not None:
+            self.tracer.record(self, FORFEIT)
+
+    def search_budget(self) -> SearchBudget:
+        """An anytime bot's budget for one decision, in nodes if the config fixes them"""
+        if self.config.decision_nodes is not None:
+            return SearchBudget(nodes=self.config.decision_nodes)
+        return SearchBudget(time.perf_counter() + self.config.decision_budget)
+
+    def stop_pondering(self) -> None:
+        """End the anytime bots' ponder threads once the match is over"""
+        for bot in (self.bot1, self.bot2):
+            if isinstance(bot, AnytimeBot):
+                bot.close()
+
+    @property
+    def game_time(self) -> float:
+        return self.sim_clock.now
+
+    def round_elapsed(self) -> float:
+        """Game seconds since the current round started, exact to the tick"""
+        return self.sim_clock.since(self.round_start_time)
+
+    def check_round_end(self) -> bool:
+        time_up = self.round_elapsed() >= self.config.round_time
+        one_or_both_dead = not self.snake1.alive or not self.snake2.alive
+        no_food = len(self.food.positions) == 0
+        return time_up or one_or_both_dead or no_food
+    
+    def handle_round_end(self) -> None:
+        if self.snake1.alive and not self.snake2.alive:
+            self.round_winner = self.snake1.agent_id
+        elif self.snake2.alive and not self.snake1.alive:
+            self.round_winner = self.snake2.agent_id
+        else:
+            if self.snake1.score > self.snake2.score: self.round_winner = self.snake1.agent_id
+            elif self.snake2.score > self.snake1.score: self.round_winner = self.snake2.agent_id
+            else: self.round_winner = None
+        
+        if self.recorder is not None:
+            self.recorder.end_round(self)
+        if self.tracer is not None:
+            self.tracer.end_round(self)
+        
+        self.tournament.record_round(
+            winner=self.round_winner,
+            snake1_score=self.snake1.score,
+            snake2_score=self.snake2.score,
+            snake1_traps_hit=self.snake1.traps_hit,
+            snake2_traps_hit=self.snake2.traps_hit,
+            snake1_collisions=self.snake1.collisions,
+            snake2_collisions=self.snake2.collisions
+        )
+
+        # Check tournament status
+        if self.tournament.is_tournament_over():
+            self.final_winner = self.tournament.get_winner()
+            if not self.headless:
+                self.show_final_results()
+                self.tournament.save_to_csv()
+            if self.profiler.enabled:
+                self.profiler.dump_json()
+            self.game_state = GameState.GAME_OVER
+            self.stop_pondering()
+        else:
+            self.game_state = GameState.ROUND_OVER
+    
+    def show_final_results(self) -> None:
+        print("\n=== FINAL TOURNAMENT RESULTS ===")
+        print(f"Total Rounds Played: {self.tournament.rounds_played}")
+        print(f"Draws: {self.tournament.draw_rounds}")
+        
+        s1_name = self.tournament.snake1_name
+        s2_name = self.tournament.snake2_name
+        
+        print(f"\n--- {s1_name} ---")
+        print(f"Wins: {self.tournament.snake1_wins}")
+        print(f"Total Score: {self.tournament.total_snake1_apples}")
+        print(f"Traps Hit: {self.tournament.snake1_total_traps}")
+        
+        print(f"\n--- {s2_name} ---")
+        print(f"Wins: {self.tournament.snake2_wins}")
+        print(f"Total Score: {self.tournament.total_snake2_apples}")
+        print(f"Traps Hit: {self.tournament.snake2_total_traps}")
+        
+        if self.final_winner:
+            print(f"\n>>> TOURNAMENT WINNER: {self.final_winner}! <<<")
+        else:
+            print("\n>>> TOURNAMENT ENDED IN A DRAW! <<<")
+        
+  
+    def step_to_next_move(self) -> None:
+        """Advance ticks until a snake moves or the round ends"""
+        def heads():
+            return [snake.segments[0] if snake.segments else None
+                    for snake in (self.snake1, self.snake2)]
+
+        start = heads()
+        while self.game_state == GameState.PLAYING:
+            self.update()
+            if heads() != start:
+                break
+
+    def play_headless(self) -> None:
+        """Play a whole tournament as fast as possible without rendering"""
+        self.start_new_tournament()
+        while self.game_state != GameState.GAME_OVER:
+            if self.game_state == GameState.ROUND_OVER:
+                self.start_next_round()
+            self.update()
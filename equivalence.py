@@ -0,0 +1,302 @@
+import argparse
+import importlib
+import json
+import random
+import time
+from typing import List, Dict, Optional, Tuple
+
+from bot import Bot, call_decide_move
+from clock import TickClock
+from engine import MatchEngine, FPS
+from game_settings import GameState, GameConfig, GRID_WIDTH, GRID_HEIGHT, build_move_context
+from replay import snapshot
+
+Script = Dict[int, int]  # clock tick -> turn code (1 left, 2 right); missing ticks go straight
+
+
+def turn(direction: Tuple[int, int], code: int) -> Tuple[int, int]:
+    dx, dy = direction
+    if code == 1:
+        return (dy, -dx)
+    if code == 2:
+        return (-dy, dx)
+    return direction
+
+
+class ScriptedBot(Bot):
+    """Plays a turn script looked up by simulation tick
+
+    Moves depend only on the tick and the board, never on how often or when
+    between moves the engine asks, so engines that call decide_move at
+    different rates still see the same game. Turns are relative to the
+    current heading (never a reversal). Only walls are steered around, by
+    taking the first of straight/left/right that stays on the board, so
+    traps, self-collisions and snake-on-snake contacts all get exercised.
+    """
+
+    def __init__(self, script: Script, clock: TickClock, name: str = "ScriptedBot"):
+        super().__init__(name)
+        self.script = script
+        self.clock = clock
+
+    def decide_move(self, snake, food, traps, opponent=None):
+        head_x, head_y = snake.segments[0]
+        wanted = self.script.get(self.clock.ticks, 0)
+        for code in (wanted, 0, 1, 2):
+            move = turn(snake.direction, code)
+            if 0 <= head_x + move[0] < GRID_WIDTH and 0 <= head_y + move[1] < GRID_HEIGHT:
+                return move
+        return snake.direction
+
+
+class ReferenceEngine(MatchEngine):
+    """MatchEngine with the original per-tick update: every bot and collision check runs every tick"""
+
+    def update(self) -> None:
+        if self.game_state != GameState.PLAYING: return
+        self.sim_clock.advance()
+
+        for snake, bot, opponent in [(self.snake1, self.bot1, self.snake2), (self.snake2, self.bot2, self.snake1)]:
+            if snake.alive:
+                context = build_move_context(snake, self.food, self.traps, opponent)
+                move = call_decide_move(bot, snake, self.food, self.traps, opponent, context)
+                if move in self.VALID_DIRECTIONS:
+                    snake.change_direction(move)
+                snake.update(self.sim_clock)
+
+        self.check_self_collisions()
+        self.check_food_and_trap_collisions()
+        self.handle_snake_on_snake_collision()
+
+        for snake in [self.snake1, self.snake2]:
+            if snake.alive and snake.length < 1:
+                snake.alive = False
+                snake.death_time = self.game_time
+
+        if self.check_round_end():
+            self.handle_round_end()
+
+
+def full_state(game: MatchEngine) -> Dict:
+    """Everything that can influence later ticks or the result, for exact comparison
+
+    next_direction is left out: it is only read on a move tick, and engines
+    may legitimately ask bots (and so set it) at different times in between.
+    """
+    state = snapshot(game)
+    for snake, entry in zip((game.snake1, game.snake2), state["snakes"]):
+        entry.update({
+            "move_timer": snake.move_timer,
+            "shield_timer": snake.shield_timer,
+            "grow": snake.grow,
+            "death_time": snake.death_time,
+            "consecutive_collisions": snake.consecutive_collisions,
+            "last_collision_time": snake.last_collision_time,
+            "colliding_with_self": bool(getattr(snake, "is_colliding_with_self", False)),
+        })
+    state.update({
+        "ticks": game.sim_clock.ticks,
+        "game_state": game.game_state.name,
+        "round": game.tournament.current_round,
+        "round_winner": game.round_winner,
+        "final_winner": game.final_winner,
+        "wins": [game.tournament.snake1_wins, game.tournament.snake2_wins],
+    })
+    return state
+
+
+def first_difference(a, b, path: str = "") -> Optional[Tuple[str, object, object]]:
+    """(path, a value, b value) of the first mismatch between two nested states"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in sorted(set(a) | set(b)):
+            found = first_difference(a.get(key), b.get(key), f"{path}.{key}")
+            if found:
+                return found
+        return None
+    if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        for i, (x, y) in enumerate(zip(a, b)):
+            found = first_difference(x, y, f"{path}[{i}]")
+            if found:
+                return found
+        return None
+    return None if a == b else (path.lstrip("."), a, b)
+
+
+def random_script(seed: int, turn_rate: float = 0.05, config: Optional[GameConfig] = None) -> Tuple[Script, Script]:
+    """One turn script per side covering the longest possible tournament"""
+    config = config or GameConfig()
+    rng = random.Random(seed)
+    horizon = config.max_rounds * config.round_time * FPS + FPS
+    return tuple({t: rng.choice((1, 2)) for t in range(horizon) if rng.random() < turn_rate} for _ in range(2))
+
+
+def new_game(engine_class: type, seed: int, scripts: Tuple[Script, Script]) -> MatchEngine:
+    random.seed(seed)
+    game = engine_class()
+    game.bot1 = ScriptedBot(scripts[0], game.sim_clock, "Scripted1")
+    game.bot2 = ScriptedBot(scripts[1], game.sim_clock, "Scripted2")
+    game.start_new_tournament()
+    return game
+
+
+def step(game: MatchEngine) -> None:
+    if game.game_state == GameState.ROUND_OVER:
+        game.start_next_round()
+    game.update()
+
+
+def compare(reference: type, candidate: type, seed: int,
+            scripts: Tuple[Script, Script], max_ticks: Optional[int] = None) -> Optional[Dict]:
+    """Run both engines in lockstep; None if they agree to the end (or max_ticks), else the first divergence"""
+    # Layouts come from the global RNG, so each engine keeps its own stream of it
+    ref = new_game(reference, seed, scripts)
+    ref_rng = random.getstate()
+    cand = new_game(candidate, seed, scripts)
+    cand_rng = random.getstate()
+    found = first_difference(full_state(ref), full_state(cand))
+    while found is None and ref.game_state != GameState.GAME_OVER:
+        if max_ticks is not None and ref.sim_clock.ticks >= max_ticks:
+            break
+        random.setstate(ref_rng)
+        step(ref)
+        ref_rng = random.getstate()
+        random.setstate(cand_rng)
+        step(cand)
+        cand_rng = random.getstate()
+        found = first_difference(full_state(ref), full_state(cand))
+    if found is None:
+        return None
+    path, expected, actual = found
+    return {"seed": seed, "tick": ref.sim_clock.ticks, "round": ref.tournament.current_round,
+            "field": path, "reference": expected, "candidate": actual}
+
+
+def ddmin(items: List, fails) -> List:
+    """Zeller's delta debugging: a 1-minimal subset of items for which fails() still holds"""
+    n = 2
+    while len(items) >= 2:
+        subsets = [items[len(items) * i // n:len(items) * (i + 1) // n] for i in range(n)]
+        reduced = False
+        for i, subset in enumerate(subsets):
+            complement = [item for j, other in enumerate(subsets) if j != i for item in other]
+            if fails(subset):
+                items, n, reduced = subset, 2, True
+                break
+            if n > 2 and fails(complement):
+                items, n, reduced = complement, max(n - 1, 2), True
+                break
+        if not reduced:
+            if n >= len(items):
+                break
+            n = min(len(items), n * 2)
+    if len(items) == 1 and fails([]):
+        return []
+    return items
+
+
+def shrink(reference: type, candidate: type, seed: int,
+           scripts: Tuple[Script, Script], divergence: Dict) -> Tuple[Tuple[Script, Script], Dict]:
+    """Reduce the turn scripts to a minimal set of turns that still makes the engines diverge"""
+    # Turns after the divergence cannot have caused it
+    turns = [(side, tick, code) for side, script in enumerate(scripts)
+             for tick, code in sorted(script.items()) if tick <= divergence["tick"]]
+    last = {"divergence": divergence}
+
+    def build(subset) -> Tuple[Script, Script]:
+        built = ({}, {})
+        for side, tick, code in subset:
+            built[side][tick] = code
+        return built
+
+    def fails(subset) -> bool:
+        # A reproducer is only interesting if it diverges no later than the original
+        found = compare(reference, candidate, seed, build(subset), divergence["tick"])
+        if found is not None:
+            last["divergence"] = found
+        return found is not None
+
+    minimal = ddmin(turns, fails)
+    fails(minimal)  # leave the reported divergence matching the returned scripts
+    return build(minimal), last["divergence"]
+
+
+def throughput(engine_class: type, seeds: List[int], scripts: Dict[int, Tuple[Script, Script]]) -> float:
+    """Simulated ticks per wall second over full tournaments"""
+    ticks = 0
+    elapsed = 0.0
+    for seed in seeds:
+        game = new_game(engine_class, seed, scripts[seed])
+        start = time.perf_counter()
+        while game.game_state != GameState.GAME_OVER:
+            step(game)
+        elapsed += time.perf_counter() - start
+        ticks += game.sim_clock.ticks
+    return ticks / elapsed if elapsed else 0.0
+
+
+def load_engine(spec: str) -> type:
+    """An engine class from 'module:Class'"""
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def rerun(reference: type, candidate: type, path: str) -> bool:
+    """Replay a saved reproducer; True if the engines now agree on it"""
+    with open(path, encoding="utf-8") as file:
+        saved = json.load(file)
+    scripts = tuple({int(t): c for t, c in script.items()} for script in saved["scripts"])
+    divergence = compare(reference, candidate, saved["seed"], scripts)
+    if divergence is None:
+        print(f"{path}: engines agree")
+        return True
+    print(f"{path}: still diverges at tick {divergence['tick']} on {divergence['field']}: "
+          f"reference {divergence['reference']!r}, candidate {divergence['candidate']!r}")
+    return False
+
+
+def check(reference: type, candidate: type, seeds: List[int], turn_rate: float = 0.05,
+          out: Optional[str] = None) -> bool:
+    """Compare on every seed, shrink the first divergence, and report the candidate's speedup"""
+    scripts = {seed: random_script(seed, turn_rate) for seed in seeds}
+    for seed in seeds:
+        divergence = compare(reference, candidate, seed, scripts[seed])
+        if divergence is None:
+            continue
+        print(f"Seed {seed}: diverged at tick {divergence['tick']} (round {divergence['round']}) "
+              f"on {divergence['field']}")
+        minimal, divergence = shrink(reference, candidate, seed, scripts[seed], divergence)
+        print(f"Minimal reproducer: {sum(map(len, minimal))} turns, diverges at tick {divergence['tick']} "
+              f"on {divergence['field']}: reference {divergence['reference']!r}, candidate {divergence['candidate']!r}")
+        if out:
+            with open(out, "w", encoding="utf-8") as file:
+                json.dump({"seed": seed, "scripts": [{str(t): c for t, c in s.items()} for s in minimal],
+                           "divergence": divergence}, file, indent=2, default=str)
+            print(f"Reproducer written to {out}")
+        return False
+
+    print(f"Equivalent on {len(seeds)} seeds")
+    ref_rate = throughput(reference, seeds, scripts)
+    cand_rate = throughput(candidate, seeds, scripts)
+    print(f"Reference: {ref_rate:,.0f} ticks/s  Candidate: {cand_rate:,.0f} ticks/s  "
+          f"Speedup: {cand_rate / ref_rate:.2f}x")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check an engine rewrite against the reference tick by tick")
+    parser.add_argument("--candidate", default="engine:MatchEngine", help="module:Class of the engine under test")
+    parser.add_argument("--reference", default="equivalence:ReferenceEngine")
+    parser.add_argument("--seeds", type=int, default=20)
+    parser.add_argument("--base-seed", type=int, default=0)
+    parser.add_argument("--turn-rate", type=float, default=0.05, help="chance per tick of a scripted turn")
+    parser.add_argument("--out", default="divergence.json", help="where to write a shrunk reproducer")
+    parser.add_argument("--repro", default=None, help="only rerun a reproducer written by an earlier run")
+    args = parser.parse_args()
+
+    reference, candidate = load_engine(args.reference), load_engine(args.candidate)
+    if args.repro:
+        ok = rerun(reference, candidate, args.repro)
+    else:
+        seeds = list(range(args.base_seed, args.base_seed + args.seeds))
+        ok = check(reference, candidate, seeds, args.turn_rate, args.out)
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,115 @@
+import argparse
+import glob
+import os
+import shutil
+import subprocess
+import multiprocessing
+from typing import List, Tuple
+
+from game_settings import WIDTH, HEIGHT, GREEN, YELLOW, DARK_GREEN, DARK_YELLOW, WHITE, GameState, Snake
+from replay import load_replay, apply_snapshot
+
+TITLE_SECONDS = 1.0
+
+
+class FrameSink:
+    """Receives RGB frames and writes them to an ffmpeg pipe or a PNG sequence"""
+
+    def __init__(self, path: str, fps: int, fmt: str):
+        self.path = path
+        self.fps = fps
+        self.count = 0
+        self.process = None
+        if fmt != "png" and shutil.which("ffmpeg"):
+            self.process = subprocess.Popen(
+                ["ffmpeg", "-y", "-loglevel", "error",
+                 "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{WIDTH}x{HEIGHT}", "-r", str(fps),
+                 "-i", "-"] + (["-pix_fmt", "yuv420p"] if fmt == "mp4" else []) + [path],
+                stdin=subprocess.PIPE
+            )
+        else:
+            # No encoder available: fall back to numbered images next to the target
+            self.path = os.path.splitext(path)[0]
+            os.makedirs(self.path, exist_ok=True)
+
+    def write(self, surface) -> None:
+        import pygame
+        if self.process is not None:
+            self.process.stdin.write(pygame.image.tostring(surface, "RGB"))
+        else:
+            pygame.image.save(surface, os.path.join(self.path, f"frame_{self.count:05d}.png"))
+        self.count += 1
+
+    def close(self) -> None:
+        if self.process is not None:
+            self.process.stdin.close()
+            self.process.wait()
+
+
+def render_replay(job: Tuple[str, str, int, float, str]) -> Tuple[str, int]:
+    """Render one replay file offscreen; runs in its own worker process"""
+    replay_path, out_path, fps, speed, fmt = job
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from main import SnakeGame
+
+    replay = load_replay(replay_path)
+    game = SnakeGame(headless=True)
+    game.game_state = GameState.PLAYING
+    name1, name2 = replay["bots"]
+    sink = FrameSink(out_path, fps, fmt)
+
+    for rnd in replay["rounds"]:
+        game.snake1 = Snake(GREEN, DARK_GREEN, 0, 0, name1)
+        game.snake2 = Snake(YELLOW, DARK_YELLOW, 0, 0, name2)
+
+        title = game.large_font.render(f"Round {rnd['round']}", True, WHITE)
+        for _ in range(int(TITLE_SECONDS * fps)):
+            game.screen.fill((0, 0, 0))
+            game.screen.blit(title, (WIDTH // 2 - title.get_width() // 2, HEIGHT // 3))
+            sink.write(game.screen)
+
+        frames = rnd["frames"]
+        if not frames:
+            continue
+        # Sample the latest recorded state at each output frame time
+        i = 0
+        end = frames[-1]["t"]
+        step = speed / fps
+        t = 0.0
+        while t <= end + step:
+            while i + 1 < len(frames) and frames[i + 1]["t"] <= t:
+                i += 1
+            apply_snapshot(game, frames[i])
+            game.draw()
+            sink.write(game.screen)
+            t += step
+
+    sink.close()
+    return sink.path, sink.count
+
+
+def export_all(paths: List[str], out_dir: str, fps: int = 30, speed: float = 1.0,
+               fmt: str = "mp4", workers: int = os.cpu_count() or 1) -> List[Tuple[str, int]]:
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = []
+    for path in paths:
+        stem = os.path.basename(path).split(".")[0]
+        jobs.append((path, os.path.join(out_dir, f"{stem}.{fmt}"), fps, speed, fmt))
+    # Fresh interpreters per worker: SDL state does not survive fork reliably
+    with multiprocessing.get_context("spawn").Pool(min(workers, len(jobs)) or 1) as pool:
+        return pool.map(render_replay, jobs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render recorded matches to video without a display")
+    parser.add_argument("replays", nargs="+", help="replay files or glob patterns (*.json.gz)")
+    parser.add_argument("--out", default="videos")
+    parser.add_argument("--format", choices=["mp4", "gif", "png"], default="mp4")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed multiplier")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    paths = [p for pattern in args.replays for p in sorted(glob.glob(pattern))]
+    for path, frames in export_all(paths, args.out, args.fps, args.speed, args.format, args.workers):
+        print(f"{path}: {frames} frames")
@@ -1,11 +1,14 @@
 from dataclasses import dataclass
 from enum import Enum, auto
-import pygame
-from typing import Tuple, List, Deque, Optional
+from typing import Tuple, List, Deque, Optional, Dict, TYPE_CHECKING
 from collections import deque
 import random
 import math
 
+if TYPE_CHECKING:
+    import pygame
+    from clock import TickClock
+
 # Constants
 WIDTH, HEIGHT = 800, 600
 GRID_SIZE = 20
@@ -14,6 +17,9 @@ GRID_HEIGHT = HEIGHT // GRID_SIZE
 SNAKE_SPEED = 10
 WALL_THICKNESS = 10
 
+# Bump whenever a rule change can alter match outcomes, invalidating cached results
+ENGINE_VERSION = "4"
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -52,19 +58,27 @@ class GameConfig:
     advantage_time: int = 5
     early_victory_diff: int = 30
     min_rounds_for_early_victory: int = 2
+    decision_budget: float = 0.005  # seconds an anytime bot may think per decision
+    # Search nodes per decision instead of seconds, so a seeded match replays exactly; disables pondering
+    decision_nodes: Optional[int] = None
+
+# About decision_budget's worth of LookaheadBot search, for matches that must be reproducible
+SEEDED_DECISION_NODES = 800
 
 class Direction:
     RIGHT = (1, 0)
     LEFT = (-1, 0)
     UP = (0, -1)
     DOWN = (0, 1)
+    ALL = ((1, 0), (-1, 0), (0, -1), (0, 1))
 
     @staticmethod
     def opposite(direction: Tuple[int, int]) -> Tuple[int, int]:
         return (-direction[0], -direction[1])
 
 class GameObject:
-    def draw(self, surface: pygame.Surface) -> None:
+    """Pure game state; draw() imports the pygame rendering layer on first use"""
+    def draw(self, surface: "pygame.Surface") -> None:
         raise NotImplementedError
 
 class Snake(GameObject):
@@ -110,18 +124,24 @@ class Snake(GameObject):
         # Fixed the deque slicing TypeError
         return [segment[:] for segment in list(self.segments)[1:]]
 
-    def update(self, dt:float) -> bool:
+    def will_move(self, clock: "TickClock") -> bool:
+        """Whether the next clock tick triggers a move"""
+        return clock.to_ticks(self.move_timer + clock.dt) >= clock.to_ticks(1.0 / self.speed)
+
+    def update(self, clock: "TickClock") -> bool:
+        """Advance one clock tick; timers are snapped to whole ticks so they never drift"""
         if not self.alive:
             return False
         
+        dt = clock.dt
         if self.shield_timer > 0:
-            self.shield_timer -= dt
+            self.shield_timer = clock.snap(self.shield_timer - dt)
             self.shield_flash = (self.shield_flash + dt * 10) % 1
 
-        self.move_timer += dt
-        move_interval = 1.0 / self.speed
+        moving = self.will_move(clock)
+        self.move_timer = clock.snap(self.move_timer + dt)
         
-        if self.move_timer >= move_interval:
+        if moving:
             self.move_timer = 0
             self.direction = self.next_direction
             
@@ -134,7 +154,7 @@ class Snake(GameObject):
             if (new_head[0] < 0 or new_head[0] >= GRID_WIDTH or
                 new_head[1] < 0 or new_head[1] >= GRID_HEIGHT):
                 self.alive = False
-                self.death_time = pygame.time.get_ticks() / 1000.0
+                self.death_time = clock.now
                 return False
 
             self.segments.appendleft(new_head)
@@ -150,7 +170,7 @@ class Snake(GameObject):
                     self.alive = False
                     self.self_collision = True
                     self.score = 0
-                    self.death_time = pygame.time.get_ticks() / 1000.0
+                    self.death_time = clock.now
                     return False
                 
         return True
@@ -163,60 +183,9 @@ class Snake(GameObject):
         if new_dir != Direction.opposite(self.direction):
             self.next_direction = new_dir
 
-    def draw(self, surface: pygame.Surface) -> None:
-        for i, segment in enumerate(self.segments):
-            color = self.color_primary if i % 2 == 0 else self.color_secondary
-            pixel_x = segment[0] * GRID_SIZE + GRID_SIZE // 2
-            pixel_y = segment[1] * GRID_SIZE + GRID_SIZE // 2
-
-            if self.shield_timer > 0 and self.shield_flash < 0.5:
-                shield_color = SHIELD_BLUE
-                pygame.draw.circle(
-                    surface, shield_color,
-                    (pixel_x, pixel_y),
-                    GRID_SIZE//2 + 2, 2
-                )
-            
-            if i == 0:
-                cx, cy = pixel_x, pixel_y
-                half = GRID_SIZE // 2
-                if self.direction == (1, 0):
-                    points = [(cx + half, cy), (cx - half, cy - half), (cx - half, cy + half)]
-                elif self.direction == (-1, 0):
-                    points = [(cx - half, cy), (cx + half, cy - half), (cx + half, cy + half)]
-                elif self.direction == (0, -1):
-                    points = [(cx, cy - half), (cx - half, cy + half), (cx + half, cy + half)]
-                else:
-                    points = [(cx, cy + half), (cx - half, cy - half), (cx + half, cy - half)]
-
-                pygame.draw.polygon(surface, self.color_primary, points)
-
-                eye_size = GRID_SIZE // 5
-                pupil_size = eye_size // 2
-
-                if self.direction == (1, 0):
-                    left_eye_pos = (pixel_x - GRID_SIZE//4, pixel_y - GRID_SIZE//4)
-                    right_eye_pos = (pixel_x - GRID_SIZE//4, pixel_y + GRID_SIZE//4)
-                elif self.direction == (-1, 0):
-                    left_eye_pos = (pixel_x + GRID_SIZE//4, pixel_y - GRID_SIZE//4)
-                    right_eye_pos = (pixel_x + GRID_SIZE//4, pixel_y + GRID_SIZE//4)
-                elif self.direction == (0, 1):
-                    left_eye_pos = (pixel_x - GRID_SIZE//4, pixel_y - GRID_SIZE//4)
-                    right_eye_pos = (pixel_x + GRID_SIZE//4, pixel_y - GRID_SIZE//4)
-                else:
-                    left_eye_pos = (pixel_x - GRID_SIZE//4, pixel_y + GRID_SIZE//4)
-                    right_eye_pos = (pixel_x + GRID_SIZE//4, pixel_y + GRID_SIZE//4)
-
-                pygame.draw.circle(surface, WHITE, left_eye_pos, eye_size)
-                pygame.draw.circle(surface, WHITE, right_eye_pos, eye_size)
-                pygame.draw.circle(surface, BLACK, left_eye_pos, pupil_size)
-                pygame.draw.circle(surface, BLACK, right_eye_pos, pupil_size)
-            else:
-                pygame.draw.rect(
-                    surface,
-                    color,
-                    (segment[0] * GRID_SIZE, segment[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-                )
+    def draw(self, surface: "pygame.Surface") -> None:
+        from rendering import draw_snake
+        draw_snake(surface, self)
 
 class Food(GameObject):
     def __init__(self, num_foods: int = 1):
@@ -246,12 +215,9 @@ class Food(GameObject):
                 return True
         return False
 
-    def draw(self, surface: pygame.Surface) -> None:
-        for pos in self.positions:
-            pixel_x = pos[0] * GRID_SIZE + GRID_SIZE // 2
-            pixel_y = pos[1] * GRID_SIZE + GRID_SIZE // 2
-            pygame.draw.circle(surface, RED, (pixel_x, pixel_y), GRID_SIZE // 2 - 2)
-            pygame.draw.rect(surface, DARK_GREEN, (pixel_x - 2, pixel_y - GRID_SIZE // 2, 4, GRID_SIZE // 4))
+    def draw(self, surface: "pygame.Surface") -> None:
+        from rendering import draw_food
+        draw_food(surface, self)
 
 class Trap(GameObject):
     def __init__(self, num_traps: int = 3):
@@ -306,13 +272,9 @@ class Trap(GameObject):
                 return True
         return False
 
-    def draw(self, surface: pygame.Surface) -> None:
-        for pos in self.positions:
-            pixel_x = pos[0] * GRID_SIZE + GRID_SIZE // 2
-            pixel_y = pos[1] * GRID_SIZE + GRID_SIZE // 2
-            pygame.draw.circle(surface, PURPLE, (pixel_x, pixel_y), GRID_SIZE // 3)
-            pygame.draw.line(surface, BLACK, (pixel_x - GRID_SIZE // 4, pixel_y - GRID_SIZE // 4), (pixel_x + GRID_SIZE // 4, pixel_y + GRID_SIZE // 4), 3)
-            pygame.draw.line(surface, BLACK, (pixel_x + GRID_SIZE // 4, pixel_y - GRID_SIZE // 4), (pixel_x - GRID_SIZE // 4, pixel_y + GRID_SIZE // 4), 3)
+    def draw(self, surface: "pygame.Surface") -> None:
+        from rendering import draw_traps
+        draw_traps(surface, self)
 
 def get_distance(pos1: Tuple[int, int], pos2: Tuple[int, int]) -> float:
     return math.hypot(pos1[0] - pos2[0], pos1[1] - pos2[1])
@@ -371,4 +333,67 @@ def is_safe(snake: Snake, new_head_pos: List[int], other_snake: Optional[Snake],
     if tuple(new_head_pos) in traps.positions:
         return False
 
-    return True
\ No newline at end of file
+    return True
+
+@dataclass(frozen=True)
+class MoveContext:
+    """Read-only per-tick view of one snake's options, computed once by the engine"""
+    head: Tuple[int, int]
+    legal_moves: Tuple[Tuple[int, int], ...]
+    safe_moves: Tuple[Tuple[int, int], ...]
+    safe_mask: Tuple[bool, ...]  # aligned with Direction.ALL
+    nearest_food: Optional[Tuple[int, int]]
+    nearest_food_distance: float
+    move_food_distance: Dict[Tuple[int, int], float]  # nearest food from each legal move's cell
+    opponent_head_distance: Optional[float]
+    move_opponent_distance: Dict[Tuple[int, int], float]  # opponent head from each legal move's cell
+
+def build_move_context(snake: Snake, food: Food, traps: Trap, other_snake: Optional[Snake]) -> MoveContext:
+    """
+    Scan the four neighbour cells once with the same rules as is_safe
+    """
+    head = tuple(snake.segments[0])
+    legal_moves = tuple(m for m in Direction.ALL if m != Direction.opposite(snake.direction))
+
+    blocked = set(map(tuple, snake.segments))
+    if other_snake:
+        blocked.update(map(tuple, other_snake.segments))
+    blocked.update(traps.positions)
+
+    safe_mask = []
+    for move in Direction.ALL:
+        cell = (head[0] + move[0], head[1] + move[1])
+        safe_mask.append(move in legal_moves and
+                         0 <= cell[0] < GRID_WIDTH and 0 <= cell[1] < GRID_HEIGHT and
+                         cell not in blocked)
+    safe_moves = tuple(m for m, safe in zip(Direction.ALL, safe_mask) if safe)
+
+    nearest_food = None
+    nearest_food_distance = float('inf')
+    move_food_distance = {}
+    if food.positions:
+        nearest_food = min(food.positions, key=lambda pos: get_distance(head, pos))
+        nearest_food_distance = get_distance(head, nearest_food)
+        for move in legal_moves:
+            cell = (head[0] + move[0], head[1] + move[1])
+            move_food_distance[move] = min(get_distance(cell, pos) for pos in food.positions)
+
+    opponent_head_distance = None
+    move_opponent_distance = {}
+    if other_snake and other_snake.segments:
+        other_head = other_snake.segments[0]
+        opponent_head_distance = get_distance(head, other_head)
+        for move in legal_moves:
+            move_opponent_distance[move] = get_distance((head[0] + move[0], head[1] + move[1]), other_head)
+
+    return MoveContext(
+        head=head,
+        legal_moves=legal_moves,
+        safe_moves=safe_moves,
+        safe_mask=tuple(safe_mask),
+        nearest_food=nearest_food,
+        nearest_food_distance=nearest_food_distance,
+        move_food_distance=move_food_distance,
+        opponent_head_distance=opponent_head_distance,
+        move_opponent_distance=move_opponent_distance,
+    )
@@ -0,0 +1,288 @@
+import argparse
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from bot import Bot, GreedyBot
+from game_settings import GRID_WIDTH, GRID_HEIGHT, GameConfig, GameState, build_move_context
+from observation import ObservationEncoder, CHANNELS, SCALARS, DIRECTIONS
+
+INPUT_SIZE = len(CHANNELS) * GRID_HEIGHT * GRID_WIDTH + len(SCALARS)
+
+
+class MLPPolicy:
+    """Move logits from an ObservationEncoder grid and scalars; no hidden layer is a linear policy
+
+    Weights are (out, in) per layer, as in a torch Linear. The forward pass
+    multiplies them by the features column-wise, which OpenBLAS runs about
+    as fast per row for a batch of two as for one, and much faster for more.
+    """
+
+    def __init__(self, weights: List[Tuple[np.ndarray, np.ndarray]]):
+        self.weights = weights
+
+    @classmethod
+    def random(cls, hidden: int = 64, seed: int = 0) -> "MLPPolicy":
+        rng = np.random.default_rng(seed)
+        sizes = [INPUT_SIZE] + ([hidden] if hidden else []) + [len(DIRECTIONS)]
+        return cls([(rng.normal(0, 1 / np.sqrt(n_in), (n_out, n_in)).astype(np.float32),
+                     np.zeros(n_out, np.float32))
+                    for n_in, n_out in zip(sizes, sizes[1:])])
+
+    @classmethod
+    def load(cls, path: str) -> "MLPPolicy":
+        data = np.load(path)
+        layers = len(data.files) // 2
+        return cls([(data[f"w{i}"], data[f"b{i}"]) for i in range(layers)])
+
+    def save(self, path: str) -> None:
+        arrays = {}
+        for i, (w, b) in enumerate(self.weights):
+            arrays[f"w{i}"], arrays[f"b{i}"] = w, b
+        np.savez(path, **arrays)
+
+    def forward(self, inputs: np.ndarray) -> np.ndarray:
+        """(batch, INPUT_SIZE) float32 features to (batch, 4) logits in DIRECTIONS order"""
+        x = inputs.T
+        for i, (w, b) in enumerate(self.weights):
+            x = w @ x + b[:, None]
+            if i < len(self.weights) - 1:
+                np.maximum(x, 0.0, out=x)
+        return x.T
+
+
+class InferenceServer:
+    """Evaluates a policy for many concurrent bots in micro-batches on one thread
+
+    Bots submit() a feature vector and wait on the returned Future. The
+    server takes the first waiting request and keeps collecting until it has
+    max_batch of them, every registered client is waiting, or max_wait
+    seconds have passed. It then runs one forward pass over the whole batch
+    and scatters the rows back. A decision waits at most max_wait longer
+    than it would alone, and many matches share each matmul. Use it from
+    threads directly, or from asyncio via asyncio.wrap_future(). submit()
+    raises once the server is not running, and stop() fails every request
+    it has not answered.
+    """
+
+    def __init__(self, policy: MLPPolicy, max_batch: int = 64, max_wait: float = 0.001):
+        self.policy = policy
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests: "queue.Queue[Optional[Tuple[np.ndarray, Future]]]" = queue.Queue()
+        self.inputs = np.zeros((max_batch, INPUT_SIZE), np.float32)
+        self.batches = 0
+        self.evaluated = 0
+        self.clients = 0
+        self._clients_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._running_lock = threading.Lock()  # no submit() slips in behind stop()'s sentinel
+
+    def start(self) -> "InferenceServer":
+        with self._running_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._serve, name="inference", daemon=True)
+                self._thread.start()
+                self._running = True
+        return self
+
+    def stop(self) -> None:
+        with self._running_lock:
+            if self._thread is None:
+                return
+            self._running = False
+            self.requests.put(None)
+        self._thread.join()
+        self._thread = None
+        # Requests the server never reached, including any queued behind the sentinel
+        while True:
+            try:
+                item = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].set_exception(RuntimeError("inference server stopped"))
+
+    def __enter__(self) -> "InferenceServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def register(self) -> None:
+        """Announce a client, so a batch holding requests from all clients is not kept waiting"""
+        with self._clients_lock:
+            self.clients += 1
+
+    def unregister(self) -> None:
+        with self._clients_lock:
+            self.clients -= 1
+
+    def submit(self, features: np.ndarray) -> Future:
+        future: Future = Future()
+        with self._running_lock:
+            if not self._running:
+                raise RuntimeError("inference server is not running")
+            self.requests.put((features, future))
+        return future
+
+    def mean_batch(self) -> float:
+        return self.evaluated / self.batches if self.batches else 0.0
+
+    def _gather(self, first: Tuple[np.ndarray, Future]) -> Tuple[List[Future], bool]:
+        """Fill the input batch starting from `first`; also reports whether stop() was requested"""
+        futures = []
+        item: Optional[Tuple[np.ndarray, Future]] = first
+        deadline = time.perf_counter() + self.max_wait
+        while True:
+            features, future = item
+            # Copied in while the submitter is still blocked on its future
+            self.inputs[len(futures)] = features
+            futures.append(future)
+            if len(futures) == self.max_batch or len(futures) == self.clients:
+                return futures, False
+            try:
+                item = self.requests.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return futures, False
+                try:
+                    item = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    return futures, False
+            if item is None:
+                return futures, True
+
+    def _serve(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self.requests.get()
+            if first is None:
+                break
+            if not self._running:
+                # stop() was called; fail what is left up to its sentinel
+                first[1].set_exception(RuntimeError("inference server stopped"))
+                continue
+            futures, stopping = self._gather(first)
+            try:
+                logits = self.policy.forward(self.inputs[:len(futures)])
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.evaluated += len(futures)
+            for future, row in zip(futures, logits):
+                future.set_result(row.copy())
+
+
+class ModelBot(Bot):
+    """Plays the highest-logit safe move of an MLPPolicy, through a shared server if given one
+
+    A server answer that does not arrive within the server's max_wait plus
+    `budget` seconds, or a server that has stopped, falls back to the local
+    policy if there is one and to a safe move otherwise.
+    """
+
+    def __init__(self, policy: Optional[MLPPolicy] = None, server: Optional[InferenceServer] = None,
+                 name: str = "ModelBot", budget: float = GameConfig.decision_budget):
+        super().__init__(name)
+        if policy is None and server is None:
+            raise ValueError("ModelBot needs a policy or an inference server")
+        self.policy = policy
+        self.server = server
+        self.budget = budget
+        self.fallbacks = 0
+        if server is not None:
+            server.register()
+        self.encoder = ObservationEncoder()
+        self.features = np.zeros(INPUT_SIZE, np.float32)
+        self.decisions = 0
+
+    def decide_move(self, snake, food, traps, opponent=None, context=None):
+        context = context or build_move_context(snake, food, traps, opponent)
+        if not context.legal_moves:
+            return snake.direction
+        grid, scalars = self.encoder.encode(snake, food, traps, opponent)
+        grid_size = grid.size
+        self.features[:grid_size] = grid.reshape(-1)
+        self.features[grid_size:] = scalars
+        logits = None
+        if self.server is not None:
+            try:
+                logits = self.server.submit(self.features).result(timeout=self.server.max_wait + self.budget)
+            except (FutureTimeoutError, RuntimeError):
+                self.fallbacks += 1
+        if logits is None and self.policy is not None:
+            logits = self.policy.forward(self.features[None])[0]
+        self.decisions += 1
+        candidates = context.safe_moves or context.legal_moves
+        if logits is None:
+            return snake.direction if snake.direction in candidates else candidates[0]
+        return max(candidates, key=lambda move: logits[DIRECTIONS.index(move)])
+
+    def close(self) -> None:
+        """Stop counting as a client of the server once this bot's matches are over"""
+        if self.server is not None:
+            self.server.unregister()
+            self.server = None
+
+
+def benchmark(matches: int, policy: MLPPolicy, batched: bool, max_wait: float,
+              decisions: int = 500) -> Tuple[float, float]:
+    """Decisions per second of `matches` concurrent headless games; also the mean batch size"""
+    from engine import MatchEngine
+
+    server = InferenceServer(policy, max_batch=max(matches, 1), max_wait=max_wait).start() if batched else None
+    # Throughput, not latency: a generous budget keeps timeouts from turning decisions into fallbacks
+    bots = [ModelBot(policy if server is None else None, server, budget=1.0) for _ in range(matches)]
+
+    def play(bot: ModelBot) -> None:
+        # A fixed number of decisions each, however long the tournaments last
+        game = MatchEngine()
+        game.bot1 = bot
+        game.bot2 = GreedyBot()
+        game.start_new_tournament()
+        while bot.decisions < decisions:
+            if game.game_state == GameState.GAME_OVER:
+                game.start_new_tournament()
+            elif game.game_state == GameState.ROUND_OVER:
+                game.start_next_round()
+            game.update()
+        bot.close()
+
+    threads = [threading.Thread(target=play, args=(bot,)) for bot in bots]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    mean_batch = 0.0
+    if server is not None:
+        mean_batch = server.mean_batch()
+        server.stop()
+    return sum(bot.decisions for bot in bots) / elapsed, mean_batch
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of ModelBot with and without the batching server")
+    parser.add_argument("--matches", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--hidden", type=int, default=256, help="hidden units (0 for a linear policy)")
+    parser.add_argument("--weights", default=None, help=".npz saved by MLPPolicy.save (random if omitted)")
+    parser.add_argument("--max-wait", type=float, default=1.0, help="milliseconds a batch waits to fill")
+    parser.add_argument("--decisions", type=int, default=500, help="model decisions per match")
+    args = parser.parse_args()
+
+    policy = MLPPolicy.load(args.weights) if args.weights else MLPPolicy.random(args.hidden)
+    print(f"{'Matches':<8} {'Unbatched/s':>12} {'Batched/s':>10} {'Mean batch':>11}")
+    for n in args.matches:
+        plain, _ = benchmark(n, policy, False, args.max_wait / 1000, args.decisions)
+        batched, mean_batch = benchmark(n, policy, True, args.max_wait / 1000, args.decisions)
+        print(f"{n:<8} {plain:>12,.0f} {batched:>10,.0f} {mean_batch:>11.1f}")
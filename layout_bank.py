@@ -0,0 +1,177 @@
+import argparse
+import hashlib
+import json
+import random
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+from game_settings import GRID_WIDTH, GRID_HEIGHT, GameConfig, get_distance
+
+APPLE_COUNT = 40
+
+Position = Tuple[int, int]
+Layout = Tuple[Position, Position, List[Position], List[Position]]
+
+
+def mirror(pos: Position) -> Position:
+    """Reflect a cell across the vertical centre line of the board"""
+    return (GRID_WIDTH - 1 - pos[0], pos[1])
+
+
+def _random_cell(rng: random.Random, min_x: int = 1, max_x: int = GRID_WIDTH - 2) -> Position:
+    return (rng.randint(min_x, max_x), rng.randint(1, GRID_HEIGHT - 2))
+
+
+def generate_mirrored_layout(rng: random.Random, trap_count: int) -> Layout:
+    """Left half drawn at random, right half its mirror image"""
+    half = GRID_WIDTH // 2 - 1
+    s1 = _random_cell(rng, 1, GRID_WIDTH // 3)
+    s2 = mirror(s1)
+    taken = {s1, s2}
+
+    def mirrored_pairs(count: int) -> List[Position]:
+        cells = []
+        while len(cells) < count * 2:
+            pos = _random_cell(rng, 1, half)
+            if pos in taken:
+                continue
+            taken.update((pos, mirror(pos)))
+            cells.extend((pos, mirror(pos)))
+        return cells
+
+    apples = mirrored_pairs(APPLE_COUNT // 2)
+    traps = mirrored_pairs(trap_count // 2)
+    # The board has no self-mirrored cell, so an odd trap out is left to the fairness check
+    while len(traps) < trap_count:
+        pos = _random_cell(rng)
+        if pos not in taken:
+            taken.add(pos)
+            traps.append(pos)
+    return s1, s2, apples, traps
+
+
+def generate_random_layout(rng: random.Random, trap_count: int) -> Layout:
+    """Unconstrained layout in the style of generate_spawn_positions"""
+    s1 = _random_cell(rng, 1, GRID_WIDTH // 3)
+    s2 = _random_cell(rng, 2 * GRID_WIDTH // 3, GRID_WIDTH - 2)
+    taken = {s1, s2}
+    cells = []
+    while len(cells) < APPLE_COUNT + trap_count:
+        pos = _random_cell(rng)
+        if pos not in taken:
+            taken.add(pos)
+            cells.append(pos)
+    return s1, s2, cells[:APPLE_COUNT], cells[APPLE_COUNT:]
+
+
+def fairness_score(layout: Layout) -> float:
+    """0 when both spawns see the same apple pull and trap pressure, larger when lopsided"""
+    s1, s2, apples, traps = layout
+
+    def imbalance(cells: List[Position]) -> float:
+        if not cells:
+            return 0.0
+        pull1 = sum(1.0 / (1.0 + get_distance(s1, c)) for c in cells)
+        pull2 = sum(1.0 / (1.0 + get_distance(s2, c)) for c in cells)
+        return abs(pull1 - pull2) / (pull1 + pull2)
+
+    return imbalance(apples) + imbalance(traps)
+
+
+def validate_layout(layout: Layout) -> bool:
+    """All cells distinct and inside the walls, no trap next to a spawn"""
+    s1, s2, apples, traps = layout
+    cells = [s1, s2] + apples + traps
+    if len(set(cells)) != len(cells):
+        return False
+    if not all(1 <= x <= GRID_WIDTH - 2 and 1 <= y <= GRID_HEIGHT - 2 for x, y in cells):
+        return False
+    for spawn in (s1, s2):
+        if any(max(abs(spawn[0] - t[0]), abs(spawn[1] - t[1])) <= 1 for t in traps):
+            return False
+    return True
+
+
+def build_bank(path: str,
+               count: int,
+               trap_count: Optional[int] = None,
+               mode: str = "mirror",
+               max_unfairness: float = 0.05,
+               seed: int = 0) -> None:
+    """Generate `count` validated layouts into a memory-mapped uint8 array at `path`"""
+    trap_count = GameConfig().trap_count if trap_count is None else trap_count
+    generator = {"mirror": generate_mirrored_layout, "scored": generate_random_layout}[mode]
+    rng = random.Random(seed)
+    cells = 2 + APPLE_COUNT + trap_count
+
+    data = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=(count, cells, 2))
+    fairness = np.lib.format.open_memmap(_fairness_path(path), mode="w+", dtype=np.float32, shape=(count,))
+    attempts = 0
+    for i in range(count):
+        while True:
+            attempts += 1
+            layout = generator(rng, trap_count)
+            score = fairness_score(layout)
+            if validate_layout(layout) and score <= max_unfairness:
+                break
+        s1, s2, apples, traps = layout
+        data[i] = [s1, s2] + apples + traps
+        fairness[i] = score
+    data.flush()
+    fairness.flush()
+
+    meta = {
+        "count": count, "apples": APPLE_COUNT, "traps": trap_count,
+        "grid": [GRID_WIDTH, GRID_HEIGHT], "mode": mode,
+        "max_unfairness": max_unfairness, "seed": seed,
+    }
+    with open(_meta_path(path), "w", encoding="utf-8") as file:
+        json.dump(meta, file, indent=2)
+    print(f"Wrote {count} layouts to {path} ({attempts} generated, "
+          f"mean unfairness {float(np.mean(fairness)):.4f})")
+
+
+def _meta_path(path: str) -> str:
+    return path + ".json"
+
+
+def _fairness_path(path: str) -> str:
+    return path[:-4] + "_fairness.npy" if path.endswith(".npy") else path + "_fairness.npy"
+
+
+class LayoutBank:
+    """Read-only, memory-mapped bank of precomputed round layouts"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(_meta_path(path), encoding="utf-8") as file:
+            self.meta = json.load(file)
+        if self.meta["grid"] != [GRID_WIDTH, GRID_HEIGHT]:
+            raise ValueError(f"Layout bank {path} was built for a {self.meta['grid']} grid")
+        self.data = np.load(path, mmap_mode="r")
+        self.fairness = np.load(_fairness_path(path), mmap_mode="r")
+        self.apples = self.meta["apples"]
+        self.fingerprint = hashlib.sha256(json.dumps(self.meta, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def layout(self, index: int) -> Layout:
+        """Spawn 1, spawn 2, apples and traps of one layout"""
+        cells = [(int(x), int(y)) for x, y in self.data[index]]
+        apples_end = 2 + self.apples
+        return cells[0], cells[1], cells[2:apples_end], cells[apples_end:]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a bank of fair round layouts")
+    parser.add_argument("path", help="output .npy file")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--traps", type=int, default=None)
+    parser.add_argument("--mode", choices=["mirror", "scored"], default="mirror")
+    parser.add_argument("--max-unfairness", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    build_bank(args.path, args.count, args.traps, args.mode, args.max_unfairness, args.seed)
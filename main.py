@@ -1,76 +1,57 @@
+import os
 import pygame
 import sys
+import time
 from typing import Optional
 from game_settings import (
-    WIDTH, HEIGHT, GRID_SIZE, WALL_THICKNESS,  
-    GameState, GameConfig, Snake, Food, Trap,
-    generate_spawn_positions, BLACK, WHITE, GREEN,
-    YELLOW, RED, PURPLE, GRID_COLOR, WALL_COLOR
+    WIDTH, HEIGHT, GRID_SIZE,
+    GameState, BLACK, WHITE, GREEN, YELLOW, RED
 )
-from bot import RandomBot, GreedyBot, StrategicBot, CustomBot, UserBot
-from tournament import Tournament
+from engine import MatchEngine, FPS
+from clock import RealTimeClock
+from rendering import BoardRenderer, draw_background
+from profiler import Profiler
 
-class SnakeGame:
-    def __init__(self, bot_name1:str=None, bot_name2:str=None):
-        pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Snake Tournament")
+MAX_SPEED_FRAME_BUDGET = 0.014  # wall seconds of simulation per rendered frame at MAX speed
+
+# Spectating speed keys; None runs as many ticks as fit in the frame budget
+SPEED_KEYS = {pygame.K_1: 1, pygame.K_2: 2, pygame.K_3: 10, pygame.K_4: None}
+
+class SnakeGame(MatchEngine):
+    """Pygame window (or offscreen surface), input and drawing on top of MatchEngine"""
+    def __init__(self, bot_name1:str=None, bot_name2:str=None,
+                 profiler: Optional[Profiler] = None,
+                 headless: bool = False):
+        if headless:
+            # No window: render (if at all) to an offscreen surface
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            # Leave SIGTERM alone so worker pools can still terminate headless games
+            os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+            pygame.init()
+            self.screen = pygame.Surface((WIDTH, HEIGHT))
+        else:
+            pygame.init()
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            pygame.display.set_caption("Snake Tournament")
         self.clock = pygame.time.Clock()
         
         self.font = pygame.font.SysFont('Arial', 24)
         self.medium_font = pygame.font.SysFont('Arial', 36)
         self.large_font = pygame.font.SysFont('Arial', 60, bold=True)
+        self.small_font = pygame.font.SysFont('Courier New', 14)
         
-        self.config = GameConfig()
-        self.game_state = GameState.START
-        self.round_winner: Optional[str] = None
-        self.final_winner: Optional[str] = None
-        
-        # Initialize tournament tracking
-        self.tournament = Tournament(self.config)
-        
-        self.snake1: Optional[Snake] = None
-        self.snake2: Optional[Snake] = None
-        self.food: Optional[Food] = None
-        self.traps: Optional[Trap] = None
-    
-        self.bot1 = StrategicBot()
-        self.bot2 = GreedyBot()
-        
-        self.VALID_DIRECTIONS = {(0, 1), (0, -1), (1, 0), (-1, 0)}
-        self.reset_round()
-        
-    def start_new_tournament(self) -> None:
-        self.tournament = Tournament(self.config)
-        self.game_state = GameState.PLAYING
-        self.reset_round()
-
-    def start_next_round(self) -> None:
-        self.game_state = GameState.PLAYING
-        self.reset_round(swap_positions=True)
-    
-    def reset_round(self, swap_positions: bool = False) -> None:
-        spawn1, spawn2, layout = generate_spawn_positions()
-        
-        if swap_positions:
-            spawn1, spawn2 = spawn2, spawn1
-        
-        self.snake1 = Snake(GREEN, (0, 200, 0), *spawn1, self.bot1.name)
-        self.snake2 = Snake(YELLOW, (200, 200, 0), *spawn2, self.bot2.name)
+        # One scaled blit of an indexed cell array; None draws every object separately
+        self.board_renderer: Optional[BoardRenderer] = BoardRenderer()
         
-        # Add these two lines to fix the names
-        self.tournament.snake1_name = self.snake1.agent_id
-        self.tournament.snake2_name = self.snake2.agent_id
+        self.running = True
+        self.speed_multiplier: Optional[int] = 1
+        self.paused = False
+        self.step_requested = False
+        self.auto_advance = False
         
-        self.food = Food(0)
-        self.food.positions = layout.copy()
+        # The window paces ticks from the wall clock; rule timing still counts ticks
+        super().__init__(profiler, headless, None if headless else RealTimeClock(FPS))
         
-        all_segments = self.snake1.segments + self.snake2.segments
-        self.traps = Trap(self.config.trap_count)
-        self.traps.spawn_multiple(self.config.trap_count, all_segments, self.food.positions)
-        
-        self.round_start_time = pygame.time.get_ticks() / 1000.0
-    
     def handle_events(self) -> None:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -78,48 +59,25 @@ class SnakeGame:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     if self.game_state == GameState.GAME_OVER:
-                        self.quit_game()
+                        self.running = False
                     elif self.game_state == GameState.ROUND_OVER:
                         self.start_next_round()
                     elif self.game_state == GameState.START:
                         self.start_new_tournament()
+                elif event.key in SPEED_KEYS:
+                    self.speed_multiplier = SPEED_KEYS[event.key]
+                elif event.key == pygame.K_p:
+                    self.paused = not self.paused
+                elif event.key == pygame.K_n and self.paused:
+                    self.step_requested = True
             
 
     def quit_game(self) -> None:
         pygame.quit()
         sys.exit()
         
-    def check_self_collisions(self):
-        current_time = pygame.time.get_ticks() / 1000.0
-        
-        for snake in [self.snake1, self.snake2]:
-            if not snake.alive:
-                continue
-                
-            head = snake.get_head_position()
-            body = snake.get_body_positions()
-            
-            # Check if head hit body
-            if any(tuple(head) == tuple(segment) for segment in body):
-                if not hasattr(snake, 'self_collision_start_time'):
-                    snake.self_collision_start_time = current_time
-                    snake.self_collision_delay = 3.0  # 3 second delay
-                    snake.is_colliding_with_self = True
-                    
-                # Check if delay has passed
-                if current_time - snake.self_collision_start_time >= snake.self_collision_delay:
-                    snake.alive = False
-                    snake.score = 0
-                    snake.death_time = current_time
-            else:
-                # Only try to delete if attributes exist
-                if hasattr(snake, 'is_colliding_with_self'):
-                    delattr(snake, 'is_colliding_with_self')
-                if hasattr(snake, 'self_collision_start_time'):
-                    delattr(snake, 'self_collision_start_time')
-
     def draw_collision_warnings(self):
-        current_time = pygame.time.get_ticks() / 1000.0
+        current_time = self.game_time
         
         for snake in [self.snake1, self.snake2]:
             if hasattr(snake, 'is_colliding_with_self') and snake.is_colliding_with_self:
@@ -140,157 +98,6 @@ class SnakeGame:
                         2
                     )
 
-    def handle_snake_on_snake_collision(self) -> None:
-        if not self.snake1.alive or not self.snake2.alive: return
-        if self.snake1.shield_timer > 0 or self.snake2.shield_timer > 0: return
-
-        head1 = self.snake1.get_head_position()
-        head2 = self.snake2.get_head_position()
-        
-        body1_set = set(tuple(seg) for seg in self.snake1.get_body_positions())
-        body2_set = set(tuple(seg) for seg in self.snake2.get_body_positions())
-
-        # Check collision types
-        head_to_head = tuple(head1) == tuple(head2)
-        s1_hits_s2_body = tuple(head1) in body2_set
-        s2_hits_s1_body = tuple(head2) in body1_set
-
-        current_time = pygame.time.get_ticks() / 1000.0
-    
-        # Apply penalties based on collision type
-        if head_to_head or s1_hits_s2_body or s2_hits_s1_body:
-            if current_time - self.snake1.last_collision_time < 1.0:
-                self.snake1.consecutive_collisions += 1
-            if current_time - self.snake2.last_collision_time < 1.0:
-                self.snake2.consecutive_collisions += 1
-                
-            self.snake1.last_collision_time = current_time
-            self.snake2.last_collision_time = current_time
-            # Check for 3 consecutive collisions
-            if (self.snake1.consecutive_collisions >= 3 or 
-                self.snake2.consecutive_collisions >= 3):
-                self.snake1.score = 0
-                self.snake2.score = 0
-                return
-            
-            len1, len2 = self.snake1.length, self.snake2.length
-            penalty = self.config.collision_segment_penalty
-
-            if len1 < len2:
-                self.apply_collision_penalty(self.snake1, penalty)
-            elif len2 < len1:
-                self.apply_collision_penalty(self.snake2, penalty)
-            else:
-                self.apply_collision_penalty(self.snake1, penalty//2)
-                self.apply_collision_penalty(self.snake2, penalty//2)
-              
-    def apply_collision_penalty(self, snake: Snake, penalty: int):
-        """Helper method to apply collision penalties"""
-        for _ in range(penalty):
-            if len(snake.segments) > 0:
-                if snake.grow > 0:
-                    snake.grow -= 1
-                else:
-                    snake.segments.pop()
-                snake.length -= 1
-        snake.shield_timer = self.config.shield_duration
-        snake.score = max(0, snake.score - penalty)  # Deduct score
-        snake.collisions += 1
-                
-    def check_food_and_trap_collisions(self) -> None:
-        for snake in [self.snake1, self.snake2]:
-            if not snake.alive: continue
-            if self.food.check_collision(snake.get_head_position()):
-                snake.grow += self.config.growth_per_food
-                snake.score += 1
-            self.traps.check_collision(snake)
-
-    def start_new_game(self) -> None:
-        self.game_state = GameState.PLAYING
-        self.reset_round()
-    
-    def update(self) -> None:
-        if self.game_state != GameState.PLAYING: return
-
-        for snake, bot, opponent in [(self.snake1, self.bot1, self.snake2), (self.snake2, self.bot2, self.snake1)]:
-            if snake.alive:
-                move = bot.decide_move(snake, self.food, self.traps, opponent)
-                if move in self.VALID_DIRECTIONS:
-                    snake.change_direction(move)
-                snake.update(self.clock.get_time() / 1000.0)
-        
-        self.check_self_collisions()
-        self.check_food_and_trap_collisions()
-        self.handle_snake_on_snake_collision()
-
-        for snake in [self.snake1, self.snake2]:
-            if snake.alive and snake.length < 1:
-                snake.alive = False
-                snake.death_time = pygame.time.get_ticks() / 1000.0
-
-        if self.check_round_end():
-            self.handle_round_end()
-            
-    def check_round_end(self) -> bool:
-        elapsed = (pygame.time.get_ticks() / 1000.0) - self.round_start_time
-        time_up = elapsed >= self.config.round_time
-        one_or_both_dead = not self.snake1.alive or not self.snake2.alive
-        no_food = len(self.food.positions) == 0
-        return time_up or one_or_both_dead or no_food
-    
-    def handle_round_end(self) -> None:
-        if self.snake1.alive and not self.snake2.alive:
-            self.round_winner = self.snake1.agent_id
-        elif self.snake2.alive and not self.snake1.alive:
-            self.round_winner = self.snake2.agent_id
-        else:
-            if self.snake1.score > self.snake2.score: self.round_winner = self.snake1.agent_id
-            elif self.snake2.score > self.snake1.score: self.round_winner = self.snake2.agent_id
-            else: self.round_winner = None
-        
-        self.tournament.record_round(
-            winner=self.round_winner,
-            snake1_score=self.snake1.score,
-            snake2_score=self.snake2.score,
-            snake1_traps_hit=self.snake1.traps_hit,
-            snake2_traps_hit=self.snake2.traps_hit,
-            snake1_collisions=self.snake1.collisions,
-            snake2_collisions=self.snake2.collisions
-        )
-
-        # Check tournament status
-        if self.tournament.is_tournament_over():
-            self.final_winner = self.tournament.get_winner()
-            self.show_final_results()
-            self.tournament.save_to_csv()
-            self.game_state = GameState.GAME_OVER
-        else:
-            self.game_state = GameState.ROUND_OVER
-    
-    def show_final_results(self) -> None:
-        print("\n=== FINAL TOURNAMENT RESULTS ===")
-        print(f"Total Rounds Played: {len(self.tournament.results)}")
-        print(f"Draws: {self.tournament.draw_rounds}")
-        
-        s1_name = self.tournament.snake1_name
-        s2_name = self.tournament.snake2_name
-        
-        print(f"\n--- {s1_name} ---")
-        print(f"Wins: {self.tournament.snake1_wins}")
-        print(f"Total Score: {self.tournament.total_snake1_apples}")
-        print(f"Traps Hit: {self.tournament.snake1_total_traps}")
-        
-        print(f"\n--- {s2_name} ---")
-        print(f"Wins: {self.tournament.snake2_wins}")
-        print(f"Total Score: {self.tournament.total_snake2_apples}")
-        print(f"Traps Hit: {self.tournament.snake2_total_traps}")
-        
-        if self.final_winner:
-            print(f"\n>>> TOURNAMENT WINNER: {self.final_winner}! <<<")
-        else:
-            print("\n>>> TOURNAMENT ENDED IN A DRAW! <<<")
-        
-  
     def draw(self) -> None:
         self.screen.fill(BLACK)
         if self.game_state == GameState.PLAYING:
@@ -301,24 +108,52 @@ class SnakeGame:
             self.draw_round_over()
         elif self.game_state in (GameState.GAME_OVER, GameState.DRAW):
             self.draw_tournament_end()
-        pygame.display.flip()
+        if self.profiler.enabled and self.profiler.overlay:
+            self.draw_profiler_overlay()
+        if not self.headless:
+            with self.profiler.span("draw.flip"):
+                pygame.display.flip()
         
     def draw_playing(self) -> None:
-        for x in range(0, WIDTH, GRID_SIZE):
-            pygame.draw.line(self.screen, GRID_COLOR, (x, 0), (x, HEIGHT))
-        for y in range(0, HEIGHT, GRID_SIZE):
-            pygame.draw.line(self.screen, GRID_COLOR, (0, y), (WIDTH, y))
-        pygame.draw.rect(self.screen, WALL_COLOR, (0, 0, WIDTH, HEIGHT), WALL_THICKNESS)
-        
-        self.food.draw(self.screen)
-        self.traps.draw(self.screen)
-        self.snake1.draw(self.screen)
-        self.snake2.draw(self.screen)
-        
-        elapsed_game_time = (pygame.time.get_ticks() / 1000.0) - self.round_start_time
-        time_left = max(0, self.config.round_time - elapsed_game_time)
-        time_text = f"Time: {int(time_left)}s"
-        self.draw_scores(time_text)
+        profiler = self.profiler
+        if self.board_renderer is not None:
+            with profiler.span("draw.board"):
+                self.board_renderer.draw(self.screen, self.food, self.traps, [self.snake1, self.snake2])
+        else:
+            with profiler.span("draw.grid"):
+                draw_background(self.screen)
+            with profiler.span("draw.food"):
+                self.food.draw(self.screen)
+            with profiler.span("draw.traps"):
+                self.traps.draw(self.screen)
+            with profiler.span("draw.snakes"):
+                self.snake1.draw(self.screen)
+                self.snake2.draw(self.screen)
+        
+        with profiler.span("draw.scores"):
+            time_left = max(0, self.config.round_time - self.round_elapsed())
+            time_text = f"Time: {int(time_left)}s"
+            self.draw_scores(time_text)
+            self.draw_speed_indicator()
+
+    def draw_speed_indicator(self) -> None:
+        if self.paused:
+            label = "PAUSED (N: step)"
+        elif self.speed_multiplier is None:
+            label = "MAX"
+        elif self.speed_multiplier != 1:
+            label = f"x{self.speed_multiplier}"
+        else:
+            return
+        surface = self.font.render(label, True, WHITE)
+        self.screen.blit(surface, (10, HEIGHT - 30))
+
+    def draw_profiler_overlay(self) -> None:
+        y = 40
+        for line in self.profiler.overlay_lines():
+            surface = self.small_font.render(line, True, WHITE)
+            self.screen.blit(surface, (10, y))
+            y += 16
     
     def draw_scores(self, time_text: str) -> None:
         score1_text = f"{self.snake1.agent_id}: {self.snake1.score}"
@@ -375,19 +210,53 @@ class SnakeGame:
         final_score_surface = self.font.render(final_score_text, True, WHITE)
 
         instruction = self.font.render("Press SPACE to Exit", True, WHITE)
+        if self.forfeit_reason:
+            reason = self.small_font.render(f"Forfeit: {self.forfeit_reason}", True, RED)
+            self.screen.blit(reason, (WIDTH//2 - reason.get_width()//2, HEIGHT//2 + 50))
         
         self.screen.blit(title, (WIDTH//2 - title.get_width()//2, HEIGHT//4))
         self.screen.blit(winner_text, (WIDTH//2 - winner_text.get_width()//2, HEIGHT//2 - 70))
         self.screen.blit(final_score_surface, (WIDTH//2 - final_score_surface.get_width()//2, HEIGHT//2))
         self.screen.blit(instruction, (WIDTH//2 - instruction.get_width()//2, HEIGHT//2 + 100))
         
+    def advance_simulation(self) -> None:
+        """Run the simulation ticks due this frame according to the spectating speed"""
+        if self.auto_advance:
+            if self.game_state == GameState.ROUND_OVER:
+                self.start_next_round()
+            elif self.game_state == GameState.GAME_OVER:
+                self.running = False
+                return
+
+        if self.paused or self.game_state != GameState.PLAYING:
+            # Wall time spent off the board is not owed to the simulation
+            self.sim_clock.resync()
+            if self.paused and self.step_requested:
+                self.step_requested = False
+                self.step_to_next_move()
+            return
+
+        if self.speed_multiplier is None:
+            deadline = time.perf_counter() + MAX_SPEED_FRAME_BUDGET
+            while self.game_state == GameState.PLAYING and time.perf_counter() < deadline:
+                self.update()
+            self.sim_clock.resync()
+        else:
+            for _ in range(self.sim_clock.due_ticks(self.speed_multiplier)):
+                if self.game_state != GameState.PLAYING:
+                    break
+                self.update()
+
     def run(self) -> None:
-        while True:
+        self.running = True
+        while self.running:
             self.handle_events()
-            self.update()
+            self.advance_simulation()
             self.draw()
-            self.clock.tick(60)
+            self.clock.tick(FPS)
 
 if __name__ == "__main__":
-    game = SnakeGame()
-    game.run()
\ No newline at end of file
+    profiling = "--profile" in sys.argv
+    game = SnakeGame(profiler=Profiler(enabled=profiling, overlay=profiling, dump_path="profile.json"))
+    game.run()
+    game.quit_game()
\ No newline at end of file
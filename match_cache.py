@@ -0,0 +1,58 @@
+import hashlib
+import json
+import sqlite3
+from dataclasses import asdict
+from typing import Dict, Optional
+from game_settings import GameConfig, ENGINE_VERSION
+
+
+def fingerprint_file(path: str) -> str:
+    """Content hash of a bot file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def config_fingerprint(config: GameConfig) -> str:
+    """Hash of the rule set and engine version a match is played under"""
+    payload = json.dumps({"engine": ENGINE_VERSION, "config": asdict(config)}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MatchCache:
+    """Persistent cache of match outcomes keyed by bot hashes, config and seed"""
+
+    def __init__(self, path: str = "match_cache.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS match_cache (key TEXT PRIMARY KEY, result TEXT NOT NULL)"
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(bot1_hash: str, bot2_hash: str, config_hash: str, seed: int) -> str:
+        # Order matters: bot1 always takes the first spawn of the first round
+        return f"{bot1_hash}:{bot2_hash}:{config_hash}:{seed}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        row = self.conn.execute("SELECT result FROM match_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, result: Dict) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO match_cache (key, result) VALUES (?, ?)",
+                (key, json.dumps(result))
+            )
+
+    def close(self) -> None:
+        self.conn.close()
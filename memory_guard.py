@@ -0,0 +1,82 @@
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+MIB = 1024 * 1024
+
+
+class MemoryCapExceeded(Exception):
+    """A bot went over its memory cap; the match is forfeited"""
+
+    def __init__(self, bot_name: str, used: int, cap: int):
+        super().__init__(f"{bot_name} exceeded the memory cap: {used / MIB:.2f} MiB used, "
+                         f"{cap / MIB:.1f} MiB allowed")
+        self.bot_name = bot_name
+        self.used = used
+        self.cap = cap
+
+
+@dataclass
+class BotMemory:
+    retained: int = 0  # bytes allocated inside the bot's calls and still alive
+    peak: int = 0  # highest retained + in-call usage seen
+    baseline: int = 0  # retained after construction, the start of growth
+    calls: int = 0
+
+    def report(self) -> Dict[str, int]:
+        return {"peak": self.peak, "growth": self.retained - self.baseline, "calls": self.calls}
+
+
+class MemoryGuard:
+    """Attributes traced allocations to the bot whose code made them, and caps them
+
+    Every call into a bot runs through call(), which reads tracemalloc's
+    counters before and after: what the call kept is added to the bot's
+    retained total, and its transient peak on top of that is the bot's
+    footprint. Memory freed later (a cache evicted in another call) is
+    credited to whichever call frees it. Allocations from AnytimeBot ponder
+    threads are not attributed. Tracing slows allocation-heavy code, so only
+    attach a guard when memory is being watched.
+    """
+
+    def __init__(self, cap_mb: Optional[float] = None):
+        self.cap = int(cap_mb * MIB) if cap_mb else None
+        self.bots: Dict[str, BotMemory] = {}
+        self._owns_tracing = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+
+    def stop(self) -> None:
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def call(self, bot_name: str, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run fn on behalf of a bot, charging it the memory; raises MemoryCapExceeded"""
+        usage = self.bots.setdefault(bot_name, BotMemory())
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = fn(*args, **kwargs)
+        current, peak = tracemalloc.get_traced_memory()
+        usage.peak = max(usage.peak, usage.retained + peak - before)
+        usage.retained += current - before
+        usage.calls += 1
+        if self.cap is not None and usage.peak > self.cap:
+            raise MemoryCapExceeded(bot_name, usage.peak, self.cap)
+        return result
+
+    def construct(self, bot_name: str, bot_class: Callable[[], T]) -> T:
+        """Instantiate a bot under the guard; what its constructor keeps is its baseline"""
+        try:
+            return self.call(bot_name, bot_class)
+        finally:
+            usage = self.bots[bot_name]
+            usage.baseline = usage.retained
+            usage.calls = 0
+
+    def report(self, bot_name: str) -> Dict[str, int]:
+        return self.bots.get(bot_name, BotMemory()).report()
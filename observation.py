@@ -0,0 +1,211 @@
+from collections import deque
+from typing import Deque, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from game_settings import GRID_WIDTH, GRID_HEIGHT, GameConfig, Direction, Snake, Food, Trap
+
+# Grid planes, from the point of view of the snake being encoded
+CHANNELS = (
+    "own_head", "own_body",
+    "opp_head", "opp_body",
+    "food", "traps",
+    "own_shield", "opp_shield",
+)
+OWN_HEAD, OWN_BODY, OPP_HEAD, OPP_BODY, FOOD, TRAPS, OWN_SHIELD, OPP_SHIELD = range(len(CHANNELS))
+CELL_CHANNELS = (OWN_HEAD, OWN_BODY, OPP_HEAD, OPP_BODY, FOOD, TRAPS)
+HEAD_CHANNELS = (OWN_HEAD, OPP_HEAD)  # by side: the encoded snake, then its opponent
+BODY_CHANNELS = (OWN_BODY, OPP_BODY)
+
+SCALARS = (
+    "own_length", "opp_length",
+    "own_score", "opp_score",
+    "own_shield_time", "opp_shield_time",
+    "own_alive", "opp_alive",
+    "dir_right", "dir_left", "dir_up", "dir_down",
+)
+DIRECTIONS = (Direction.RIGHT, Direction.LEFT, Direction.UP, Direction.DOWN)
+
+BOARD_CELLS = GRID_WIDTH * GRID_HEIGHT
+MAX_SCORE = 40.0  # apples per round layout
+
+State = Tuple[Snake, Food, Trap, Optional[Snake]]
+
+
+# Cell codes of the int8 board rendered by cell_codes(), from the encoded snake's point of view
+CELL_EMPTY = 0
+CELL_OWN_HEAD = 1
+CELL_OWN_BODY = 2
+CELL_OPP_HEAD = 3
+CELL_OPP_BODY = 4
+CELL_FOOD = 5
+CELL_TRAP = 6
+# Later entries win where planes overlap: a head drawn over a body over a trap over food
+CELL_CODE_ORDER = ((FOOD, CELL_FOOD), (TRAPS, CELL_TRAP), (OPP_BODY, CELL_OPP_BODY), (OPP_HEAD, CELL_OPP_HEAD),
+                   (OWN_BODY, CELL_OWN_BODY), (OWN_HEAD, CELL_OWN_HEAD))
+
+
+def _on_board(cell: Tuple[int, int]) -> bool:
+    return 0 <= cell[0] < GRID_WIDTH and 0 <= cell[1] < GRID_HEIGHT
+
+
+class ObservationEncoder:
+    """Fixed-shape grid tensor plus scalar features, updated in place from engine state
+
+    Each batch slot remembers what it last encoded and only writes the
+    cells that changed. Snakes are diffed at their ends, since a move adds
+    a head and usually drops a tail, and food and traps are compared as
+    lists before any cell is touched. Body planes are backed by per-cell
+    segment counts so overlapping segments clear correctly.
+    """
+
+    def __init__(self, batch_size: int = 1, config: Optional[GameConfig] = None):
+        self.batch_size = batch_size
+        self.config = config or GameConfig()
+        self.grid = np.zeros((batch_size, len(CHANNELS), GRID_HEIGHT, GRID_WIDTH), np.float32)
+        self.scalars = np.zeros((batch_size, len(SCALARS)), np.float32)
+        # Per slot and side (own, opponent): segments as last encoded, and body segment counts per cell
+        self._segments: List[List[Deque[Tuple[int, int]]]] = [
+            [deque(), deque()] for _ in range(batch_size)
+        ]
+        self._body_counts = np.zeros((batch_size, 2, GRID_HEIGHT, GRID_WIDTH), np.int16)
+        self._positions: List[List[List]] = [[[], []] for _ in range(batch_size)]  # food, traps
+        self._shielded = np.zeros((batch_size, 2), bool)
+
+    @property
+    def grid_shape(self) -> Tuple[int, int, int]:
+        return self.grid.shape[1:]
+
+    def reset(self) -> None:
+        self.grid.fill(0.0)
+        self.scalars.fill(0.0)
+        self._shielded.fill(False)
+        self._body_counts.fill(0)
+        for slot in range(self.batch_size):
+            self._segments[slot] = [deque(), deque()]
+            self._positions[slot] = [[], []]
+
+    def _sync_positions(self, slot: int, which: int, channel: int, positions: List) -> None:
+        old = self._positions[slot][which]
+        if positions == old:
+            return
+        plane = self.grid[slot, channel]
+        new_cells = set(map(tuple, positions))
+        old_cells = set(map(tuple, old))
+        for x, y in old_cells - new_cells:
+            if _on_board((x, y)):
+                plane[y, x] = 0.0
+        for x, y in new_cells - old_cells:
+            if _on_board((x, y)):
+                plane[y, x] = 1.0
+        self._positions[slot][which] = list(positions)
+
+    def _add_body(self, slot: int, side: int, cell: Tuple[int, int]) -> None:
+        if _on_board(cell):
+            x, y = cell
+            self._body_counts[slot, side, y, x] += 1
+            self.grid[slot, BODY_CHANNELS[side], y, x] = 1.0
+
+    def _remove_body(self, slot: int, side: int, cell: Tuple[int, int]) -> None:
+        if _on_board(cell):
+            x, y = cell
+            counts = self._body_counts[slot, side]
+            counts[y, x] -= 1
+            if counts[y, x] == 0:
+                self.grid[slot, BODY_CHANNELS[side], y, x] = 0.0
+
+    def _set_head(self, slot: int, side: int, old: Optional[Tuple[int, int]], new: Optional[Tuple[int, int]]) -> None:
+        if old == new:
+            return
+        plane = self.grid[slot, HEAD_CHANNELS[side]]
+        if old is not None and _on_board(old):
+            plane[old[1], old[0]] = 0.0
+        if new is not None and _on_board(new):
+            plane[new[1], new[0]] = 1.0
+
+    def _sync_snake(self, slot: int, side: int, segments) -> None:
+        prev = self._segments[slot][side]
+        n = len(segments)
+        old_head = prev[0] if prev else None
+        new_head = tuple(segments[0]) if n else None
+        # Moves since the last encode: the old head is now `moved` cells down the body
+        moved = None
+        if prev and n:
+            for k in range(min(n, 3)):
+                if tuple(segments[k]) == old_head:
+                    kept = n - k
+                    if kept <= len(prev) and tuple(segments[-1]) == prev[kept - 1]:
+                        moved = k
+                    break
+        if moved is None:
+            # New round, respawn or a large jump: redraw this snake
+            for cell in list(prev)[1:]:
+                self._remove_body(slot, side, cell)
+            fresh = deque(tuple(segment) for segment in segments)
+            for cell in list(fresh)[1:]:
+                self._add_body(slot, side, cell)
+            self._segments[slot][side] = fresh
+        else:
+            # The old head and any cells passed through join the body; the tail end leaves it
+            for _ in range(len(prev) - (n - moved)):
+                self._remove_body(slot, side, prev.pop())
+            for k in range(moved, 0, -1):
+                cell = tuple(segments[k - 1])
+                self._add_body(slot, side, prev[0])
+                prev.appendleft(cell)
+        self._set_head(slot, side, old_head, new_head)
+
+    def _sync_shield(self, slot: int, side: int, channel: int, shielded: bool) -> None:
+        if self._shielded[slot, side] != shielded:
+            self.grid[slot, channel].fill(1.0 if shielded else 0.0)
+            self._shielded[slot, side] = shielded
+
+    def encode(self,
+               snake: Snake,
+               food: Food,
+               traps: Trap,
+               opponent: Optional[Snake] = None,
+               slot: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """Encode one game state into `slot` and return views of its grid and scalars"""
+        self._sync_snake(slot, 0, snake.segments)
+        self._sync_snake(slot, 1, opponent.segments if opponent is not None else ())
+        self._sync_positions(slot, 0, FOOD, food.positions)
+        self._sync_positions(slot, 1, TRAPS, traps.positions)
+        self._sync_shield(slot, 0, OWN_SHIELD, snake.shield_timer > 0)
+        self._sync_shield(slot, 1, OPP_SHIELD, opponent is not None and opponent.shield_timer > 0)
+
+        scalars = self.scalars[slot]
+        shield_duration = self.config.shield_duration
+        scalars[0] = snake.length / BOARD_CELLS
+        scalars[2] = snake.score / MAX_SCORE
+        scalars[4] = max(0.0, snake.shield_timer) / shield_duration
+        scalars[6] = 1.0 if snake.alive else 0.0
+        if opponent is not None:
+            scalars[1] = opponent.length / BOARD_CELLS
+            scalars[3] = opponent.score / MAX_SCORE
+            scalars[5] = max(0.0, opponent.shield_timer) / shield_duration
+            scalars[7] = 1.0 if opponent.alive else 0.0
+        else:
+            scalars[1] = scalars[3] = scalars[5] = scalars[7] = 0.0
+        for i, direction in enumerate(DIRECTIONS):
+            scalars[8 + i] = 1.0 if snake.direction == direction else 0.0
+
+        return self.grid[slot], scalars
+
+    def cell_codes(self, slot: int = 0, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """The slot's cell planes as one GRID_HEIGHT x GRID_WIDTH int8 board of CELL_* codes"""
+        if out is None:
+            out = np.empty((GRID_HEIGHT, GRID_WIDTH), np.int8)
+        out.fill(CELL_EMPTY)
+        grid = self.grid[slot]
+        for channel, code in CELL_CODE_ORDER:
+            out[grid[channel] > 0] = code
+        return out
+
+    def encode_batch(self, states: Sequence[State]) -> Tuple[np.ndarray, np.ndarray]:
+        """Encode several games, one per slot, and return views of the filled batch"""
+        if len(states) > self.batch_size:
+            raise ValueError(f"{len(states)} states do not fit a batch of {self.batch_size}")
+        for slot, (snake, food, traps, opponent) in enumerate(states):
+            self.encode(snake, food, traps, opponent, slot)
+        return self.grid[:len(states)], self.scalars[:len(states)]
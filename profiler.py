@@ -0,0 +1,101 @@
+import json
+import time
+from collections import deque
+from typing import Dict, Deque, List, Optional
+
+
+class _NullSpan:
+    """Shared no-op span handed out while profiling is disabled"""
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """Named timing spans aggregated into rolling per-phase statistics"""
+
+    def __init__(self,
+                 enabled: bool = False,
+                 window: int = 120,
+                 overlay: bool = False,
+                 dump_path: Optional[str] = None):
+        self.enabled = enabled
+        self.window = window
+        self.overlay = overlay
+        self.dump_path = dump_path
+        self.samples: Dict[str, Deque[float]] = {}
+        self.counts: Dict[str, int] = {}
+        self.totals: Dict[str, float] = {}
+
+    def span(self, name: str):
+        """Context manager timing one phase; free when profiling is off"""
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, seconds: float) -> None:
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+            self.counts[name] = 0
+            self.totals[name] = 0.0
+        samples.append(seconds)
+        self.counts[name] += 1
+        self.totals[name] += seconds
+
+    def reset(self) -> None:
+        self.samples.clear()
+        self.counts.clear()
+        self.totals.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Rolling mean/p95/max over the last `window` samples plus lifetime totals, in ms"""
+        result = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[name] = {
+                "count": self.counts[name],
+                "total_ms": self.totals[name] * 1000.0,
+                "mean_ms": sum(ordered) / len(ordered) * 1000.0,
+                "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000.0,
+                "max_ms": ordered[-1] * 1000.0,
+            }
+        return result
+
+    def overlay_lines(self) -> List[str]:
+        stats = self.stats()
+        return [f"{name:<32} {s['mean_ms']:6.3f} ms  p95 {s['p95_ms']:6.3f}"
+                for name, s in sorted(stats.items(), key=lambda item: -item[1]["mean_ms"])]
+
+    def dump_json(self, path: Optional[str] = None) -> None:
+        """Write the current per-phase statistics to a JSON file"""
+        path = path or self.dump_path
+        if path is None:
+            return
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.stats(), file, indent=2)
+        print(f"Profile saved to {path}")
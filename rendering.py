@@ -0,0 +1,173 @@
+from typing import List
+
+import numpy as np
+import pygame
+
+from game_settings import (
+    WIDTH, HEIGHT, GRID_SIZE, GRID_WIDTH, GRID_HEIGHT, WALL_THICKNESS,
+    BLACK, WHITE, RED, DARK_GREEN, PURPLE, SHIELD_BLUE, GRID_COLOR, WALL_COLOR,
+    Snake, Food, Trap
+)
+
+
+def draw_snake_head(surface: pygame.Surface, snake: Snake) -> None:
+    """Pointed head with eyes, facing the snake's direction"""
+    segment = snake.segments[0]
+    pixel_x = segment[0] * GRID_SIZE + GRID_SIZE // 2
+    pixel_y = segment[1] * GRID_SIZE + GRID_SIZE // 2
+    cx, cy = pixel_x, pixel_y
+    half = GRID_SIZE // 2
+    if snake.direction == (1, 0):
+        points = [(cx + half, cy), (cx - half, cy - half), (cx - half, cy + half)]
+    elif snake.direction == (-1, 0):
+        points = [(cx - half, cy), (cx + half, cy - half), (cx + half, cy + half)]
+    elif snake.direction == (0, -1):
+        points = [(cx, cy - half), (cx - half, cy + half), (cx + half, cy + half)]
+    else:
+        points = [(cx, cy + half), (cx - half, cy - half), (cx + half, cy - half)]
+
+    pygame.draw.polygon(surface, snake.color_primary, points)
+
+    eye_size = GRID_SIZE // 5
+    pupil_size = eye_size // 2
+
+    if snake.direction == (1, 0):
+        left_eye_pos = (pixel_x - GRID_SIZE//4, pixel_y - GRID_SIZE//4)
+        right_eye_pos = (pixel_x - GRID_SIZE//4, pixel_y + GRID_SIZE//4)
+    elif snake.direction == (-1, 0):
+        left_eye_pos = (pixel_x + GRID_SIZE//4, pixel_y - GRID_SIZE//4)
+        right_eye_pos = (pixel_x + GRID_SIZE//4, pixel_y + GRID_SIZE//4)
+    elif snake.direction == (0, 1):
+        left_eye_pos = (pixel_x - GRID_SIZE//4, pixel_y - GRID_SIZE//4)
+        right_eye_pos = (pixel_x + GRID_SIZE//4, pixel_y - GRID_SIZE//4)
+    else:
+        left_eye_pos = (pixel_x - GRID_SIZE//4, pixel_y + GRID_SIZE//4)
+        right_eye_pos = (pixel_x + GRID_SIZE//4, pixel_y + GRID_SIZE//4)
+
+    pygame.draw.circle(surface, WHITE, left_eye_pos, eye_size)
+    pygame.draw.circle(surface, WHITE, right_eye_pos, eye_size)
+    pygame.draw.circle(surface, BLACK, left_eye_pos, pupil_size)
+    pygame.draw.circle(surface, BLACK, right_eye_pos, pupil_size)
+
+
+def draw_snake(surface: pygame.Surface, snake: Snake) -> None:
+    for i, segment in enumerate(snake.segments):
+        color = snake.color_primary if i % 2 == 0 else snake.color_secondary
+        pixel_x = segment[0] * GRID_SIZE + GRID_SIZE // 2
+        pixel_y = segment[1] * GRID_SIZE + GRID_SIZE // 2
+
+        if snake.shield_timer > 0 and snake.shield_flash < 0.5:
+            shield_color = SHIELD_BLUE
+            pygame.draw.circle(
+                surface, shield_color,
+                (pixel_x, pixel_y),
+                GRID_SIZE//2 + 2, 2
+            )
+        
+        if i == 0:
+            draw_snake_head(surface, snake)
+        else:
+            pygame.draw.rect(
+                surface,
+                color,
+                (segment[0] * GRID_SIZE, segment[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+            )
+
+
+def draw_food(surface: pygame.Surface, food: Food) -> None:
+    for pos in food.positions:
+        pixel_x = pos[0] * GRID_SIZE + GRID_SIZE // 2
+        pixel_y = pos[1] * GRID_SIZE + GRID_SIZE // 2
+        pygame.draw.circle(surface, RED, (pixel_x, pixel_y), GRID_SIZE // 2 - 2)
+        pygame.draw.rect(surface, DARK_GREEN, (pixel_x - 2, pixel_y - GRID_SIZE // 2, 4, GRID_SIZE // 4))
+
+
+def draw_traps(surface: pygame.Surface, traps: Trap) -> None:
+    for pos in traps.positions:
+        pixel_x = pos[0] * GRID_SIZE + GRID_SIZE // 2
+        pixel_y = pos[1] * GRID_SIZE + GRID_SIZE // 2
+        pygame.draw.circle(surface, PURPLE, (pixel_x, pixel_y), GRID_SIZE // 3)
+        pygame.draw.line(surface, BLACK, (pixel_x - GRID_SIZE // 4, pixel_y - GRID_SIZE // 4), (pixel_x + GRID_SIZE // 4, pixel_y + GRID_SIZE // 4), 3)
+        pygame.draw.line(surface, BLACK, (pixel_x + GRID_SIZE // 4, pixel_y - GRID_SIZE // 4), (pixel_x - GRID_SIZE // 4, pixel_y + GRID_SIZE // 4), 3)
+
+
+# Palette indices of the indexed board; 0 is transparent so the background shows through
+EMPTY, FOOD_CELL, TRAP_CELL, SNAKE1_A, SNAKE1_B, SNAKE2_A, SNAKE2_B = range(7)
+
+
+def draw_background(surface: pygame.Surface) -> None:
+    """Grid lines and walls"""
+    for x in range(0, WIDTH, GRID_SIZE):
+        pygame.draw.line(surface, GRID_COLOR, (x, 0), (x, HEIGHT))
+    for y in range(0, HEIGHT, GRID_SIZE):
+        pygame.draw.line(surface, GRID_COLOR, (0, y), (WIDTH, y))
+    pygame.draw.rect(surface, WALL_COLOR, (0, 0, WIDTH, HEIGHT), WALL_THICKNESS)
+
+
+class BoardRenderer:
+    """Draws the whole board with one scaled blit of a GRID_WIDTH x GRID_HEIGHT indexed array
+
+    Food, traps and body segments are written into a uint8 cell array whose
+    values index a palette; only the snake heads are drawn as sprites on top,
+    so frame cost does not grow with snake length. A flashing shield tints
+    the snake's alternate segments instead of ringing every segment.
+    """
+
+    def __init__(self):
+        self.cells = np.zeros((GRID_WIDTH, GRID_HEIGHT), np.uint8)  # surfarray order: [x, y]
+        self.palette = [BLACK, RED, PURPLE, BLACK, BLACK, BLACK, BLACK] + [BLACK] * 249
+        self.small = pygame.Surface((GRID_WIDTH, GRID_HEIGHT), depth=8)
+        self.large = pygame.Surface((GRID_WIDTH * GRID_SIZE, GRID_HEIGHT * GRID_SIZE), depth=8)
+        self.large.set_colorkey(EMPTY)
+        self.background = pygame.Surface((WIDTH, HEIGHT))
+        self.background.fill(BLACK)
+        draw_background(self.background)
+
+    def _mark(self, positions, index) -> None:
+        if not positions:
+            return
+        xy = np.asarray(positions, np.intp).reshape(-1, 2)
+        on_board = (xy[:, 0] >= 0) & (xy[:, 0] < GRID_WIDTH) & (xy[:, 1] >= 0) & (xy[:, 1] < GRID_HEIGHT)
+        xy = xy[on_board]
+        if isinstance(index, np.ndarray):
+            index = index[on_board]
+        self.cells[xy[:, 0], xy[:, 1]] = index
+
+    def _rasterise(self, food: Food, traps: Trap, snakes: List[Snake], heads: bool = False) -> None:
+        """Fill the cell array and palette, and blit them into the one-pixel-per-cell surface"""
+        cells = self.cells
+        cells.fill(EMPTY)
+        self._mark(food.positions, FOOD_CELL)
+        self._mark(traps.positions, TRAP_CELL)
+        start = 0 if heads else 1
+        for side, snake in enumerate(snakes):
+            first = SNAKE1_A if side == 0 else SNAKE2_A
+            shielded = snake.shield_timer > 0 and snake.shield_flash < 0.5
+            self.palette[first] = snake.color_primary
+            self.palette[first + 1] = SHIELD_BLUE if shielded else snake.color_secondary
+            count = len(snake.segments)
+            if count > start:
+                # Alternate primary/secondary along the body, as the per-segment renderer does
+                parity = np.arange(start, count, dtype=np.uint8) % 2
+                self._mark(list(snake.segments)[start:], first + parity)
+
+        self.small.set_palette(self.palette)
+        pygame.surfarray.blit_array(self.small, cells)
+
+    def draw(self, surface: pygame.Surface, food: Food, traps: Trap, snakes: List[Snake]) -> None:
+        self._rasterise(food, traps, snakes)
+        self.large.set_palette(self.palette)
+        pygame.transform.scale(self.small, self.large.get_size(), self.large)
+        surface.blit(self.background, (0, 0))
+        surface.blit(self.large, (0, 0))
+
+        for snake in snakes:
+            if snake.segments:
+                draw_snake_head(surface, snake)
+
+    def draw_scaled(self, surface: pygame.Surface, rect: pygame.Rect,
+                    food: Food, traps: Trap, snakes: List[Snake]) -> None:
+        """Thumbnail of the board in `rect`: heads are plain cells and there is no grid"""
+        self._rasterise(food, traps, snakes, heads=True)
+        surface.blit(pygame.transform.scale(self.small, rect.size), rect)
+        pygame.draw.rect(surface, WALL_COLOR, rect, 1)
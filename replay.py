@@ -0,0 +1,111 @@
+import gzip
+import json
+from collections import deque
+from typing import Dict, List, Optional
+
+from game_settings import Snake
+
+
+def snake_state(snake: Snake) -> Dict:
+    return {
+        "segments": [list(segment) for segment in snake.segments],
+        "direction": list(snake.direction),
+        "score": snake.score,
+        "length": snake.length,
+        "alive": snake.alive,
+        "shield": round(max(0.0, snake.shield_timer), 3),
+        "traps_hit": snake.traps_hit,
+        "collisions": snake.collisions,
+    }
+
+
+def snapshot(game) -> Dict:
+    """Full drawable state of a running round"""
+    return {
+        "t": round(game.round_elapsed(), 4),
+        "snakes": [snake_state(game.snake1), snake_state(game.snake2)],
+        "food": [list(pos) for pos in game.food.positions],
+        "traps": [list(pos) for pos in game.traps.positions],
+    }
+
+
+class MatchRecorder:
+    """Records one snapshot per state change plus food/trap/collision/death events"""
+
+    def __init__(self):
+        self.bots: List[str] = []
+        self.rounds: List[Dict] = []
+        self.current: Optional[Dict] = None
+        self._last: Optional[Dict] = None
+
+    def start_round(self, game) -> None:
+        self.bots = [game.snake1.agent_id, game.snake2.agent_id]
+        self.current = {"round": game.tournament.current_round, "frames": [], "events": []}
+        self._last = None
+        self.capture(game)
+
+    def capture(self, game) -> None:
+        if self.current is None:
+            return
+        state = snapshot(game)
+        last = self._last
+        if last is not None:
+            if (state["snakes"] == last["snakes"] and
+                    len(state["food"]) == len(last["food"]) and
+                    len(state["traps"]) == len(last["traps"])):
+                return
+            self._record_events(last, state)
+        self.current["frames"].append(state)
+        self._last = state
+
+    def _record_events(self, last: Dict, state: Dict) -> None:
+        events = self.current["events"]
+        eaten = {tuple(pos) for pos in last["food"]} - {tuple(pos) for pos in state["food"]}
+        for side, (before, after) in enumerate(zip(last["snakes"], state["snakes"])):
+            head = after["segments"][0] if after["segments"] else before["segments"][0]
+            if tuple(head) in eaten:
+                events.append({"type": "food", "side": side, "cell": head, "t": state["t"]})
+            if after["traps_hit"] > before["traps_hit"]:
+                events.append({"type": "trap", "side": side, "cell": head, "t": state["t"]})
+            if after["collisions"] > before["collisions"]:
+                events.append({"type": "collision", "side": side, "cell": head, "t": state["t"]})
+            if before["alive"] and not after["alive"]:
+                events.append({"type": "death", "side": side, "cell": head, "t": state["t"]})
+
+    def end_round(self, game) -> None:
+        if self.current is None:
+            return
+        self.capture(game)
+        self.current["winner"] = game.round_winner
+        self.rounds.append(self.current)
+        self.current = None
+
+    def to_dict(self) -> Dict:
+        return {"bots": self.bots, "rounds": self.rounds}
+
+    def save(self, path: str) -> None:
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, separators=(",", ":"))
+
+
+def load_replay(path: str) -> Dict:
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def apply_snapshot(game, frame: Dict) -> None:
+    """Load a recorded snapshot into a game so its draw_* methods render it"""
+    for snake, state in zip((game.snake1, game.snake2), frame["snakes"]):
+        snake.segments = deque([list(segment) for segment in state["segments"]])
+        snake.direction = tuple(state["direction"])
+        snake.score = state["score"]
+        snake.length = state["length"]
+        snake.alive = state["alive"]
+        snake.shield_timer = state["shield"]
+        snake.shield_flash = 0
+        snake.traps_hit = state["traps_hit"]
+        snake.collisions = state["collisions"]
+    game.food.positions = [tuple(pos) for pos in frame["food"]]
+    game.traps.positions = [tuple(pos) for pos in frame["traps"]]
+    game.round_start_time = 0.0
+    game.sim_clock.ticks = game.sim_clock.to_ticks(frame["t"])
@@ -0,0 +1,223 @@
+import sqlite3
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    started_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_key TEXT UNIQUE NOT NULL,
+    contest_id INTEGER,
+    bot1 TEXT NOT NULL,
+    bot2 TEXT NOT NULL,
+    bot1_score INTEGER NOT NULL,
+    bot2_score INTEGER NOT NULL,
+    winner TEXT,
+    rounds_played INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_key TEXT,
+    contest_id INTEGER,
+    round INTEGER NOT NULL,
+    bot1 TEXT,
+    bot2 TEXT,
+    winner TEXT,
+    snake1_score INTEGER NOT NULL,
+    snake2_score INTEGER NOT NULL,
+    snake1_traps_hit INTEGER NOT NULL,
+    snake2_traps_hit INTEGER NOT NULL,
+    snake1_collisions INTEGER NOT NULL,
+    snake2_collisions INTEGER NOT NULL,
+    snake1_collision_types TEXT,
+    snake2_collision_types TEXT,
+    time_remaining REAL,
+    is_draw INTEGER NOT NULL,
+    is_crash INTEGER NOT NULL,
+    timestamp TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_matches_contest ON matches(contest_id);
+CREATE INDEX IF NOT EXISTS idx_matches_bot1 ON matches(bot1);
+CREATE INDEX IF NOT EXISTS idx_matches_bot2 ON matches(bot2);
+CREATE INDEX IF NOT EXISTS idx_rounds_contest ON rounds(contest_id);
+CREATE INDEX IF NOT EXISTS idx_rounds_match ON rounds(match_key);
+CREATE INDEX IF NOT EXISTS idx_rounds_round ON rounds(round);
+CREATE INDEX IF NOT EXISTS idx_rounds_bot1 ON rounds(bot1);
+CREATE INDEX IF NOT EXISTS idx_rounds_bot2 ON rounds(bot2);
+"""
+
+# Every match seen from each participant's side, so per-bot queries need no branching
+PERSPECTIVE = """
+    SELECT contest_id, bot1 AS name, bot2 AS opponent,
+           IFNULL(winner = bot1, 0) AS win, IFNULL(winner = bot2, 0) AS loss
+    FROM matches
+    UNION ALL
+    SELECT contest_id, bot2 AS name, bot1 AS opponent,
+           IFNULL(winner = bot2, 0) AS win, IFNULL(winner = bot1, 0) AS loss
+    FROM matches
+"""
+
+
+class ResultsStore:
+    """SQLite-backed store for contest matches and tournament rounds"""
+
+    def __init__(self, path: str = "results.db", batch_size: int = 100):
+        self.path = path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._pending_rounds: List[Tuple] = []
+        self._pending_matches: List[Tuple] = []
+
+    def begin_contest(self, kind: str) -> int:
+        """Register a new contest and return its id"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO contests (kind, started_at) VALUES (?, ?)",
+                (kind, datetime.now().isoformat())
+            )
+        return cursor.lastrowid
+
+    def add_round(self,
+                  match_key: Optional[str],
+                  contest_id: Optional[int],
+                  bot1: Optional[str],
+                  bot2: Optional[str],
+                  row: Dict) -> None:
+        """Queue one Tournament.record_round row for the next batch"""
+        self._pending_rounds.append((
+            match_key, contest_id, row["round"], bot1, bot2, row["winner"],
+            row["snake1_score"], row["snake2_score"],
+            row["snake1_traps_hit"], row["snake2_traps_hit"],
+            row["snake1_collisions"], row["snake2_collisions"],
+            row["snake1_collision_types"], row["snake2_collision_types"],
+            row["time_remaining"], int(row["is_draw"]), int(row["is_crash"]),
+            row["timestamp"]
+        ))
+        self._maybe_flush()
+
+    def add_match(self, match_key: str, contest_id: Optional[int], result: Dict) -> None:
+        """Queue one Contest.run_match result for the next batch"""
+        self._pending_matches.append((
+            match_key, contest_id, result["bot1"], result["bot2"],
+            result["bot1_score"], result["bot2_score"], result["winner"],
+            result["rounds_played"], datetime.now().isoformat()
+        ))
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if len(self._pending_rounds) + len(self._pending_matches) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all queued rows in a single transaction"""
+        if not self._pending_rounds and not self._pending_matches:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO matches (match_key, contest_id, bot1, bot2, bot1_score, "
+                "bot2_score, winner, rounds_played, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._pending_matches
+            )
+            self.conn.executemany(
+                "INSERT INTO rounds (match_key, contest_id, round, bot1, bot2, winner, "
+                "snake1_score, snake2_score, snake1_traps_hit, snake2_traps_hit, "
+                "snake1_collisions, snake2_collisions, snake1_collision_types, "
+                "snake2_collision_types, time_remaining, is_draw, is_crash, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._pending_rounds
+            )
+        self._pending_rounds = []
+        self._pending_matches = []
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Dict]:
+        self.flush()
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def leaderboard(self, contest_id: int) -> List[Dict]:
+        """Standings for one contest, ordered like Contest.update_leaderboard"""
+        return self._query(
+            f"SELECT name, SUM(win) AS wins, SUM(loss) AS losses, "
+            f"SUM(1 - win - loss) AS draws, SUM(3 * win + (1 - win - loss)) AS points "
+            f"FROM ({PERSPECTIVE}) WHERE contest_id = ? "
+            f"GROUP BY name ORDER BY points DESC, wins DESC, losses ASC",
+            (contest_id,)
+        )
+
+    def recent_contests(self, limit: int) -> List[int]:
+        return [row["id"] for row in self._query(
+            "SELECT id FROM contests ORDER BY id DESC LIMIT ?", (limit,)
+        )]
+
+    def win_rate(self,
+                 bot: str,
+                 opponents: Optional[List[str]] = None,
+                 last_contests: Optional[int] = None) -> Dict:
+        """Match record of a bot, optionally against given opponents over the last N contests"""
+        sql = f"SELECT COUNT(*) AS matches, IFNULL(SUM(win), 0) AS wins, IFNULL(SUM(loss), 0) AS losses FROM ({PERSPECTIVE}) WHERE name = ?"
+        params: List = [bot]
+        if opponents:
+            sql += f" AND opponent IN ({','.join('?' * len(opponents))})"
+            params.extend(opponents)
+        if last_contests is not None:
+            contest_ids = self.recent_contests(last_contests)
+            sql += f" AND contest_id IN ({','.join('?' * len(contest_ids))})"
+            params.extend(contest_ids)
+
+        row = self._query(sql, tuple(params))[0]
+        row["draws"] = row["matches"] - row["wins"] - row["losses"]
+        row["win_rate"] = row["wins"] / row["matches"] if row["matches"] else 0.0
+        return row
+
+    def round_history(self,
+                      bot: Optional[str] = None,
+                      contest_id: Optional[int] = None,
+                      limit: Optional[int] = None) -> List[Dict]:
+        """Recorded rounds, newest first"""
+        sql = "SELECT * FROM rounds WHERE 1 = 1"
+        params: List = []
+        if bot is not None:
+            sql += " AND (bot1 = ? OR bot2 = ?)"
+            params.extend([bot, bot])
+        if contest_id is not None:
+            sql += " AND contest_id = ?"
+            params.append(contest_id)
+        sql += " ORDER BY id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._query(sql, tuple(params))
+
+    def trap_hit_rate_by_round(self, bot: Optional[str] = None,
+                               contest_id: Optional[int] = None) -> List[Dict]:
+        """Average traps hit per snake for each round number"""
+        sql = ("SELECT round, COUNT(*) AS samples, SUM(traps_hit) AS traps_hit, "
+               "AVG(traps_hit) AS avg_traps_hit FROM ("
+               "SELECT round, contest_id, bot1 AS name, snake1_traps_hit AS traps_hit FROM rounds "
+               "UNION ALL "
+               "SELECT round, contest_id, bot2 AS name, snake2_traps_hit AS traps_hit FROM rounds"
+               ") WHERE 1 = 1")
+        params: List = []
+        if bot is not None:
+            sql += " AND name = ?"
+            params.append(bot)
+        if contest_id is not None:
+            sql += " AND contest_id = ?"
+            params.append(contest_id)
+        sql += " GROUP BY round ORDER BY round"
+        return self._query(sql, tuple(params))
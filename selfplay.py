@@ -0,0 +1,243 @@
+import argparse
+import bisect
+import json
+import os
+import random
+import multiprocessing
+from typing import List, Dict, Tuple
+
+import numpy as np
+
+from game_settings import GRID_WIDTH, GRID_HEIGHT, GameState, Direction, SEEDED_DECISION_NODES
+from observation import (
+    ObservationEncoder, CELL_EMPTY, CELL_OWN_HEAD, CELL_OWN_BODY,
+    CELL_OPP_HEAD, CELL_OPP_BODY, CELL_FOOD, CELL_TRAP
+)
+from engine import MatchEngine
+from tournament import ColumnarTournament
+import bot as builtin_bots
+from bot_loader import BotLoader
+
+# Action index <-> direction, shared by writers and readers of the shards
+ACTIONS = [Direction.RIGHT, Direction.LEFT, Direction.UP, Direction.DOWN]
+ACTION_INDEX = {move: i for i, move in enumerate(ACTIONS)}
+
+OBS_SHAPE = (GRID_HEIGHT, GRID_WIDTH)  # int8 CELL_* codes from ObservationEncoder.cell_codes()
+WIN_REWARD = 1.0
+FIELDS = {
+    "obs": (np.int8, OBS_SHAPE),
+    "action": (np.int8, ()),
+    "reward": (np.float32, ()),
+    "done": (np.bool_, ()),
+}
+
+
+class ShardWriter:
+    """Streams transitions into fixed-size memory-mapped .npy shards"""
+
+    def __init__(self, directory: str, prefix: str, shard_size: int = 65536):
+        self.directory = directory
+        self.prefix = prefix
+        self.shard_size = shard_size
+        self.shards: List[Dict] = []
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.count = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _open_shard(self) -> None:
+        name = f"{self.prefix}_{len(self.shards):05d}"
+        files = {field: f"{name}_{field}.npy" for field in FIELDS}
+        self.arrays = {
+            field: np.lib.format.open_memmap(
+                os.path.join(self.directory, files[field]), mode="w+",
+                dtype=dtype, shape=(self.shard_size,) + shape)
+            for field, (dtype, shape) in FIELDS.items()
+        }
+        self.shards.append({"name": name, "files": files, "count": 0})
+        self.count = 0
+
+    def _close_shard(self) -> None:
+        for array in self.arrays.values():
+            array.flush()
+        self.shards[-1]["count"] = self.count
+        self.arrays = {}
+
+    def append(self, obs: np.ndarray, action: int, reward: float, done: bool) -> None:
+        if not self.arrays:
+            self._open_shard()
+        i = self.count
+        self.arrays["obs"][i] = obs
+        self.arrays["action"][i] = action
+        self.arrays["reward"][i] = reward
+        self.arrays["done"][i] = done
+        self.count += 1
+        if self.count == self.shard_size:
+            self._close_shard()
+
+    def close(self) -> List[Dict]:
+        if self.arrays:
+            self._close_shard()
+        return self.shards
+
+
+class ShardDataset:
+    """Zero-copy random access over the shards listed in an index file"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "index.json"), encoding="utf-8") as file:
+            self.index = json.load(file)
+        self.shards = [shard for shard in self.index["shards"] if shard["count"] > 0]
+        self.offsets = []
+        total = 0
+        for shard in self.shards:
+            self.offsets.append(total)
+            total += shard["count"]
+        self.total = total
+        self._open: Dict[int, Dict[str, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return self.total
+
+    def shard(self, i: int) -> Dict[str, np.ndarray]:
+        """Memory-mapped arrays of one shard, trimmed to its filled rows"""
+        if i not in self._open:
+            shard = self.shards[i]
+            self._open[i] = {
+                field: np.load(os.path.join(self.directory, path), mmap_mode="r")[:shard["count"]]
+                for field, path in shard["files"].items()
+            }
+        return self._open[i]
+
+    def __getitem__(self, index: int) -> Tuple[np.ndarray, int, float, bool]:
+        if index < 0:
+            index += self.total
+        if not 0 <= index < self.total:
+            raise IndexError(index)
+        i = bisect.bisect_right(self.offsets, index) - 1
+        arrays = self.shard(i)
+        row = index - self.offsets[i]
+        return arrays["obs"][row], int(arrays["action"][row]), float(arrays["reward"][row]), bool(arrays["done"][row])
+
+
+def load_bot(spec: str) -> builtin_bots.Bot:
+    """Instantiate a built-in bot by class name, or a contest submission by file path"""
+    if spec.endswith(".py"):
+        instance = BotLoader().load_class(spec)()
+        instance.name = os.path.splitext(os.path.basename(spec))[0]
+        return instance
+    return getattr(builtin_bots, spec)()
+
+
+class TrajectoryRecorder:
+    """Turns per-tick engine state into (observation, action, reward, done) transitions"""
+
+    def __init__(self, writer: ShardWriter):
+        self.writer = writer
+        self.obs = {1: np.zeros(OBS_SHAPE, np.int8), 2: np.zeros(OBS_SHAPE, np.int8)}
+        # One slot per side, so each side's board is diffed against its own previous move
+        self.encoder = ObservationEncoder(batch_size=2)
+        self.pending: Dict[int, Tuple[np.ndarray, int, int]] = {}
+
+    def play(self, game) -> None:
+        """Play the game's tournament headless, recording every snake move"""
+        game.start_new_tournament()
+        while game.game_state != GameState.GAME_OVER:
+            if game.game_state == GameState.ROUND_OVER:
+                game.start_next_round()
+            self.step(game)
+
+    def step(self, game) -> None:
+        sides = {1: (game.snake1, game.snake2), 2: (game.snake2, game.snake1)}
+        moving = []
+        for side, (snake, opponent) in sides.items():
+            # Only snakes whose move timer fires this tick produce a transition
+            if snake.alive and snake.will_move(game.sim_clock):
+                # The previous move's transition covers every tick up to this move
+                self._finish(side, snake.score, False)
+                self.encoder.encode(snake, game.food, game.traps, opponent, side - 1)
+                self.encoder.cell_codes(side - 1, self.obs[side])
+                moving.append((side, snake.score))
+
+        game.update()
+
+        for side, start_score in moving:
+            snake = sides[side][0]
+            self.pending[side] = (self.obs[side].copy(), ACTION_INDEX[snake.direction], start_score)
+
+        if game.game_state != GameState.PLAYING:
+            for side, (snake, _) in sides.items():
+                bonus = 0.0
+                if game.round_winner is not None:
+                    bonus = WIN_REWARD if game.round_winner == snake.agent_id else -WIN_REWARD
+                self._finish(side, snake.score, True, bonus)
+
+    def _finish(self, side: int, score: int, done: bool, bonus: float = 0.0) -> None:
+        pending = self.pending.pop(side, None)
+        if pending is not None:
+            obs, action, start_score = pending
+            self.writer.append(obs, action, float(score - start_score) + bonus, done)
+
+
+def generate_worker(job: Tuple[int, str, List[Tuple[str, str, int]], int]) -> List[Dict]:
+    """Run a batch of headless matches in one process and return its shard metadata"""
+    worker_id, out_dir, matches, shard_size = job
+    writer = ShardWriter(out_dir, f"w{worker_id:03d}", shard_size)
+    for spec1, spec2, seed in matches:
+        random.seed(seed)
+        game = MatchEngine()
+        game.tournament_class = ColumnarTournament
+        game.config.decision_nodes = SEEDED_DECISION_NODES
+        game.bot1 = load_bot(spec1)
+        game.bot2 = load_bot(spec2)
+        if game.bot1.name == game.bot2.name:
+            game.bot2.name += "_2"
+        TrajectoryRecorder(writer).play(game)
+    return writer.close()
+
+
+def generate(out_dir: str,
+             pairings: List[Tuple[str, str]],
+             matches: int,
+             workers: int = os.cpu_count() or 1,
+             shard_size: int = 65536,
+             base_seed: int = 0) -> Dict:
+    """Play `matches` headless matches over the pairings and write shards plus index.json"""
+    schedule = [(*pairings[i % len(pairings)], base_seed + i) for i in range(matches)]
+    jobs = [(w, out_dir, schedule[w::workers], shard_size) for w in range(workers)]
+    jobs = [job for job in jobs if job[2]]
+
+    os.makedirs(out_dir, exist_ok=True)
+    with multiprocessing.Pool(len(jobs)) as pool:
+        shard_lists = pool.map(generate_worker, jobs)
+
+    index = {
+        "shard_size": shard_size,
+        "fields": {field: {"dtype": np.dtype(dtype).str, "shape": list(shape)}
+                   for field, (dtype, shape) in FIELDS.items()},
+        "actions": ACTIONS,
+        "cell_codes": {"empty": CELL_EMPTY, "own_head": CELL_OWN_HEAD, "own_body": CELL_OWN_BODY,
+                       "opp_head": CELL_OPP_HEAD, "opp_body": CELL_OPP_BODY,
+                       "food": CELL_FOOD, "trap": CELL_TRAP},
+        "shards": [shard for shards in shard_lists for shard in shards],
+    }
+    index["total"] = sum(shard["count"] for shard in index["shards"])
+    with open(os.path.join(out_dir, "index.json"), "w", encoding="utf-8") as file:
+        json.dump(index, file, indent=2)
+    print(f"Wrote {index['total']} transitions in {len(index['shards'])} shards to {out_dir}")
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate self-play trajectories into memory-mapped shards")
+    parser.add_argument("out_dir")
+    parser.add_argument("--pairing", action="append", default=None,
+                        help="BOT1:BOT2, each a bot.py class name or a submission .py path")
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-size", type=int, default=65536)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pairings = [tuple(p.split(":", 1)) for p in (args.pairing or ["StrategicBot:GreedyBot"])]
+    generate(args.out_dir, pairings, args.matches, args.workers, args.shard_size, args.seed)
@@ -0,0 +1,250 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from game_settings import GRID_WIDTH, GRID_HEIGHT, Snake, Trap
+
+Cell = Tuple[int, int]
+
+# The 8 cells around a cell in ring order; even positions are the 4 orthogonal neighbours
+RING = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1))
+
+
+class RegionIndex:
+    """Connected regions of free cells and their sizes, updated as cells are blocked and freed
+
+    Free cells are joined in a union-find forest whose roots carry region
+    sizes, so room(cell) is a find and a lookup. Freeing a cell is a few
+    unions. Blocking one can split its region: a test on the 8 surrounding
+    cells rules that out in almost every case, and otherwise searches run
+    from each free neighbour in lockstep, stopping as soon as only one of
+    them is still open, so only the cut-off pockets (usually the small side)
+    are walked and relabelled.
+
+    Blocked means snake segments and traps; food is free space. Call
+    sync() with the current board before asking, as often as once a tick.
+    """
+    rebuild_fraction = 0.25  # a change this large (a new round) is cheaper to rebuild
+
+    def __init__(self, width: int = GRID_WIDTH, height: int = GRID_HEIGHT):
+        self.width = width
+        self.height = height
+        self.blocked_cells: Set[Cell] = set()
+        self.rebuilds = 0
+        self.splits = 0
+        self.adjacent = [self._neighbours(index) for index in range(width * height)]
+        self.rebuild(set())
+
+    def _index(self, cell: Cell) -> int:
+        return cell[1] * self.width + cell[0]
+
+    def _neighbours(self, index: int) -> List[int]:
+        x, y = index % self.width, index // self.width
+        result = []
+        if x > 0: result.append(index - 1)
+        if x < self.width - 1: result.append(index + 1)
+        if y > 0: result.append(index - self.width)
+        if y < self.height - 1: result.append(index + self.width)
+        return result
+
+    def _find(self, node: int) -> int:
+        parent = self.parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    def _union(self, a: int, b: int) -> None:
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+    def _new_node(self, size: int) -> int:
+        self.parent.append(len(self.parent))
+        self.size.append(size)
+        return len(self.parent) - 1
+
+    def rebuild(self, blocked: Set[Cell]) -> None:
+        """Recompute every region from scratch"""
+        cells = self.width * self.height
+        self.blocked_cells = set(blocked)
+        self.blocked = bytearray(cells)
+        for cell in blocked:
+            if 0 <= cell[0] < self.width and 0 <= cell[1] < self.height:
+                self.blocked[self._index(cell)] = 1
+        # Cells point at union-find nodes; a freed cell gets a fresh node, so a
+        # blocked cell's old node can keep serving as an inner node of its region
+        self.node = list(range(cells))
+        self.parent = list(range(cells))
+        self.size = [1] * cells
+        for index in range(cells):
+            if self.blocked[index]:
+                continue
+            if index % self.width < self.width - 1 and not self.blocked[index + 1]:
+                self._union(self.node[index], self.node[index + 1])
+            if index + self.width < cells and not self.blocked[index + self.width]:
+                self._union(self.node[index], self.node[index + self.width])
+        self.rebuilds += 1
+
+    def sync(self, blocked: Set[Cell]) -> None:
+        """Bring the index up to date with a new set of blocked cells"""
+        freed = self.blocked_cells - blocked
+        added = blocked - self.blocked_cells
+        if len(freed) + len(added) > self.rebuild_fraction * self.width * self.height:
+            self.rebuild(blocked)
+            return
+        for cell in freed:
+            self._free(cell)
+        for cell in added:
+            self._block(cell)
+        # Nodes only ever get added; start over once most of them are dead
+        if len(self.parent) > 4 * self.width * self.height:
+            self.rebuild(blocked)
+
+    def sync_board(self, snakes: Iterable[Optional[Snake]], traps: Trap) -> None:
+        self.sync(blocked_cells(snakes, traps))
+
+    def _free(self, cell: Cell) -> None:
+        self.blocked_cells.discard(cell)
+        if not (0 <= cell[0] < self.width and 0 <= cell[1] < self.height):
+            return
+        index = self._index(cell)
+        self.blocked[index] = 0
+        self.node[index] = self._new_node(1)
+        for other in self.adjacent[index]:
+            if not self.blocked[other]:
+                self._union(self.node[index], self.node[other])
+
+    def _block(self, cell: Cell) -> None:
+        self.blocked_cells.add(cell)
+        if not (0 <= cell[0] < self.width and 0 <= cell[1] < self.height):
+            return
+        index = self._index(cell)
+        if self.blocked[index]:
+            return
+        root = self._find(self.node[index])
+        self.blocked[index] = 1
+        self.size[root] -= 1
+        pieces = self._cut(index)
+        if len(pieces) < 2:
+            return
+        self.splits += 1
+        # The open (or largest) piece keeps the old root; the others get their own
+        keep = max(range(len(pieces)), key=lambda i: (pieces[i][0], len(pieces[i][1])))
+        for i, (_, members) in enumerate(pieces):
+            if i == keep:
+                continue
+            piece = self._new_node(len(members))
+            for member in members:
+                self.node[member] = piece
+            self.size[root] -= len(members)
+
+    def _locally_connected(self, index: int) -> bool:
+        """Whether the free orthogonal neighbours touch each other through the surrounding ring"""
+        x, y = index % self.width, index // self.width
+        free = []
+        for dx, dy in RING:
+            nx, ny = x + dx, y + dy
+            free.append(0 <= nx < self.width and 0 <= ny < self.height
+                        and not self.blocked[ny * self.width + nx])
+        sides = sum(free[k] for k in (0, 2, 4, 6))
+        # Two consecutive sides are joined if the corner between them is free too
+        joins = sum(1 for k in (0, 2, 4, 6) if free[k] and free[k + 1] and free[(k + 2) % 8])
+        return sides - joins <= 1
+
+    def _cut(self, index: int) -> List[Tuple[bool, List[int]]]:
+        """Pieces the free neighbours of a blocked cell fall into, as (still open, cells walked)
+
+        A single piece means nothing was cut off. Pieces that are not open
+        were walked completely; the open one (at most one) is the rest of
+        the old region and was only partly walked.
+        """
+        blocked = self.blocked
+        adjacent = self.adjacent
+        starts = [other for other in adjacent[index] if not blocked[other]]
+        if len(starts) < 2 or self._locally_connected(index):
+            return [(True, [])]
+
+        group = list(range(len(starts)))
+
+        def top(search: int) -> int:
+            while group[search] != search:
+                search = group[search]
+            return search
+
+        owner: Dict[int, int] = {start: search for search, start in enumerate(starts)}
+        queues = [deque([start]) for start in starts]
+        members: List[List[int]] = [[start] for start in starts]
+        open_groups = set(range(len(starts)))
+        closed = set()
+        while len(open_groups) > 1:
+            # One step per search, round robin, so no side gets walked far ahead
+            for search, queue in enumerate(queues):
+                if not queue:
+                    continue
+                current = top(search)
+                if current not in open_groups:
+                    continue
+                for other in adjacent[queue.popleft()]:
+                    if blocked[other]:
+                        continue
+                    seen = owner.get(other)
+                    if seen is None:
+                        owner[other] = search
+                        queue.append(other)
+                        members[search].append(other)
+                    else:
+                        seen = top(seen)
+                        if seen != current:
+                            # Two searches met: same piece
+                            open_groups.discard(seen)
+                            group[seen] = current
+                if not queue and not any(queues[s] for s in range(len(starts)) if top(s) == current):
+                    open_groups.discard(current)
+                    closed.add(current)
+
+        pieces = []
+        for current in open_groups | closed:
+            cells = [cell for s in range(len(starts)) if top(s) == current for cell in members[s]]
+            pieces.append((current in open_groups, cells))
+        return pieces
+
+    def room(self, cell: Cell) -> int:
+        """Size of the free region containing a cell; 0 for blocked or off-board cells"""
+        if not (0 <= cell[0] < self.width and 0 <= cell[1] < self.height):
+            return 0
+        index = self._index(cell)
+        if self.blocked[index]:
+            return 0
+        return self.size[self._find(self.node[index])]
+
+    def room_after(self, cell: Cell) -> int:
+        """Free cells reachable after a head moves into `cell`: its region minus the cell,
+        or the largest piece if occupying the cell cuts the region"""
+        size = self.room(cell)
+        if size == 0:
+            return 0
+        index = self._index(cell)
+        self.blocked[index] = 1
+        try:
+            pieces = self._cut(index)
+        finally:
+            self.blocked[index] = 0
+        if len(pieces) < 2:
+            return size - 1
+        walked = sum(len(cells) for is_open, cells in pieces if not is_open)
+        return max(size - 1 - walked if is_open else len(cells) for is_open, cells in pieces)
+
+
+def blocked_cells(snakes: Iterable[Optional[Snake]], traps: Trap) -> Set[Cell]:
+    """Cells a head cannot move into: every snake segment and every trap"""
+    blocked = set(traps.positions)
+    for snake in snakes:
+        if snake is not None:
+            blocked.update(map(tuple, snake.segments))
+    return blocked
@@ -0,0 +1,280 @@
+import argparse
+import math
+import multiprocessing
+import queue
+import random
+import time
+from typing import List, Dict, Optional, Tuple
+
+import pygame
+
+from clock import RealTimeClock, TickClock
+from engine import MatchEngine, FPS
+from game_settings import (
+    WIDTH, HEIGHT, GameState, GameConfig, Snake, Food, Trap,
+    BLACK, WHITE, GREEN, DARK_GREEN, YELLOW, DARK_YELLOW
+)
+from rendering import BoardRenderer
+from replay import snapshot, apply_snapshot
+from selfplay import load_bot
+
+LABEL_HEIGHT = 16
+
+
+class SnapshotPublisher:
+    """Sends a running match's drawable state to a spectator queue
+
+    A snapshot goes out only when the board changed since the last one, and
+    at most `rate` times per wall second, so an idle or fast-forwarded match
+    costs the viewer almost nothing.
+    """
+
+    def __init__(self, out: multiprocessing.Queue, index: int, rate: float = 15.0):
+        self.out = out
+        self.index = index
+        self.interval = 1.0 / rate
+        self._sent_at = 0.0
+        self._last: Optional[Dict] = None
+
+    def publish(self, game: MatchEngine, force: bool = False, full_rate: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and not full_rate and now - self._sent_at < self.interval:
+            return
+        frame = snapshot(game)
+        last = self._last
+        if (not force and last is not None and frame["snakes"] == last["snakes"]
+                and frame["food"] == last["food"] and frame["traps"] == last["traps"]):
+            return
+        self.out.put({
+            "index": self.index,
+            "names": [game.snake1.agent_id, game.snake2.agent_id],
+            "round": game.tournament.current_round,
+            "wins": [game.tournament.snake1_wins, game.tournament.snake2_wins],
+            "over": game.game_state == GameState.GAME_OVER,
+            "winner": game.final_winner,
+            "frame": frame,
+        })
+        self._sent_at = now
+        self._last = frame
+
+
+def spectated_match(index: int, bot1: str, bot2: str, seed: int, speed: float,
+                    rate: float, out: multiprocessing.Queue, stop, focus) -> None:
+    """Play one tournament in real time (times `speed`), publishing snapshots; runs in a worker process"""
+    random.seed(seed)
+    game = MatchEngine(clock=RealTimeClock(FPS))
+    game.bot1, game.bot2 = load_bot(bot1), load_bot(bot2)
+    publisher = SnapshotPublisher(out, index, rate)
+
+    game.start_new_tournament()
+    publisher.publish(game, force=True)
+    while game.game_state != GameState.GAME_OVER and not stop.is_set():
+        if game.game_state == GameState.ROUND_OVER:
+            game.start_next_round()
+            game.sim_clock.resync()
+            publisher.publish(game, force=True)
+        for _ in range(game.sim_clock.due_ticks(speed)):
+            game.update()
+            if game.game_state != GameState.PLAYING:
+                break
+        # The focused match is shown full size, so it reports every change; the
+        # others only wake as often as their tile redraws and catch up in bulk
+        focused = focus.value == index
+        publisher.publish(game, force=game.game_state != GameState.PLAYING, full_rate=focused)
+        time.sleep(game.sim_clock.dt if focused else min(publisher.interval, RealTimeClock.max_lag / 2))
+    publisher.publish(game, force=True)
+
+
+class Tile:
+    """Latest known state of one spectated match, shaped like a game for apply_snapshot()"""
+
+    def __init__(self, index: int, rect: pygame.Rect):
+        self.index = index
+        self.rect = rect
+        self.snake1 = Snake(GREEN, DARK_GREEN, 0, 0)
+        self.snake2 = Snake(YELLOW, DARK_YELLOW, 0, 0)
+        self.food = Food(0)
+        self.traps = Trap(0)
+        self.sim_clock = TickClock(FPS)
+        self.round_start_time = 0.0
+        self.message: Optional[Dict] = None
+        self.dirty = False
+        self.drawn_at = 0.0
+
+    def receive(self, message: Dict) -> None:
+        # Unpacked into the snakes only when the tile is actually redrawn
+        self.message = message
+        self.dirty = True
+
+    def load(self) -> Dict:
+        message = self.message
+        apply_snapshot(self, message["frame"])
+        self.snake1.agent_id, self.snake2.agent_id = message["names"]
+        return message
+
+
+class Spectator:
+    """One window of scaled-down tiles for many matches running in worker processes
+
+    Tiles redraw only when their match published a change, at most
+    `tile_rate` times a second each, and only while the frame's render
+    budget lasts; tiles left over keep their picture until a later frame.
+    Clicking a tile shows that match alone at full resolution; clicking
+    again (or Escape) goes back to the grid.
+    """
+
+    def __init__(self, matches: List[Tuple[str, str, int]], speed: float = 1.0, fps: int = 30,
+                 tile_rate: float = 10.0, render_budget: float = 0.008):
+        self.matches = matches
+        self.speed = speed
+        self.fps = fps
+        self.tile_interval = 1.0 / tile_rate
+        self.render_budget = render_budget
+        self.config = GameConfig()
+
+        # Workers are forked before SDL starts; they only ever touch the engine
+        self.queue: multiprocessing.Queue = multiprocessing.Queue()
+        self.stop = multiprocessing.Event()
+        self.focused = multiprocessing.Value("i", -1, lock=False)
+        self.workers = [
+            multiprocessing.Process(target=spectated_match, daemon=True,
+                                    args=(i, bot1, bot2, seed, speed, tile_rate, self.queue, self.stop, self.focused))
+            for i, (bot1, bot2, seed) in enumerate(matches)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+        pygame.init()
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption(f"Snake Tournament - {len(matches)} matches")
+        self.clock = pygame.time.Clock()
+        self.font = pygame.font.SysFont('Arial', 24)
+        self.small_font = pygame.font.SysFont('Arial', 12)
+        self.renderer = BoardRenderer()
+
+        cols = math.ceil(math.sqrt(len(matches)))
+        rows = math.ceil(len(matches) / cols)
+        width, height = WIDTH // cols, HEIGHT // rows
+        self.tiles = [Tile(i, pygame.Rect((i % cols) * width, (i // cols) * height, width, height))
+                      for i in range(len(matches))]
+        self.focus: Optional[Tile] = None
+        self.running = True
+
+    def receive(self) -> None:
+        while True:
+            try:
+                message = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            self.tiles[message["index"]].receive(message)
+
+    def handle_events(self) -> None:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE and self.focus is not None:
+                self.set_focus(None)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if self.focus is not None:
+                    self.set_focus(None)
+                else:
+                    for tile in self.tiles:
+                        if tile.rect.collidepoint(event.pos):
+                            self.set_focus(tile)
+
+    def set_focus(self, tile: Optional[Tile]) -> None:
+        self.focus = tile
+        self.focused.value = tile.index if tile is not None else -1
+        self.screen.fill(BLACK)
+        # Everything on screen is stale after switching views
+        for other in self.tiles:
+            other.dirty = other.message is not None
+            other.drawn_at = 0.0
+        pygame.display.flip()
+
+    def draw_tile(self, tile: Tile) -> None:
+        message = tile.load()
+        rect = tile.rect
+        board = pygame.Rect(rect.x, rect.y + LABEL_HEIGHT, rect.width, rect.height - LABEL_HEIGHT)
+        self.screen.fill(BLACK, rect)
+        self.renderer.draw_scaled(self.screen, board, tile.food, tile.traps, [tile.snake1, tile.snake2])
+
+        name1, name2 = message["names"]
+        label = f"R{message['round']}  {name1} {tile.snake1.score} - {tile.snake2.score} {name2}"
+        self.screen.blit(self.small_font.render(label, True, WHITE), (rect.x + 3, rect.y + 2))
+        if message["over"]:
+            wins1, wins2 = message["wins"]
+            result = f"{message['winner'] or 'Draw'} ({wins1}-{wins2})"
+            text = self.font.render(result, True, WHITE)
+            self.screen.blit(text, text.get_rect(center=board.center))
+
+    def draw_focus(self, tile: Tile) -> None:
+        message = tile.load()
+        self.renderer.draw(self.screen, tile.food, tile.traps, [tile.snake1, tile.snake2])
+        time_left = max(0, self.config.round_time - tile.sim_clock.since(tile.round_start_time))
+        score1 = self.font.render(f"{tile.snake1.agent_id}: {tile.snake1.score}", True, GREEN)
+        score2 = self.font.render(f"{tile.snake2.agent_id}: {tile.snake2.score}", True, YELLOW)
+        title = self.font.render(f"Match {tile.index + 1}  Round {message['round']}", True, WHITE)
+        timer = self.font.render(f"Time: {int(time_left)}s", True, WHITE)
+        self.screen.blit(score1, (10, 10))
+        self.screen.blit(score2, (WIDTH - score2.get_width() - 10, 10))
+        self.screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 10))
+        self.screen.blit(timer, (WIDTH // 2 - timer.get_width() // 2, HEIGHT - 30))
+
+    def draw(self) -> None:
+        if self.focus is not None:
+            if self.focus.dirty:
+                self.draw_focus(self.focus)
+                self.focus.dirty = False
+                pygame.display.flip()
+            return
+
+        start = time.perf_counter()
+        due = [tile for tile in self.tiles if tile.dirty and start - tile.drawn_at >= self.tile_interval]
+        # Longest-waiting tiles first, so a tight budget still reaches every tile in turn
+        due.sort(key=lambda tile: tile.drawn_at)
+        updated = []
+        for tile in due:
+            if updated and time.perf_counter() - start > self.render_budget:
+                break
+            self.draw_tile(tile)
+            tile.dirty = False
+            tile.drawn_at = time.perf_counter()
+            updated.append(tile.rect)
+        if updated:
+            pygame.display.update(updated)
+
+    def run(self) -> None:
+        try:
+            while self.running:
+                self.handle_events()
+                self.receive()
+                self.draw()
+                self.clock.tick(self.fps)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.stop.set()
+        for worker in self.workers:
+            worker.join(timeout=1.0)
+            if worker.is_alive():
+                worker.terminate()
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch many matches at once as tiles in one window")
+    parser.add_argument("--pairing", action="append", default=None,
+                        help="BOT1:BOT2, each a bot.py class name or a submission .py path")
+    parser.add_argument("--matches", type=int, default=16, help="matches to run, cycling over the pairings")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first match; each next one adds 1")
+    parser.add_argument("--speed", type=float, default=1.0, help="game seconds per wall second")
+    parser.add_argument("--fps", type=int, default=30, help="viewer frame rate")
+    parser.add_argument("--tile-rate", type=float, default=10.0, help="redraws per second per tile")
+    parser.add_argument("--render-budget", type=float, default=8.0, help="milliseconds of tile drawing per frame")
+    args = parser.parse_args()
+
+    pairings = [tuple(p.split(":", 1)) for p in (args.pairing or ["StrategicBot:GreedyBot"])]
+    matches = [(*pairings[i % len(pairings)], args.seed + i) for i in range(args.matches)]
+    Spectator(matches, args.speed, args.fps, args.tile_rate, args.render_budget / 1000).run()
@@ -1,11 +1,32 @@
 import csv
+import math
+import time
+from array import array
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, Tuple
 from game_settings import GameConfig
+from results_store import ResultsStore
+
+CSV_FIELDS = [
+    "round", "timestamp", "winner", 
+    "snake1_score", "snake2_score",
+    "snake1_traps_hit", "snake2_traps_hit",
+    "snake1_collisions", "snake2_collisions",
+    "snake1_collision_types", "snake2_collision_types",
+    "time_remaining", "is_draw", "is_crash",
+    "total_snake1_apples", "total_snake2_apples", "W/L_Ratio_Snake1", "W/L_Ratio_Snake2"
+]
 
 class Tournament:
-    def __init__(self, config: GameConfig):
+    def __init__(self, config: GameConfig,
+                 store: Optional[ResultsStore] = None,
+                 contest_id: Optional[int] = None,
+                 match_key: Optional[str] = None):
         self.config = config
+        self.store = store
+        self.contest_id = contest_id
+        self.match_key = match_key
         self.current_round = 1
         self.results: List[Dict] = []
         self.snake1_wins = 0
@@ -47,7 +68,7 @@ class Tournament:
         elif winner == self.snake2_name:
             self.snake1_losses += 1
         
-        total_rounds = len(self.results)
+        total_rounds = self.rounds_played
         if total_rounds > 0:
             self.snake1_win_ratio = self.snake1_wins / total_rounds
             self.snake2_win_ratio = self.snake2_wins / total_rounds
@@ -74,7 +95,7 @@ class Tournament:
         elif winner == self.snake2_name:
             self.snake2_wins += 1
             
-        self.results.append({
+        row = {
             "round": self.current_round,
             "timestamp": datetime.now().isoformat(),
             "winner": winner,
@@ -94,37 +115,39 @@ class Tournament:
             "W/L_Ratio_Snake1": self.snake1_win_ratio,
             "W/L_Ratio_Snake2": self.snake2_win_ratio
 
-        })
+        }
+        self.results.append(row)
+        if self.store is not None:
+            self.store.add_round(self.match_key, self.contest_id,
+                                 self.snake1_name, self.snake2_name, row)
         self.current_round += 1
     
+    @property
+    def rounds_played(self) -> int:
+        return len(self.results)
+
+    def iter_rows(self) -> Iterator[Dict]:
+        """Round rows in CSV_FIELDS form, oldest first"""
+        return iter(self.results)
+
     def save_to_csv(self, filename: str = "tournament_results.csv") -> None:
         """Save all tournament results to a CSV file"""
-        fieldnames = [
-            "round", "timestamp", "winner", 
-            "snake1_score", "snake2_score",
-            "snake1_traps_hit", "snake2_traps_hit",
-            "snake1_collisions", "snake2_collisions",
-            "snake1_collision_types", "snake2_collision_types",
-            "time_remaining", "is_draw", "is_crash",
-            "total_snake1_apples", "total_snake2_apples", "W/L_Ratio_Snake1", "W/L_Ratio_Snake2"
-        ]
-        
         with open(filename, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
             writer.writeheader()
-            writer.writerows(self.results)
+            writer.writerows(self.iter_rows())
         
         print(f"Tournament results saved to {filename}")
     
     def get_winner(self) -> Optional[str]:
         """Determine the tournament winner with comprehensive tie-breaking criteria"""
         # Early victory by point difference (Apple-Difference Threshold)
-        if (len(self.results) >= self.config.min_rounds_for_early_victory and
+        if (self.rounds_played >= self.config.min_rounds_for_early_victory and
             abs(self.total_snake1_apples - self.total_snake2_apples) >= self.config.early_victory_diff):
             return self.snake1_name if self.total_snake1_apples > self.total_snake2_apples else self.snake2_name
             
         # Must have completed all rounds to determine normal winner
-        if len(self.results) < self.config.max_rounds:
+        if self.rounds_played < self.config.max_rounds:
             return None
 
         # 1. First compare win rounds
@@ -160,12 +183,12 @@ class Tournament:
     def is_tournament_over(self) -> bool:
         """Check if tournament should end with comprehensive conditions"""
         # Early victory by point difference
-        if (len(self.results) >= self.config.min_rounds_for_early_victory and
+        if (self.rounds_played >= self.config.min_rounds_for_early_victory and
             abs(self.total_snake1_apples - self.total_snake2_apples) >= self.config.early_victory_diff):
             return True
             
         # Normal end conditions - must complete all rounds unless early victory
-        if len(self.results) >= self.config.max_rounds:
+        if self.rounds_played >= self.config.max_rounds:
             # Check if we need a tiebreaker round
             if self.snake1_wins == self.snake2_wins:
 
@@ -180,4 +203,222 @@ class Tournament:
             return True
             
         return False
-            
\ No newline at end of file
+
+
+@dataclass
+class RunningStats:
+    """Mean and variance of a stream of values, updated in O(1) by Welford's method"""
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0  # sum of squared deviations from the running mean
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance; 0 until there are two values"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+# Typed per-round columns of a ColumnarTournament
+COLUMNS = (
+    ("round", "I"), ("timestamp", "d"), ("winner", "b"),
+    ("snake1_score", "i"), ("snake2_score", "i"),
+    ("snake1_traps_hit", "i"), ("snake2_traps_hit", "i"),
+    ("snake1_collisions", "i"), ("snake2_collisions", "i"),
+    ("time_remaining", "d"), ("flags", "B"),
+)
+DRAW, SNAKE1, SNAKE2, OTHER = 0, 1, 2, 3  # winner codes
+IS_DRAW, IS_CRASH = 1, 2  # flags bits
+STATS = ("snake1_score", "snake2_score", "score_margin")  # kept running; other columns on demand
+COUNTERS = ("snake1_traps_hit", "snake2_traps_hit", "snake1_collisions", "snake2_collisions")
+
+
+class ColumnarTournament(Tournament):
+    """Tournament that keeps rounds in preallocated typed columns instead of a list of dicts
+
+    record_round writes a handful of numbers into array columns and folds
+    them into running totals and Welford mean/variance accumulators for
+    the scores and their margin (stats), so a round costs no dict, string
+    formatting or timestamp rendering, and about a tenth of the memory.
+    Rows are only built on demand by iter_rows(), results and
+    save_to_csv(). Win ratios in those rows use the counts including their
+    own round. With a results store attached each round's row is still
+    built for it, so use this mode for aggregate-only evaluation runs.
+    """
+
+    def __init__(self, config: GameConfig,
+                 store: Optional[ResultsStore] = None,
+                 contest_id: Optional[int] = None,
+                 match_key: Optional[str] = None):
+        # A whole tournament plus a couple of tiebreak rounds, before the columns double
+        self.capacity = min(config.max_rounds, 4096) + 2
+        self.columns: Dict[str, array] = {}
+        self.size = 0
+        super().__init__(config, store, contest_id, match_key)
+        self.stats: Dict[str, RunningStats] = {name: RunningStats() for name in STATS}
+        # Rarely used fields live outside the columns, keyed by row index
+        self.other_winners: Dict[int, str] = {}
+        self.collision_types: Dict[int, Tuple[str, str]] = {}
+
+    @property
+    def results(self) -> List[Dict]:
+        """Round rows as dicts, rebuilt from the columns on every access"""
+        return list(self.iter_rows())
+
+    @results.setter
+    def results(self, rows: List[Dict]) -> None:
+        if rows:
+            raise TypeError("ColumnarTournament rounds can only be added through record_round")
+        self.columns = {name: array(code, bytes(array(code).itemsize * self.capacity))
+                        for name, code in COLUMNS}
+        self.size = 0
+
+    @property
+    def rounds_played(self) -> int:
+        return self.size
+
+    def _grow(self) -> None:
+        for name, code in COLUMNS:
+            self.columns[name].frombytes(bytes(array(code).itemsize * self.capacity))
+        self.capacity *= 2
+
+    def record_round(self,
+                winner: Optional[str],
+                snake1_score: int,
+                snake2_score: int,
+                snake1_traps_hit: int = 0,
+                snake2_traps_hit: int = 0,
+                snake1_collisions: int = 0,
+                snake2_collisions: int = 0,
+                snake1_collision_types: List[str] = None,
+                snake2_collision_types: List[str] = None,
+                time_remaining: float = 0.0) -> None:
+        """Record a round into the columns and the running aggregates"""
+        if self.size == self.capacity:
+            self._grow()
+        index = self.size
+        columns = self.columns
+
+        if winner is None:
+            code = DRAW
+            self.draw_rounds += 1
+        elif winner == self.snake1_name:
+            code = SNAKE1
+            self.snake1_wins += 1
+            self.snake2_losses += 1
+        elif winner == self.snake2_name:
+            code = SNAKE2
+            self.snake2_wins += 1
+            self.snake1_losses += 1
+        else:
+            code = OTHER
+            self.other_winners[index] = winner
+        is_crash = snake1_score == 0 and snake2_score == 0
+        if is_crash:
+            self.crashed_rounds += 1
+        if snake1_collision_types or snake2_collision_types:
+            self.collision_types[index] = (','.join(snake1_collision_types or []),
+                                           ','.join(snake2_collision_types or []))
+
+        columns["round"][index] = self.current_round
+        columns["timestamp"][index] = time.time()
+        columns["winner"][index] = code
+        columns["snake1_score"][index] = snake1_score
+        columns["snake2_score"][index] = snake2_score
+        columns["snake1_traps_hit"][index] = snake1_traps_hit
+        columns["snake2_traps_hit"][index] = snake2_traps_hit
+        columns["snake1_collisions"][index] = snake1_collisions
+        columns["snake2_collisions"][index] = snake2_collisions
+        columns["time_remaining"][index] = time_remaining
+        columns["flags"][index] = (IS_DRAW if code == DRAW else 0) | (IS_CRASH if is_crash else 0)
+        self.size += 1
+
+        self.total_snake1_apples += snake1_score
+        self.total_snake2_apples += snake2_score
+        self.snake1_total_traps += snake1_traps_hit
+        self.snake2_total_traps += snake2_traps_hit
+        self.snake1_total_collisions += snake1_collisions
+        self.snake2_total_collisions += snake2_collisions
+        self.snake1_win_ratio = self.snake1_wins / self.size
+        self.snake2_win_ratio = self.snake2_wins / self.size
+
+        stats = self.stats
+        stats["snake1_score"].add(snake1_score)
+        stats["snake2_score"].add(snake2_score)
+        stats["score_margin"].add(snake1_score - snake2_score)
+
+        if self.store is not None:
+            self.store.add_round(self.match_key, self.contest_id,
+                                 self.snake1_name, self.snake2_name,
+                                 self.row(index, (self.total_snake1_apples, self.total_snake2_apples,
+                                                  self.snake1_wins, self.snake2_wins)))
+        self.current_round += 1
+
+    def row(self, index: int, totals: Optional[Tuple[int, int, int, int]] = None) -> Dict:
+        """Row `index` in CSV_FIELDS form; totals are (apples1, apples2, wins1, wins2) up to and including it"""
+        columns = self.columns
+        if totals is None:
+            winners = columns["winner"][:index + 1]
+            totals = (sum(columns["snake1_score"][:index + 1]), sum(columns["snake2_score"][:index + 1]),
+                      winners.count(SNAKE1), winners.count(SNAKE2))
+        apples1, apples2, wins1, wins2 = totals
+        code = columns["winner"][index]
+        types1, types2 = self.collision_types.get(index, ("", ""))
+        return {
+            "round": columns["round"][index],
+            "timestamp": datetime.fromtimestamp(columns["timestamp"][index]).isoformat(),
+            "winner": {SNAKE1: self.snake1_name, SNAKE2: self.snake2_name}.get(code, self.other_winners.get(index)),
+            "snake1_score": columns["snake1_score"][index],
+            "snake2_score": columns["snake2_score"][index],
+            "snake1_traps_hit": columns["snake1_traps_hit"][index],
+            "snake2_traps_hit": columns["snake2_traps_hit"][index],
+            "snake1_collisions": columns["snake1_collisions"][index],
+            "snake2_collisions": columns["snake2_collisions"][index],
+            "snake1_collision_types": types1,
+            "snake2_collision_types": types2,
+            "time_remaining": columns["time_remaining"][index],
+            "is_draw": bool(columns["flags"][index] & IS_DRAW),
+            "is_crash": bool(columns["flags"][index] & IS_CRASH),
+            "total_snake1_apples": apples1,
+            "total_snake2_apples": apples2,
+            "W/L_Ratio_Snake1": wins1 / (index + 1),
+            "W/L_Ratio_Snake2": wins2 / (index + 1),
+        }
+
+    def iter_rows(self) -> Iterator[Dict]:
+        apples1 = apples2 = wins1 = wins2 = 0
+        columns = self.columns
+        for index in range(self.size):
+            apples1 += columns["snake1_score"][index]
+            apples2 += columns["snake2_score"][index]
+            wins1 += columns["winner"][index] == SNAKE1
+            wins2 += columns["winner"][index] == SNAKE2
+            yield self.row(index, (apples1, apples2, wins1, wins2))
+
+    def summary(self) -> Dict:
+        """Running aggregates without building any rows"""
+        summary = {
+            "rounds": self.size,
+            "snake1_wins": self.snake1_wins, "snake2_wins": self.snake2_wins,
+            "draws": self.draw_rounds, "crashes": self.crashed_rounds,
+            "total_snake1_apples": self.total_snake1_apples, "total_snake2_apples": self.total_snake2_apples,
+            "snake1_win_ratio": self.snake1_win_ratio, "snake2_win_ratio": self.snake2_win_ratio,
+        }
+        stats = dict(self.stats)
+        for name in COUNTERS:
+            stats[name] = RunningStats()
+            for value in self.columns[name][:self.size]:
+                stats[name].add(value)
+        for name, values in stats.items():
+            summary[f"{name}_mean"] = values.mean
+            summary[f"{name}_std"] = values.std
+        return summary
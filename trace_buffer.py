@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from game_settings import Direction
+
+MAGIC = b"SNAKETRC"
+VERSION = 1
+
+# One record per tick on which something can have changed:
+# tick, round, contact flags, then per snake head x, head y, length, score,
+# shield ticks left, traps hit, collisions, snake flags
+RECORD = struct.Struct("<IBB" + "BBHHBBBB" * 2)
+
+# Contact flags, set by MatchEngine.handle_snake_on_snake_collision
+HEAD_TO_HEAD = 1
+SNAKE1_HITS_BODY = 2
+SNAKE2_HITS_BODY = 4
+SCORES_ZEROED = 8  # the three-consecutive-collisions rule fired
+FORFEIT = 16
+
+# Snake flags: direction index in the low 2 bits, then these, then consecutive collisions in the high nibble
+DIRECTIONS = (Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT)
+DIRECTION_CODE = {direction: code for code, direction in enumerate(DIRECTIONS)}
+ALIVE = 4
+SELF_COLLIDING = 8
+
+ANOMALIES = {SCORES_ZEROED: "scores_zeroed", FORFEIT: "forfeit"}
+DEFAULT_TRACE_DIR = "traces"  # where contests write anomaly and crash dumps
+OFF_BOARD = (255, 255)  # head of a snake with no segments
+
+
+class TraceBuffer:
+    """Fixed-size binary ring of per-tick match records, dumped when something goes wrong
+
+    MatchEngine records one RECORD.size-byte record on every tick where a
+    snake moved, a shield ran out or a collision check ran, packing it in
+    place into a preallocated bytearray: the trace never grows or copies
+    while a match runs, and a long match just overwrites its oldest ticks.
+    The ring is dumped when a round ends (only that round's records, if
+    dump_rounds is set), the first time an anomaly shows up in a round, and
+    when update() raises. Dumps go to out_dir, or are only kept in
+    last_dump if there is none. Read them back with read_trace() or
+    `python trace_buffer.py file.trace`.
+    """
+
+    def __init__(self, capacity: int = 8192, out_dir: Optional[str] = None, dump_rounds: bool = False):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD.size)
+        self.written = 0  # records ever written; the next goes to written % capacity
+        self.round_start = 0
+        self.out_dir = out_dir
+        self.dump_rounds = dump_rounds
+        self.last_dump: Optional[bytes] = None
+        self.dumped: List[str] = []
+        self._anomalies = 0  # anomaly flags already dumped this round
+
+    def record(self, game, contact: int = 0) -> None:
+        s1, s2 = game.snake1, game.snake2
+        rate = game.sim_clock.tick_rate
+        x1, y1 = s1.segments[0] if s1.segments else OFF_BOARD
+        x2, y2 = s2.segments[0] if s2.segments else OFF_BOARD
+        # Fields go straight into pack_into, so a record builds no tuples on the way.
+        # Counters are masked to their field width rather than checked; none get near it in a round
+        RECORD.pack_into(
+            self.buffer, (self.written % self.capacity) * RECORD.size,
+            game.sim_clock.ticks & 0xFFFFFFFF, min(game.tournament.current_round, 255), contact,
+            x1 & 0xFF, y1 & 0xFF, max(s1.length, 0) & 0xFFFF, s1.score & 0xFFFF, self._shield_ticks(s1, rate),
+            s1.traps_hit & 0xFF, s1.collisions & 0xFF, self._snake_flags(s1),
+            x2 & 0xFF, y2 & 0xFF, max(s2.length, 0) & 0xFFFF, s2.score & 0xFFFF, self._shield_ticks(s2, rate),
+            s2.traps_hit & 0xFF, s2.collisions & 0xFF, self._snake_flags(s2))
+        self.written += 1
+        anomalies = contact & ~self._anomalies
+        if anomalies:
+            self._anomalies |= anomalies
+            for flag, reason in ANOMALIES.items():
+                if anomalies & flag:
+                    self.dump(game, reason)
+
+    @staticmethod
+    def _shield_ticks(snake, tick_rate: int) -> int:
+        if snake.shield_timer <= 0:
+            return 0
+        return int(snake.shield_timer * tick_rate + 0.5) & 0xFF
+
+    @staticmethod
+    def _snake_flags(snake) -> int:
+        consecutive = snake.consecutive_collisions
+        return (DIRECTION_CODE.get(snake.direction, 0) | (ALIVE if snake.alive else 0) |
+                (SELF_COLLIDING if getattr(snake, "is_colliding_with_self", False) else 0) |
+                (consecutive if consecutive < 15 else 15) << 4)
+
+    def start_round(self) -> None:
+        self.round_start = self.written
+        self._anomalies = 0
+
+    def end_round(self, game) -> None:
+        if self.dump_rounds:
+            self.dump(game, "round_end", since=self.round_start)
+
+    def records(self, since: int = 0) -> bytes:
+        """The ring's records from record number `since` on, oldest first"""
+        first = max(since, self.written - self.capacity)
+        size = RECORD.size
+        start, end = first % self.capacity, self.written % self.capacity
+        if first == self.written:
+            return b""
+        if start < end:
+            return bytes(self.buffer[start * size:end * size])
+        return bytes(self.buffer[start * size:]) + bytes(self.buffer[:end * size])
+
+    def dump(self, game, reason: str, since: int = 0) -> Optional[str]:
+        """Write the ring out, tagged with the reason; returns the file path if out_dir is set"""
+        records = self.records(since)
+        header = json.dumps({
+            "version": VERSION, "format": RECORD.format, "reason": reason,
+            "bots": [game.bot1.name, game.bot2.name], "match_key": game.match_key,
+            "round": game.tournament.current_round, "tick": game.sim_clock.ticks,
+            "tick_rate": game.sim_clock.tick_rate, "records": len(records) // RECORD.size,
+        }).encode()
+        self.last_dump = MAGIC + struct.pack("<I", len(header)) + header + records
+        if self.out_dir is None:
+            return None
+        os.makedirs(self.out_dir, exist_ok=True)
+        name = f"{game.match_key or 'match'}-r{game.tournament.current_round}-t{game.sim_clock.ticks}-{reason}.trace"
+        path = os.path.join(self.out_dir, name)
+        with open(path, "wb") as file:
+            file.write(self.last_dump)
+        self.dumped.append(path)
+        return path
+
+
+def decode(data: bytes) -> Tuple[Dict, List[Dict]]:
+    """Header and records of a dump, records as dicts"""
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a snake trace")
+    offset = len(MAGIC)
+    (header_size,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    header = json.loads(data[offset:offset + header_size])
+    offset += header_size
+    record = struct.Struct(header["format"])
+    rows = []
+    for fields in record.iter_unpack(data[offset:offset + header["records"] * record.size]):
+        tick, round_number, contact = fields[:3]
+        snakes = []
+        for x, y, length, score, shield, traps_hit, collisions, flags in (fields[3:11], fields[11:19]):
+            snakes.append({
+                "head": None if x == 255 else (x, y), "length": length, "score": score,
+                "shield_ticks": shield, "traps_hit": traps_hit, "collisions": collisions,
+                "direction": DIRECTIONS[flags & 3], "alive": bool(flags & ALIVE),
+                "self_colliding": bool(flags & SELF_COLLIDING), "consecutive_collisions": flags >> 4,
+            })
+        rows.append({"tick": tick, "round": round_number, "contact": contact, "snakes": snakes})
+    return header, rows
+
+
+def read_trace(path: str) -> Tuple[Dict, List[Dict]]:
+    with open(path, "rb") as file:
+        return decode(file.read())
+
+
+def describe_contact(contact: int) -> str:
+    names = [name for flag, name in ((HEAD_TO_HEAD, "head-to-head"), (SNAKE1_HITS_BODY, "1->2 body"),
+                                     (SNAKE2_HITS_BODY, "2->1 body"), (SCORES_ZEROED, "SCORES ZEROED"),
+                                     (FORFEIT, "FORFEIT")) if contact & flag]
+    return ", ".join(names)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print a trace dumped by TraceBuffer")
+    parser.add_argument("path")
+    parser.add_argument("--last", type=int, default=None, help="only the last N records")
+    args = parser.parse_args()
+
+    header, rows = read_trace(args.path)
+    print(f"{header['bots'][0]} vs {header['bots'][1]}: {header['reason']} in round {header['round']} "
+          f"at tick {header['tick']} ({header['records']} records)")
+    if args.last is not None:
+        rows = rows[-args.last:]
+    print(f"{'Tick':>7} {'Rd':>2}  {'Snake 1 head/len/score/shield/hits':<36} {'Snake 2 head/len/score/shield/hits':<36} Contact")
+    for row in rows:
+        cells = []
+        for snake in row["snakes"]:
+            state = "" if snake["alive"] else " dead"
+            if snake["self_colliding"]:
+                state += " self"
+            cells.append(f"{str(snake['head']):<9} {snake['length']:>3} {snake['score']:>3} "
+                         f"{snake['shield_ticks']:>3} {snake['consecutive_collisions']}c{state}")
+        print(f"{row['tick']:>7} {row['round']:>2}  {cells[0]:<36} {cells[1]:<36} {describe_contact(row['contact'])}")
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import random
+import multiprocessing
+from dataclasses import asdict, fields
+from typing import List, Dict, Tuple, Optional
+
+import bot as builtin_bots
+from bot import GreedyBot, GreedyParams, StrategicBot, StrategicParams, close_bot
+from engine import MatchEngine
+from game_settings import SEEDED_DECISION_NODES
+from tournament import ColumnarTournament
+from layout_bank import LayoutBank
+
+# Searchable weights and their bounds. StrategicBot's base_score is left out on
+# purpose: it is added to every candidate move, so it never changes a decision.
+PARAM_SPACES = {
+    "GreedyBot": (GreedyBot, GreedyParams, {
+        "food_weight": (10.0, 5000.0),
+        "straight_bonus": (0.0, 200.0),
+    }),
+    "StrategicBot": (StrategicBot, StrategicParams, {
+        "food_weight": (10.0, 3000.0),
+        "danger_radius": (1, 12),
+        "danger_penalty": (0.0, 4000.0),
+        "room_weight": (0.0, 4000.0),
+    }),
+}
+
+Candidate = Dict[str, float]
+
+
+def make_bot(kind: str, values: Optional[Candidate] = None, name: Optional[str] = None) -> builtin_bots.Bot:
+    """Build a tunable bot from a (possibly partial) parameter dict"""
+    bot_class, params_class, _ = PARAM_SPACES[kind]
+    params = params_class(**(values or {}))
+    return bot_class(params, name or kind)
+
+
+def load_params(path: str, rank: int = 0):
+    """Read a parameter set written by tune() back into its params dataclass"""
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    _, params_class, _ = PARAM_SPACES[data["kind"]]
+    return params_class(**data["best"][rank]["params"])
+
+
+def _clip(kind: str, values: Candidate) -> Candidate:
+    _, params_class, bounds = PARAM_SPACES[kind]
+    types = {f.name: f.type for f in fields(params_class)}
+    clipped = dict(values)
+    for key, (low, high) in bounds.items():
+        value = min(max(values[key], low), high)
+        clipped[key] = int(round(value)) if types[key] in (int, "int") else float(value)
+    return clipped
+
+
+def random_candidate(kind: str, rng: random.Random) -> Candidate:
+    _, params_class, bounds = PARAM_SPACES[kind]
+    values = asdict(params_class())
+    for key, (low, high) in bounds.items():
+        values[key] = rng.uniform(low, high)
+    return _clip(kind, values)
+
+
+def crossover(kind: str, a: Candidate, b: Candidate, rng: random.Random) -> Candidate:
+    """Uniform crossover over the searchable weights"""
+    child = dict(a)
+    for key in PARAM_SPACES[kind][2]:
+        if rng.random() < 0.5:
+            child[key] = b[key]
+    return child
+
+
+def mutate(kind: str, values: Candidate, rng: random.Random, sigma: float) -> Candidate:
+    """Gaussian step per weight, `sigma` as a fraction of its range"""
+    mutated = dict(values)
+    for key, (low, high) in PARAM_SPACES[kind][2].items():
+        mutated[key] = values[key] + rng.gauss(0.0, sigma * (high - low))
+    return _clip(kind, mutated)
+
+
+# Banks opened by this worker process, shared by all of its matches
+_layout_banks: Dict[str, LayoutBank] = {}
+
+
+def open_layout_bank(path: str) -> LayoutBank:
+    if path not in _layout_banks:
+        _layout_banks[path] = LayoutBank(path)
+    return _layout_banks[path]
+
+
+def play_match(candidate: builtin_bots.Bot, opponent: builtin_bots.Bot, seed: int,
+               candidate_first: bool, layout_bank: Optional[str] = None) -> float:
+    """One headless match; round win margin plus a small apple-difference tiebreak"""
+    random.seed(seed)
+    game = MatchEngine()
+    game.tournament_class = ColumnarTournament
+    game.config.decision_nodes = SEEDED_DECISION_NODES  # same seed, same fitness
+    game.bot1, game.bot2 = (candidate, opponent) if candidate_first else (opponent, candidate)
+    if layout_bank is not None:
+        game.layout_bank = open_layout_bank(layout_bank)
+    game.play_headless()
+    close_bot(candidate)
+    close_bot(opponent)
+
+    t = game.tournament
+    margin = (t.snake1_wins - t.snake2_wins) + 0.01 * (t.total_snake1_apples - t.total_snake2_apples)
+    return margin if candidate_first else -margin
+
+
+def evaluate_worker(job: Tuple[int, str, Candidate, List[str], List[int], Optional[str]]) -> Tuple[int, float]:
+    """Fitness of one candidate: mean margin over every opponent, seed and side"""
+    index, kind, values, opponents, seeds, layout_bank = job
+    total = 0.0
+    games = 0
+    for opponent_name in opponents:
+        for seed in seeds:
+            for candidate_first in (True, False):
+                # Fresh bots per match; distinct names keep round winners attributable
+                candidate = make_bot(kind, values, f"{kind}_tuned")
+                opponent = getattr(builtin_bots, opponent_name)()
+                total += play_match(candidate, opponent, seed, candidate_first, layout_bank)
+                games += 1
+    return index, total / games
+
+
+def tune(kind: str,
+         opponents: List[str],
+         out_path: str,
+         population: int = 16,
+         generations: int = 10,
+         seeds: int = 4,
+         elite: int = 2,
+         sigma: float = 0.15,
+         workers: int = os.cpu_count() or 1,
+         layout_bank: Optional[str] = None,
+         seed: int = 0,
+         keep: int = 5) -> Dict:
+    """Genetic search over a bot's weights, evaluated in parallel headless matches
+
+    Every candidate plays the same match seeds (common random numbers), so
+    fitness differences come from the weights rather than the layouts drawn.
+    """
+    rng = random.Random(seed)
+    match_seeds = [rng.randrange(2 ** 31) for _ in range(seeds)]
+    _, params_class, _ = PARAM_SPACES[kind]
+    pop = [asdict(params_class())] + [random_candidate(kind, rng) for _ in range(population - 1)]
+
+    scored: Dict[str, Tuple[float, Candidate]] = {}
+    history = []
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        for generation in range(generations):
+            keys = [json.dumps(values, sort_keys=True) for values in pop]
+            jobs = [(i, kind, values, opponents, match_seeds, layout_bank)
+                    for i, (key, values) in enumerate(zip(keys, pop)) if key not in scored]
+            for i, fitness in pool.imap_unordered(evaluate_worker, jobs):
+                scored[keys[i]] = (fitness, pop[i])
+
+            ranked = sorted({key: scored[key] for key in keys}.values(), key=lambda item: -item[0])
+            best_fitness, best_values = ranked[0]
+            mean_fitness = sum(fitness for fitness, _ in ranked) / len(ranked)
+            history.append({"generation": generation, "best": best_fitness, "mean": mean_fitness})
+            print(f"Generation {generation}: best {best_fitness:+.3f}, mean {mean_fitness:+.3f}, "
+                  f"{best_values}")
+
+            # Elites survive; the rest are tournament-selected, crossed and mutated
+            parents = [values for _, values in ranked]
+            children = [dict(values) for values in parents[:elite]]
+            step = sigma * (1.0 - 0.5 * generation / max(1, generations - 1))
+            while len(children) < population:
+                a = min(rng.sample(range(len(parents)), 2))
+                b = min(rng.sample(range(len(parents)), 2))
+                children.append(mutate(kind, crossover(kind, parents[a], parents[b], rng), rng, step))
+            pop = children
+
+    best = sorted(scored.values(), key=lambda item: -item[0])[:keep]
+    result = {
+        "kind": kind,
+        "opponents": opponents,
+        "seeds": match_seeds,
+        "evaluated": len(scored),
+        "history": history,
+        "best": [{"fitness": fitness, "params": values} for fitness, values in best],
+    }
+    with open(out_path, "w", encoding="utf-8") as file:
+        json.dump(result, file, indent=2)
+    print(f"Wrote the best {len(best)} parameter sets to {out_path}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune bot weights with a parallel genetic search")
+    parser.add_argument("kind", choices=sorted(PARAM_SPACES))
+    parser.add_argument("--opponent", action="append", default=None,
+                        help="reference bot class from bot.py (repeatable)")
+    parser.add_argument("--out", default="tuned_params.json")
+    parser.add_argument("--population", type=int, default=16)
+    parser.add_argument("--generations", type=int, default=10)
+    parser.add_argument("--seeds", type=int, default=4, help="match seeds shared by every candidate")
+    parser.add_argument("--elite", type=int, default=2)
+    parser.add_argument("--sigma", type=float, default=0.15)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--layout-bank", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    opponents = args.opponent or ["RandomBot", "GreedyBot", "StrategicBot"]
+    tune(args.kind, opponents, args.out, args.population, args.generations, args.seeds,
+         args.elite, args.sigma, args.workers, args.layout_bank, args.seed)
@@ -0,0 +1,156 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+from typing import List, Dict, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_batch_status ON jobs(batch, status);
+CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs(status, lease_until);
+"""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """Durable job queue in SQLite with leased claims
+
+    A claimed job belongs to its worker until the lease runs out; workers
+    extend it with heartbeat(). Leases that expire (the worker died or lost
+    its host) are put back to pending by requeue_expired(), which every
+    claim runs first, or marked failed once max_attempts is used up. The
+    database uses a rollback journal rather than WAL, whose shared-memory
+    index only works between processes of one host, so workers on several
+    machines can share the file on a mount with working POSIX locks;
+    writers wait on a busy timeout for the lock.
+    """
+
+    def __init__(self, path: str = "work_queue.db", lease_seconds: float = 120.0, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Autocommit; multi-statement updates take an explicit write lock
+        self.conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=DELETE")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self.conn.executescript(SCHEMA)
+
+    def add_jobs(self, batch: str, payloads: List[Dict]) -> int:
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.executemany(
+            "INSERT INTO jobs (batch, payload, updated_at) VALUES (?, ?, ?)",
+            [(batch, json.dumps(payload, sort_keys=True), now) for payload in payloads]
+        )
+        self.conn.execute("COMMIT")
+        return len(payloads)
+
+    def requeue_expired(self) -> int:
+        """Return jobs whose lease ran out to the pending pool, or mark them failed after max_attempts
+
+        A job that keeps killing its worker (OOM kill, segfault, os._exit) only
+        ever shows up as an expired lease, so expiry counts as a failed attempt.
+        """
+        now = time.time()
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, lease_until = NULL, "
+            "error = CASE WHEN attempts >= ? THEN 'lease expired on every attempt' ELSE error END, "
+            "updated_at = ? WHERE status = 'leased' AND lease_until < ?",
+            (self.max_attempts, self.max_attempts, now, now)
+        )
+        return cursor.rowcount
+
+    def claim(self, worker: str, batch: Optional[str] = None) -> Optional[Tuple[int, Dict]]:
+        """Lease the oldest pending job, or None when nothing is pending"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.requeue_expired()
+            row = self.conn.execute(
+                "SELECT id, payload FROM jobs WHERE status = 'pending' AND (? IS NULL OR batch = ?) "
+                "ORDER BY id LIMIT 1",
+                (batch, batch)
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (worker, now + self.lease_seconds, now, row["id"])
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return (row["id"], json.loads(row["payload"])) if row is not None else None
+
+    def heartbeat(self, job_id: int, worker: str) -> bool:
+        """Extend a lease; False if the job was taken away from this worker"""
+        now = time.time()
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+            (now + self.lease_seconds, now, job_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, result: Dict) -> bool:
+        """Post a result; ignored (False) if the lease expired and the job moved on"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = 'done', result = ?, lease_until = NULL, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (json.dumps(result), time.time(), job_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker: str, error: str) -> None:
+        """Give a job back for another try, or mark it failed after max_attempts"""
+        self.conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, lease_until = NULL, error = ?, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND status = 'leased'",
+            (self.max_attempts, error, time.time(), job_id, worker)
+        )
+
+    def counts(self, batch: Optional[str] = None) -> Dict[str, int]:
+        rows = self.conn.execute(
+            "SELECT status, COUNT(*) AS n FROM jobs WHERE (? IS NULL OR batch = ?) GROUP BY status",
+            (batch, batch)
+        ).fetchall()
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def results(self, batch: str) -> List[Tuple[Dict, Dict]]:
+        """(payload, result) of every finished job in a batch, in planning order"""
+        rows = self.conn.execute(
+            "SELECT payload, result FROM jobs WHERE batch = ? AND status = 'done' ORDER BY id",
+            (batch,)
+        ).fetchall()
+        return [(json.loads(row["payload"]), json.loads(row["result"])) for row in rows]
+
+    def failures(self, batch: str) -> List[Tuple[Dict, str]]:
+        rows = self.conn.execute(
+            "SELECT payload, error FROM jobs WHERE batch = ? AND status = 'failed' ORDER BY id",
+            (batch,)
+        ).fetchall()
+        return [(json.loads(row["payload"]), row["error"]) for row in rows]
+
+    def close(self) -> None:
+        self.conn.close()